@@ -0,0 +1,181 @@
+"""
+Module for rolling-origin backtests of forecast accuracy.
+
+History is a panel: one FinancialArrays per reporting period, oldest
+first, listing the same companies in the same order. Every period but the
+last is used as a forecast origin. The origins are stacked as blocks of
+rows, so a single run of the vectorized kernel (which applies the
+FinancialForecast formulas) forecasts every company from every origin,
+and each horizon is scored against the actuals it lands on. Errors are
+reported per line item and horizon as the mean absolute percentage error
+(MAPE), its median and the bias (mean signed percentage error). A
+consistent bias on a line item points at the assumption that drives it.
+"""
+
+import numpy as np
+
+from analysis.forecast_kernel import forecast_periods
+from analysis.forecasting import FinancialForecast
+from core.instrumentation import instrumented
+
+# Line items scored by default
+DEFAULT_ITEMS = (
+    'revenue', 'cogs', 'operating_expenses', 'interest_expense', 'net_income', 'cash', 'accounts_receivable',
+    'inventory', 'accounts_payable', 'depreciation_amortization', 'capital_expenditures', 'dividends_paid',
+    'long_term_debt', 'ending_cash_balance',
+)
+
+# Assumption that drives each line item in FinancialForecast
+DRIVERS = {
+    'revenue': 'revenue_growth',
+    'cogs': 'cogs_percent',
+    'operating_expenses': 'opex_growth',
+    'interest_expense': 'interest_rate',
+    'cash': 'cash_percent',
+    'accounts_receivable': 'ar_days',
+    'inventory': 'inventory_days',
+    'accounts_payable': 'ap_days',
+    'depreciation_amortization': 'depreciation_rate',
+    'capital_expenditures': 'capex_percent',
+    'dividends_paid': 'dividend_payout',
+    'long_term_debt': 'debt_repayment',
+}
+
+
+def align_periods(periods):
+    """
+    Restrict a panel to the companies present in every period.
+
+    Args:
+        periods: List of FinancialArrays, oldest first
+
+    Returns:
+        List of FinancialArrays with the common companies in the order of the first period
+    """
+    common = set(periods[0].keys).intersection(*(period.keys for period in periods[1:]))
+    keys = [key for key in periods[0].keys if key in common]
+    aligned = []
+    for period in periods:
+        index = {key: row for row, key in enumerate(period.keys)}
+        aligned.append(period.take(np.array([index[key] for key in keys], dtype=np.int64)))
+    return aligned
+
+
+def load_panel(store, reporting_periods):
+    """
+    Load actuals of several periods from a FinancialStore as an aligned panel.
+
+    Args:
+        store: FinancialStore
+        reporting_periods: Reporting periods, oldest first
+
+    Returns:
+        List of FinancialArrays (see align_periods)
+    """
+    return align_periods([store.load_period_arrays(period) for period in reporting_periods])
+
+
+def _percentage_errors(forecast, actual):
+    """Signed errors as a fraction of the actual value (NaN where the actual is zero or missing)."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        errors = (forecast - actual) / np.abs(actual)
+    errors[~np.isfinite(errors)] = np.nan
+    return errors
+
+
+@instrumented('backtest.run')
+def run_backtest(periods, horizons=3, assumptions=None, items=DEFAULT_ITEMS):
+    """
+    Backtest the forecast from every historical origin.
+
+    Args:
+        periods: List of FinancialArrays, oldest first, with the same companies
+            in the same order (see align_periods)
+        horizons: Largest forecast horizon scored
+        assumptions: Optional assumption overrides, scalars or one per company
+            (FinancialForecast defaults otherwise)
+        items: Line items to score
+
+    Returns:
+        Dictionary with 'items', 'horizons' (1 to H), 'mape', 'median_ape',
+        'bias' and 'count' (arrays of shape (items, horizons)), 'errors'
+        (signed percentage errors of shape (items, horizons, origins,
+        companies), NaN where no actual is available), 'keys' and 'summary'
+        (one dictionary per item)
+    """
+    if len(periods) < 2:
+        raise ValueError("A backtest needs at least two periods of history")
+    periods = [period.to_float() for period in periods]
+    keys = periods[0].keys
+    if any(period.keys != keys for period in periods[1:]):
+        raise ValueError("Every period must list the same companies in the same order; see align_periods")
+
+    companies = len(keys)
+    origins = len(periods) - 1
+    horizons = min(horizons, origins)
+    model_assumptions = dict(FinancialForecast(None).assumptions)
+    model_assumptions.update(assumptions or {})
+
+    # Every origin is a block of rows, so one kernel run covers all origins and companies
+    base = {name: np.concatenate([period.columns[name] for period in periods[:-1]]) for name in periods[0].columns}
+    tiled = {name: np.tile(value, origins) if np.ndim(value) else value for name, value in model_assumptions.items()}
+    forecasts = forecast_periods(base, tiled, horizons)
+
+    errors = np.full((len(items), horizons, origins, companies), np.nan)
+    for h in range(1, horizons + 1):
+        # Origins 0 .. origins - h have an actual h periods ahead
+        scored = origins - h + 1
+        for i, item in enumerate(items):
+            forecast = forecasts[h - 1][item][:scored * companies]
+            actual = np.concatenate([period.columns[item] for period in periods[h:]])
+            errors[i, h - 1, :scored] = _percentage_errors(forecast, actual).reshape(scored, companies)
+
+    flat = errors.reshape(len(items), horizons, -1)
+    count = (~np.isnan(flat)).sum(axis=2)
+    scored = count > 0
+    mape = np.full(count.shape, np.nan)
+    median_ape = np.full(count.shape, np.nan)
+    bias = np.full(count.shape, np.nan)
+    mape[scored] = np.nansum(np.abs(flat), axis=2)[scored] / count[scored]
+    bias[scored] = np.nansum(flat, axis=2)[scored] / count[scored]
+    median_ape[scored] = np.nanmedian(np.abs(flat[scored]), axis=1)
+
+    summary = [{
+        'item': item,
+        'driver': DRIVERS.get(item),
+        'mape': mape[i].tolist(),
+        'median_ape': median_ape[i].tolist(),
+        'bias': bias[i].tolist(),
+        'count': count[i].tolist(),
+    } for i, item in enumerate(items)]
+
+    return {
+        'items': list(items),
+        'horizons': list(range(1, horizons + 1)),
+        'mape': mape,
+        'median_ape': median_ape,
+        'bias': bias,
+        'count': count,
+        'errors': errors,
+        'keys': keys,
+        'summary': summary,
+    }
+
+
+def format_backtest_report(report):
+    """
+    Format the accuracy of run_backtest as a text table.
+
+    Args:
+        report: Dictionary returned by run_backtest
+
+    Returns:
+        str: One line per line item with its driver and MAPE and bias per horizon
+    """
+    header = f"{'Item':<26} {'Driver':<18}" + "".join(f" {f'MAPE h{h}':>9} {f'Bias h{h}':>9}"
+                                                    for h in report['horizons'])
+    lines = [header, "-" * len(header)]
+    for row in report['summary']:
+        values = "".join(f" {mape:>9.1%} {bias:>+9.1%}" for mape, bias in zip(row['mape'], row['bias']))
+        lines.append(f"{row['item']:<26} {row['driver'] or '':<18}{values}")
+    return "\n".join(lines)
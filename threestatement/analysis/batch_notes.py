@@ -0,0 +1,128 @@
+"""
+Module for generating MD&A commentary across a whole portfolio.
+
+Companies are read lazily in chunks, each chunk is annotated in a worker
+process with the compiled note templates, and the results are written out
+as JSON lines as soon as a chunk finishes. Only a bounded number of chunks
+is ever in flight, so memory use does not grow with the portfolio size.
+"""
+
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from itertools import islice
+
+from analysis.forecasting import FinancialForecast
+from analysis.notes_generator import generate_comprehensive_notes_batch
+
+# Companies annotated per worker task
+DEFAULT_CHUNK_SIZE = 500
+
+
+def _notes_chunk_job(job):
+    """
+    Process pool entry point; annotate one chunk of companies.
+
+    Args:
+        job: Tuple of (start index, list of (base_data, forecast_data) pairs)
+
+    Returns:
+        List of JSON lines, one per company
+    """
+    start, pairs = job
+    pairs = [
+        (base_data, forecast_data if forecast_data is not None else FinancialForecast(base_data).generate_forecast())
+        for base_data, forecast_data in pairs
+    ]
+    notes = generate_comprehensive_notes_batch(pairs)
+
+    return [
+        json.dumps({
+            'index': start + i,
+            'company': base_data.company_name,
+            'reporting_period': base_data.reporting_period,
+            'notes': text,
+        })
+        for i, ((base_data, _), text) in enumerate(zip(pairs, notes))
+    ]
+
+
+def _chunks(companies, chunk_size):
+    """Yield (start index, pairs) chunks from an iterable of companies."""
+    pairs = (company if isinstance(company, tuple) else (company, None) for company in companies)
+    start = 0
+    while True:
+        chunk = list(islice(pairs, chunk_size))
+        if not chunk:
+            return
+        yield start, chunk
+        start += len(chunk)
+
+
+def iter_notes_jsonl(companies, max_workers=None, chunk_size=DEFAULT_CHUNK_SIZE, max_pending=None):
+    """
+    Generate comprehensive notes for many companies, yielding JSON lines as chunks finish.
+
+    Lines are yielded in completion order; each record carries the input
+    position as 'index'.
+
+    Args:
+        companies: Iterable of FinancialData or (base_data, forecast_data) pairs;
+            a forecast of None is generated with default assumptions
+        max_workers: Number of worker processes (defaults to the CPU count)
+        chunk_size: Number of companies handed to a worker at a time
+        max_pending: Maximum number of chunks in flight (defaults to twice the worker count)
+
+    Yields:
+        JSON strings with 'index', 'company', 'reporting_period' and 'notes'
+    """
+    chunks = _chunks(companies, chunk_size)
+    if max_pending is None:
+        max_pending = 2 * (max_workers or os.cpu_count() or 1)
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        pending = set()
+        for job in islice(chunks, max_pending):
+            pending.add(executor.submit(_notes_chunk_job, job))
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            # Refill before yielding so workers stay busy while the consumer writes
+            for job in islice(chunks, len(done)):
+                pending.add(executor.submit(_notes_chunk_job, job))
+            for future in done:
+                yield from future.result()
+
+
+def write_notes_jsonl(companies, output, max_workers=None, chunk_size=DEFAULT_CHUNK_SIZE, max_pending=None):
+    """
+    Generate comprehensive notes for many companies and stream them to a JSON lines file.
+
+    Args:
+        companies: Iterable of FinancialData or (base_data, forecast_data) pairs
+        output: Output file path or writable text file object
+        max_workers: Number of worker processes (defaults to the CPU count)
+        chunk_size: Number of companies handed to a worker at a time
+        max_pending: Maximum number of chunks in flight (defaults to twice the worker count)
+
+    Returns:
+        Dictionary with the number of companies written and the elapsed wall-clock time
+    """
+    start = time.perf_counter()
+    count = 0
+
+    f = open(output, 'w', encoding='utf-8') if isinstance(output, str) else output
+    try:
+        for line in iter_notes_jsonl(companies, max_workers, chunk_size, max_pending):
+            f.write(line)
+            f.write("\n")
+            count += 1
+    finally:
+        if f is not output:
+            f.close()
+
+    return {
+        'count': count,
+        'wall_time': time.perf_counter() - start,
+    }
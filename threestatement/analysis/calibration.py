@@ -0,0 +1,203 @@
+"""
+Module for calibrating forecast assumptions from history.
+
+Each FinancialForecast assumption is measured on every historical period
+of every company at once: margins and days ratios from a single period,
+growth rates and the interest rate from consecutive periods. The
+observations of a company are then reduced to one value with a robust
+estimator (the median, or a Huber M-estimate), so one exceptional year
+does not set the assumption. Companies with too few usable observations
+fall back to the median of the other companies, and every value is
+clipped to a plausible range. The result maps assumption names to one
+value per company, ready for the vectorized kernel, or for one
+company's FinancialForecast.update_assumptions via assumptions_for.
+"""
+
+import numpy as np
+
+from analysis.forecasting import FinancialForecast
+from core.financial_arrays import from_financial_data
+from core.instrumentation import instrumented
+
+# Robust estimators
+MEDIAN = 'median'
+HUBER = 'huber'
+
+# Huber tuning constant (95% efficiency for normal data) and iterations of its reweighting
+HUBER_K = 1.345
+_HUBER_ITERATIONS = 20
+
+# Consistency factor turning the median absolute deviation into a standard deviation
+_MAD_SCALE = 1.4826
+
+# Plausible range of each calibrated assumption
+BOUNDS = {
+    'revenue_growth': (-0.5, 1.0),
+    'cogs_percent': (0.0, 1.0),
+    'opex_growth': (-0.5, 1.0),
+    'interest_rate': (0.0, 0.25),
+    'tax_rate': (0.0, 0.5),
+    'cash_percent': (0.0, 2.0),
+    'ar_days': (0.0, 365.0),
+    'inventory_days': (0.0, 365.0),
+    'ap_days': (0.0, 365.0),
+    'capex_percent': (0.0, 0.5),
+    'depreciation_rate': (0.0, 0.5),
+    'dividend_payout': (0.0, 1.0),
+    'debt_repayment': (0.0, np.inf),
+    'new_borrowing': (0.0, np.inf),
+}
+
+
+def _ratio(numerator, denominator, valid):
+    """Element-wise ratio, NaN where not valid."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(valid, numerator / denominator, np.nan)
+
+
+def driver_observations(periods):
+    """
+    Measure every assumption on every period of a panel.
+
+    Args:
+        periods: List of FinancialArrays, oldest first, with the same companies
+            in the same order (see backtest.align_periods)
+
+    Returns:
+        Dictionary mapping assumption names to arrays of shape (observations,
+        companies), NaN where a value cannot be measured (e.g. a zero denominator);
+        growth rates and the interest rate have one observation fewer than periods
+    """
+    columns = [period.to_float().columns for period in periods]
+    observations = {name: [] for name in BOUNDS}
+    for t, c in enumerate(columns):
+        revenue, cogs = c['revenue'], c['cogs']
+        observations['cogs_percent'].append(_ratio(cogs, revenue, revenue > 0))
+        observations['tax_rate'].append(c['tax_rate'])
+        observations['cash_percent'].append(_ratio(c['cash'], revenue, revenue > 0))
+        observations['ar_days'].append(_ratio(c['accounts_receivable'] * 365, revenue, revenue > 0))
+        observations['inventory_days'].append(_ratio(c['inventory'] * 365, cogs, cogs > 0))
+        observations['ap_days'].append(_ratio(c['accounts_payable'] * 365, cogs, cogs > 0))
+        observations['capex_percent'].append(_ratio(c['capital_expenditures'], revenue, revenue > 0))
+        ppe = c['property_plant_equipment']
+        observations['depreciation_rate'].append(_ratio(c['depreciation_amortization'], ppe, ppe > 0))
+        net_income = c['net_income']
+        observations['dividend_payout'].append(_ratio(c['dividends_paid'], net_income, net_income > 0))
+        observations['debt_repayment'].append(c['debt_repayment'])
+        observations['new_borrowing'].append(c['debt_issuance'])
+        if t:
+            prior = columns[t - 1]
+            observations['revenue_growth'].append(_ratio(revenue, prior['revenue'], prior['revenue'] > 0) - 1)
+            observations['opex_growth'].append(
+                _ratio(c['operating_expenses'], prior['operating_expenses'], prior['operating_expenses'] > 0) - 1)
+            debt = prior['short_term_debt'] + prior['long_term_debt']
+            observations['interest_rate'].append(_ratio(c['interest_expense'], debt, debt > 0))
+
+    companies = len(columns[0]['revenue'])
+    return {name: np.array(values, dtype=float).reshape(len(values), companies)
+            for name, values in observations.items()}
+
+
+def huber_location(values, k=HUBER_K, iterations=_HUBER_ITERATIONS):
+    """
+    Huber M-estimate of location of every column, ignoring NaNs.
+
+    Starts from the median and reweights observations further than k
+    scaled median absolute deviations from the current estimate.
+
+    Args:
+        values: Array of shape (observations, columns)
+        k: Tuning constant in units of the robust scale
+        iterations: Reweighting iterations
+
+    Returns:
+        Array of shape (columns,), NaN for columns without observations
+    """
+    values = np.asarray(values, dtype=float)
+    valid = ~np.isnan(values)
+    filled = np.where(valid, values, 0.0)
+    has_values = valid.any(axis=0)
+    location = np.full(values.shape[1], np.nan)
+    scale = np.full(values.shape[1], np.nan)
+    location[has_values] = np.nanmedian(values[:, has_values], axis=0)
+    scale[has_values] = _MAD_SCALE * np.nanmedian(np.abs(values[:, has_values] - location[has_values]), axis=0)
+    # A zero scale means most observations agree: the median is the estimate
+    active = has_values & (scale > 0)
+    for _ in range(iterations):
+        residual = np.abs(filled - location) / np.where(active, scale, 1.0)
+        weights = np.where(valid, np.minimum(1.0, k / np.maximum(residual, 1e-12)), 0.0)
+        updated = (weights * filled).sum(axis=0) / np.maximum(weights.sum(axis=0), 1e-12)
+        location = np.where(active, updated, location)
+    return location
+
+
+@instrumented('calibration.calibrate')
+def calibrate_assumptions(periods, estimator=MEDIAN, window=None, min_observations=2, defaults=None):
+    """
+    Calibrate forecast assumptions for every company of a panel.
+
+    Args:
+        periods: List of FinancialArrays, oldest first, with the same companies
+            in the same order
+        estimator: MEDIAN or HUBER
+        window: Optional number of most recent observations used
+        min_observations: Fewest observations a company needs for its own estimate;
+            below that the median of the other companies' estimates is used
+        defaults: Optional assumptions used where no company has enough
+            observations (FinancialForecast defaults otherwise)
+
+    Returns:
+        Dictionary mapping assumption names to arrays with one value per company
+    """
+    if estimator not in (MEDIAN, HUBER):
+        raise ValueError(f"Unknown estimator: {estimator}")
+    fallback = dict(FinancialForecast(None).assumptions)
+    fallback.update(defaults or {})
+
+    calibrated = {}
+    for name, values in driver_observations(periods).items():
+        if window is not None:
+            values = values[-window:]
+        enough = (~np.isnan(values)).sum(axis=0) >= min_observations
+        estimate = np.full(values.shape[1], np.nan)
+        if enough.any():
+            own = values[:, enough]
+            estimate[enough] = np.nanmedian(own, axis=0) if estimator == MEDIAN else huber_location(own)
+            estimate[~enough] = np.median(estimate[enough])
+        else:
+            estimate[:] = fallback[name]
+        low, high = BOUNDS[name]
+        calibrated[name] = np.clip(estimate, low, high)
+    return calibrated
+
+
+def assumptions_for(calibrated, row):
+    """
+    Get the calibrated assumptions of one company.
+
+    Args:
+        calibrated: Dictionary returned by calibrate_assumptions
+        row: Company row in the panel
+
+    Returns:
+        Dictionary of floats for FinancialForecast.update_assumptions
+    """
+    return {name: float(values[row]) for name, values in calibrated.items()}
+
+
+def calibrate_forecast(model, history, **kwargs):
+    """
+    Calibrate a FinancialForecast from one company's history.
+
+    Args:
+        model: FinancialForecast to update
+        history: List of FinancialData, oldest first (e.g. FinancialStore.load_history)
+        **kwargs: Options of calibrate_assumptions
+
+    Returns:
+        Dictionary of the assumptions applied
+    """
+    assumptions = assumptions_for(calibrate_assumptions([from_financial_data([data]) for data in history],
+                                                        **kwargs), 0)
+    model.update_assumptions(assumptions)
+    return assumptions
@@ -4,9 +4,198 @@ Enhanced module for displaying financial statement comparisons.
 
 import tkinter as tk
 from tkinter import ttk, scrolledtext
+import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
+from analysis.notes_generator import NotesGenerator
+
+class FinancialComparison:
+    """
+    Class to compare base and forecasted financial statements.
+    """
+    
+    def __init__(self, base_data, forecast_data):
+        """
+        Initialize with base and forecast financial data.
+        
+        Args:
+            base_data: FinancialData for the base year
+            forecast_data: FinancialData for the forecast year
+        """
+        self.base_data = base_data
+        self.forecast_data = forecast_data
+        
+        # Absolute change for every compared item, used for cross-statement notes
+        self.changes = {}
+        for comparison in (self.get_income_statement_comparison(),
+                           self.get_balance_sheet_comparison(),
+                           self.get_cash_flow_comparison()):
+            for key, item in comparison.items():
+                self.changes[key] = item['change']
+        
+        self.notes_generator = NotesGenerator(self)
+    
+    @staticmethod
+    def _compare(base, forecast):
+        """
+        Compare a single base and forecast value.
+        
+        Args:
+            base: Base year value
+            forecast: Forecast year value
+            
+        Returns:
+            Dictionary with base, forecast, change and percentage change
+        """
+        change = forecast - base
+        return {
+            'base': base,
+            'forecast': forecast,
+            'change': change,
+            'percentage': change / abs(base) if base != 0 else 0
+        }
+    
+    def _compare_items(self, items):
+        """
+        Compare several items computed by the same function for both years.
+        
+        Args:
+            items: Dictionary mapping item keys to functions of FinancialData
+            
+        Returns:
+            Dictionary mapping item keys to comparison dictionaries
+        """
+        return {
+            key: self._compare(value(self.base_data), value(self.forecast_data))
+            for key, value in items.items()
+        }
+    
+    def get_income_statement_comparison(self):
+        """
+        Compare the income statements.
+        
+        Returns:
+            Dictionary of income statement comparisons
+        """
+        return self._compare_items(_INCOME_STATEMENT_ITEMS)
+    
+    def get_balance_sheet_comparison(self):
+        """
+        Compare the balance sheets.
+        
+        Returns:
+            Dictionary of balance sheet comparisons
+        """
+        return self._compare_items(_BALANCE_SHEET_ITEMS)
+    
+    def get_cash_flow_comparison(self):
+        """
+        Compare the cash flow statements.
+        
+        Returns:
+            Dictionary of cash flow statement comparisons
+        """
+        return self._compare_items(_CASH_FLOW_ITEMS)
+
+def _working_capital_changes(data):
+    """Calculate the cash effect of working capital changes."""
+    return (-data.accounts_receivable_change - data.inventory_change + data.accounts_payable_change +
+            data.accrued_expenses_change + data.deferred_revenue_change)
+
+def _operating_cash_flow(data):
+    """Calculate operating cash flow as in FinancialData, including write-downs."""
+    return data.operating_cash_flow
+
+def _investing_cash_flow(data):
+    """Calculate investing cash flow."""
+    return -data.capital_expenditures - data.acquisitions + data.investments_sold + data.other_investing
+
+def _financing_cash_flow(data):
+    """Calculate financing cash flow."""
+    return (data.debt_issuance - data.debt_repayment - data.dividends_paid +
+            data.stock_issuance - data.stock_repurchase + data.equity_bailout + data.other_financing)
+
+_INCOME_STATEMENT_ITEMS = {
+    'revenue': lambda d: d.revenue,
+    'cogs': lambda d: d.cogs,
+    'gross_profit': lambda d: d.revenue - d.cogs,
+    'operating_expenses': lambda d: d.operating_expenses,
+    'operating_income': lambda d: d.operating_income,
+    'interest_expense': lambda d: d.interest_expense,
+    'income_before_tax': lambda d: d.income_before_tax,
+    'income_tax': lambda d: d.income_before_tax * d.tax_rate,
+    'net_income': lambda d: d.net_income,
+}
+
+_BALANCE_SHEET_ITEMS = {
+    'cash': lambda d: d.cash,
+    'accounts_receivable': lambda d: d.accounts_receivable,
+    'inventory': lambda d: d.inventory,
+    'prepaid_expenses': lambda d: d.prepaid_expenses,
+    'property_plant_equipment': lambda d: d.property_plant_equipment,
+    'accumulated_depreciation': lambda d: d.accumulated_depreciation,
+    'intangible_assets': lambda d: d.intangible_assets,
+    'total_assets': lambda d: d.total_assets,
+    'accounts_payable': lambda d: d.accounts_payable,
+    'accrued_expenses': lambda d: d.accrued_expenses,
+    'short_term_debt': lambda d: d.short_term_debt,
+    'long_term_debt': lambda d: d.long_term_debt,
+    'deferred_revenue': lambda d: d.deferred_revenue,
+    'deferred_tax_liabilities': lambda d: d.deferred_tax_liabilities,
+    'total_liabilities': lambda d: d.total_liabilities,
+    'common_stock': lambda d: d.common_stock,
+    'retained_earnings': lambda d: d.retained_earnings,
+    'treasury_stock': lambda d: d.treasury_stock,
+    'total_equity': lambda d: d.total_equity,
+    'total_liabilities_and_equity': lambda d: d.total_liabilities + d.total_equity,
+}
+
+_CASH_FLOW_ITEMS = {
+    'net_income': lambda d: d.net_income,
+    'depreciation_amortization': lambda d: d.depreciation_amortization,
+    'accounts_receivable_change': lambda d: d.accounts_receivable_change,
+    'inventory_change': lambda d: d.inventory_change,
+    'accounts_payable_change': lambda d: d.accounts_payable_change,
+    'working_capital_changes': _working_capital_changes,
+    'operating_cash_flow': _operating_cash_flow,
+    'capital_expenditures': lambda d: d.capital_expenditures,
+    'acquisitions': lambda d: d.acquisitions,
+    'investments_sold': lambda d: d.investments_sold,
+    'other_investing': lambda d: d.other_investing,
+    'investing_cash_flow': _investing_cash_flow,
+    'debt_issuance': lambda d: d.debt_issuance,
+    'debt_repayment': lambda d: d.debt_repayment,
+    'debt_activities': lambda d: d.debt_issuance - d.debt_repayment,
+    'dividends_paid': lambda d: d.dividends_paid,
+    'stock_issuance': lambda d: d.stock_issuance,
+    'stock_repurchase': lambda d: d.stock_repurchase,
+    'stock_activities': lambda d: d.stock_issuance - d.stock_repurchase,
+    'equity_bailout': lambda d: d.equity_bailout,
+    'financing_cash_flow': _financing_cash_flow,
+    'net_change_in_cash': lambda d: _operating_cash_flow(d) + _investing_cash_flow(d) + _financing_cash_flow(d),
+    'beginning_cash_balance': lambda d: d.beginning_cash_balance,
+    'ending_cash_balance': lambda d: d.ending_cash_balance,
+}
+
+# Every item keyed once; later statements take precedence, as in FinancialComparison.changes
+_COMPARISON_ITEMS = {**_INCOME_STATEMENT_ITEMS, **_BALANCE_SHEET_ITEMS, **_CASH_FLOW_ITEMS}
+
+def get_item_arrays(base, forecast, keys):
+    """
+    Evaluate comparison items over stacked financial data.
+    
+    Args:
+        base: Stacked base year FinancialData (see core.financial_arrays)
+        forecast: Stacked forecast year FinancialData
+        keys: Comparison item keys from any of the three statements
+        
+    Returns:
+        Tuple of (base, forecast) arrays of shape (rows, len(keys))
+    """
+    return (np.column_stack([_COMPARISON_ITEMS[key](base) for key in keys]),
+            np.column_stack([_COMPARISON_ITEMS[key](forecast) for key in keys]))
+
 def show_comparison_statement(parent, comparison, statement_type, base_year, forecast_year):
     """
     Show a comparison of financial statements.
@@ -314,6 +503,9 @@ def _format_balance_sheet_comparison(data, base_year, forecast_year):
     non_current_liabilities_base = data['long_term_debt']['base'] + data['deferred_tax_liabilities']['base']
     non_current_liabilities_forecast = data['long_term_debt']['forecast'] + data['deferred_tax_liabilities']['forecast']
     
+    total_liabilities_base = current_liabilities_base + non_current_liabilities_base
+    total_liabilities_forecast = current_liabilities_forecast + non_current_liabilities_forecast
+    
     total_equity_base = data['common_stock']['base'] + data['retained_earnings']['base'] - data['treasury_stock']['base']
     total_equity_forecast = data['common_stock']['forecast'] + data['retained_earnings']['forecast'] - data['treasury_stock']['forecast']
     
@@ -0,0 +1,343 @@
+"""
+Module for tranche-level debt schedules and leveraged buyout returns.
+
+Debt is modelled as a list of tranches (term loans, revolvers, bonds),
+each with its own rate, mandatory amortization and maturity. Every
+quantity is an array over scenarios, and the schedule is rolled forward
+period by period together with the vectorized forecast kernel: interest
+on opening balances feeds the income statement, and the cash left after
+dividends and capital expenditures pays mandatory amortization, repays the
+revolver and sweeps the remaining term debt.
+"""
+
+import numpy as np
+
+from analysis.forecast_kernel import forecast_step, operating_cash_flow
+from analysis.forecasting import FinancialForecast
+from analysis.valuation import bisect_roots
+from core.financial_arrays import FinancialArrays, from_financial_data
+
+# Tranche kinds
+TERM_LOAN = 'term_loan'
+REVOLVER = 'revolver'
+BOND = 'bond'
+
+# Search interval for LBO internal rates of return
+IRR_BOUNDS = (-0.99, 10.0)
+
+
+class DebtTranche:
+    """
+    A single layer of debt in the capital structure.
+    """
+
+    def __init__(self, name, balance, rate, kind=TERM_LOAN, amortization=0.0, maturity=None,
+                 sweep=None, commitment=0.0):
+        """
+        Initialize a debt tranche.
+
+        Args:
+            name: Tranche name (e.g., "Term Loan B")
+            balance: Opening balance, scalar or one per scenario
+            rate: Annual interest rate, scalar or one per scenario
+            kind: TERM_LOAN, REVOLVER or BOND
+            amortization: Mandatory repayment per period as a fraction of the opening balance
+            maturity: Period in which any remaining balance is repaid (None for beyond the horizon)
+            sweep: Whether excess cash prepays the tranche (defaults to True for term loans)
+            commitment: Maximum balance of a revolver
+        """
+        if kind not in (TERM_LOAN, REVOLVER, BOND):
+            raise ValueError(f"Unknown tranche kind: {kind}")
+        self.name = name
+        self.balance = balance
+        self.rate = rate
+        self.kind = kind
+        self.amortization = amortization
+        self.maturity = maturity
+        self.sweep = kind == TERM_LOAN if sweep is None else sweep
+        self.commitment = commitment
+
+
+class _ScheduleState:
+    """
+    Balances and per-period results of every tranche while the schedule is rolled forward.
+    """
+
+    def __init__(self, tranches, scenarios):
+        self.tranches = tranches
+        self.original = [np.broadcast_to(np.asarray(t.balance, dtype=float), (scenarios,)).copy() for t in tranches]
+        self.balances = [balance.copy() for balance in self.original]
+        self.rates = [np.broadcast_to(np.asarray(t.rate, dtype=float), (scenarios,)) for t in tranches]
+        self.history = {t.name: {key: [] for key in ('opening', 'interest', 'mandatory', 'draw', 'prepayment', 'closing')}
+                        for t in tranches}
+
+    def interest(self):
+        """Interest on the opening balances of every tranche."""
+        return [balance * rate for balance, rate in zip(self.balances, self.rates)]
+
+    def step(self, period, cash_available, interest, sweep_percent):
+        """
+        Apply one period of debt service.
+
+        Args:
+            period: Period number (1-based)
+            cash_available: Cash available for debt service, after interest
+            interest: Interest per tranche for the period
+            sweep_percent: Fraction of excess cash used to prepay sweepable tranches
+
+        Returns:
+            Tuple of (repaid, drawn, excess cash, funding gap) arrays
+        """
+        opening = [balance.copy() for balance in self.balances]
+        mandatory = []
+
+        # Mandatory amortization and repayment at maturity
+        for tranche, balance, original in zip(self.tranches, self.balances, self.original):
+            if tranche.maturity is not None and period >= tranche.maturity:
+                due = balance.copy()
+            elif tranche.kind == TERM_LOAN:
+                due = np.minimum(balance, tranche.amortization * original)
+            else:
+                due = np.zeros_like(balance)
+            balance -= due
+            mandatory.append(due)
+
+        cash = cash_available - sum(mandatory)
+
+        # Shortfalls are drawn on the revolvers, up to their commitments
+        draws = []
+        shortfall = np.maximum(-cash, 0)
+        for tranche, balance in zip(self.tranches, self.balances):
+            draw = np.zeros_like(balance)
+            if tranche.kind == REVOLVER:
+                draw = np.minimum(shortfall, np.maximum(tranche.commitment - balance, 0))
+                balance += draw
+                shortfall -= draw
+            draws.append(draw)
+        funding_gap = shortfall
+        excess = np.maximum(cash, 0)
+
+        # Excess cash repays the revolvers first, then sweeps term debt in order
+        prepayments = []
+        sweep_cash = excess * sweep_percent
+        for tranche, balance in zip(self.tranches, self.balances):
+            if tranche.kind == REVOLVER:
+                paid = np.minimum(balance, excess)
+                excess -= paid
+                sweep_cash = np.minimum(sweep_cash, excess)
+            elif tranche.sweep:
+                paid = np.minimum(balance, sweep_cash)
+                sweep_cash -= paid
+                excess -= paid
+            else:
+                paid = np.zeros_like(balance)
+            balance -= paid
+            prepayments.append(paid)
+
+        for i, tranche in enumerate(self.tranches):
+            history = self.history[tranche.name]
+            history['opening'].append(opening[i])
+            history['interest'].append(interest[i])
+            history['mandatory'].append(mandatory[i])
+            history['draw'].append(draws[i])
+            history['prepayment'].append(prepayments[i])
+            history['closing'].append(self.balances[i].copy())
+
+        repaid = sum(mandatory) + sum(prepayments)
+        return repaid, sum(draws), excess, funding_gap
+
+    def split_balances(self):
+        """Closing balances as (short-term revolver debt, long-term debt)."""
+        short_term = sum((b for t, b in zip(self.tranches, self.balances) if t.kind == REVOLVER),
+                         np.zeros_like(self.balances[0]))
+        long_term = sum((b for t, b in zip(self.tranches, self.balances) if t.kind != REVOLVER),
+                        np.zeros_like(self.balances[0]))
+        return short_term, long_term
+
+    def tranche_arrays(self):
+        """Per-tranche results as (scenarios, periods) arrays."""
+        return {
+            name: {key: np.column_stack(values) for key, values in history.items()}
+            for name, history in self.history.items()
+        }
+
+
+def _scenario_count(*values):
+    """Number of scenarios implied by the array-valued inputs."""
+    sizes = {np.size(value) for value in values if np.ndim(value) > 0}
+    if len(sizes) > 1:
+        raise ValueError("Scenario arrays must all have the same length")
+    return sizes.pop() if sizes else 1
+
+
+def project_with_debt_schedule(base_data, tranches, periods, assumptions=None, sweep_percent=1.0):
+    """
+    Forecast a company with its debt modelled tranche by tranche.
+
+    The tranches replace the base period's short- and long-term debt
+    (revolvers as short-term). Each period, interest on opening balances
+    becomes the forecast's interest expense; operating cash flow less
+    capital expenditures and dividends then services the debt.
+
+    Args:
+        base_data: FinancialData for the base period
+        tranches: List of DebtTranche objects, in sweep order
+        periods: Number of periods to project
+        assumptions: Optional FinancialForecast assumption overrides, scalars or one per scenario
+        sweep_percent: Fraction of excess cash used to prepay sweepable tranches
+
+    Returns:
+        Dictionary with 'forecasts' (list of per-period field arrays), 'tranches'
+        (per-tranche opening, interest, mandatory, draw, prepayment and closing
+        arrays of shape (scenarios, periods)), and 'interest_expense', 'total_debt',
+        'excess_cash' (cumulative) and 'funding_gap' arrays of the same shape
+    """
+    model_assumptions = dict(FinancialForecast(base_data).assumptions)
+    if assumptions:
+        model_assumptions.update(assumptions)
+
+    scenarios = _scenario_count(*model_assumptions.values(),
+                                *[t.balance for t in tranches], *[t.rate for t in tranches])
+    model_assumptions = {name: np.broadcast_to(np.asarray(value, dtype=float), (scenarios,))
+                         for name, value in model_assumptions.items()}
+    model_assumptions['debt_repayment'] = np.zeros(scenarios)
+    model_assumptions['new_borrowing'] = np.zeros(scenarios)
+
+    base = base_data if isinstance(base_data, FinancialArrays) else from_financial_data([base_data])
+    current = {name: np.broadcast_to(values, (scenarios,)).copy() if len(values) == 1 else values
+               for name, values in base.columns.items()}
+
+    state = _ScheduleState(tranches, scenarios)
+    current['short_term_debt'], current['long_term_debt'] = state.split_balances()
+
+    forecasts = []
+    interest_expense = []
+    total_debt = []
+    excess_cash = []
+    funding_gaps = []
+    cumulative_excess = np.zeros(scenarios)
+
+    for period in range(1, periods + 1):
+        interest = state.interest()
+        period_assumptions = dict(model_assumptions)
+        period_assumptions['interest_expense'] = sum(interest)
+        f = forecast_step(current, period_assumptions)
+
+        # Cash available for debt service; interest is already deducted through net income
+        operating = operating_cash_flow(f)
+        cash_available = operating - f['capital_expenditures'] - f['dividends_paid']
+        repaid, drawn, excess, funding_gap = state.step(period, cash_available, interest, sweep_percent)
+
+        f['debt_repayment'] = repaid
+        f['debt_issuance'] = drawn
+        f['short_term_debt'], f['long_term_debt'] = state.split_balances()
+        investing = -f['capital_expenditures'] - f['acquisitions'] + f['investments_sold'] + f['other_investing']
+        financing = (f['debt_issuance'] - f['debt_repayment'] - f['dividends_paid'] + f['stock_issuance'] -
+                     f['stock_repurchase'] + f['other_financing'])
+        f['ending_cash_balance'] = f['beginning_cash_balance'] + operating + investing + financing
+
+        cumulative_excess = cumulative_excess + excess
+        forecasts.append(f)
+        interest_expense.append(f['interest_expense'])
+        total_debt.append(f['short_term_debt'] + f['long_term_debt'])
+        excess_cash.append(cumulative_excess)
+        funding_gaps.append(funding_gap)
+        current = f
+
+    return {
+        'forecasts': forecasts,
+        'tranches': state.tranche_arrays(),
+        'interest_expense': np.column_stack(interest_expense),
+        'total_debt': np.column_stack(total_debt),
+        'excess_cash': np.column_stack(excess_cash),
+        'funding_gap': np.column_stack(funding_gaps),
+    }
+
+
+def _ebitda(forecast):
+    """EBITDA of forecast field arrays, as FinancialData.ebitda."""
+    return FinancialArrays(forecast).as_financial_data().ebitda
+
+
+def lbo_returns(base_data, tranches, entry_multiples, exit_multiples, periods=5, assumptions=None,
+                sweep_percent=1.0, transaction_fees=0.0):
+    """
+    Calculate sponsor IRR and MOIC over a grid of entry and exit EV/EBITDA multiples.
+
+    The purchase price is the entry multiple times base EBITDA plus fees,
+    funded by the tranches and sponsor equity. At exit the business is sold
+    at the exit multiple times final-year EBITDA; equity receives that value
+    less remaining debt plus accumulated excess cash. Dividends paid along
+    the way are interim equity cash flows.
+
+    Args:
+        base_data: FinancialData for the entry year
+        tranches: List of DebtTranche objects funding the purchase
+        entry_multiples: Entry EV/EBITDA multiples, shape (E,)
+        exit_multiples: Exit EV/EBITDA multiples, shape (X,)
+        periods: Holding period in years
+        assumptions: Optional forecast assumption overrides, scalars or one per scenario
+            (dividend_payout defaults to 0 for a buyout)
+        sweep_percent: Fraction of excess cash used to prepay sweepable tranches
+        transaction_fees: Fees paid at entry, funded with equity
+
+    Returns:
+        Dictionary with 'irr' and 'moic' arrays of shape (scenarios, E, X),
+        'equity_invested' (scenarios, E), 'exit_equity' (scenarios, X) and the
+        underlying 'schedule'
+    """
+    lbo_assumptions = {'dividend_payout': 0.0}
+    if assumptions:
+        lbo_assumptions.update(assumptions)
+    schedule = project_with_debt_schedule(base_data, tranches, periods, lbo_assumptions, sweep_percent)
+
+    entry_multiples = np.atleast_1d(np.asarray(entry_multiples, dtype=float))
+    exit_multiples = np.atleast_1d(np.asarray(exit_multiples, dtype=float))
+
+    # Entry: purchase price less debt raised
+    scenarios = schedule['total_debt'].shape[0]
+    debt_raised = np.zeros(scenarios)
+    for history in schedule['tranches'].values():
+        debt_raised = debt_raised + history['opening'][:, 0]
+    equity_invested = entry_multiples[None, :] * base_data.ebitda + transaction_fees - debt_raised[:, None]
+
+    # Exit: enterprise value less net debt
+    final = schedule['forecasts'][-1]
+    exit_value = exit_multiples[None, :] * _ebitda(final)[:, None]
+    exit_equity = exit_value - schedule['total_debt'][:, -1, None] + schedule['excess_cash'][:, -1, None]
+
+    dividends = np.column_stack([f['dividends_paid'] for f in schedule['forecasts']])    # (S, T)
+    proceeds = dividends.sum(axis=1)[:, None, None] + exit_equity[:, None, :]           # (S, 1, X)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        moic = np.where(equity_invested[:, :, None] > 0, proceeds / equity_invested[:, :, None], np.nan)
+
+    # IRR: solve NPV = 0 for every scenario, entry and exit multiple at once
+    shape = moic.shape
+    invested = np.broadcast_to(equity_invested[:, :, None], shape).ravel()
+    exit_flows = np.broadcast_to(exit_equity[:, None, :], shape).ravel()
+    interim = np.repeat(dividends, shape[1] * shape[2], axis=0)                           # (S*E*X, T)
+
+    def npv(rate):
+        # Discount factors by repeated multiplication rather than a power per period
+        factor = 1 / (1 + rate)
+        discount = factor.copy()
+        value = -invested
+        for period in range(periods):
+            value = value + interim[:, period] * discount
+            if period < periods - 1:
+                discount = discount * factor
+        return value + exit_flows * discount
+
+    irr, _, _ = bisect_roots(npv, np.full(invested.shape, IRR_BOUNDS[0]), np.full(invested.shape, IRR_BOUNDS[1]))
+    irr = np.where(invested > 0, irr, np.nan).reshape(shape)
+
+    return {
+        'irr': irr,
+        'moic': moic,
+        'entry_multiples': entry_multiples,
+        'exit_multiples': exit_multiples,
+        'equity_invested': equity_invested,
+        'exit_equity': exit_equity,
+        'schedule': schedule,
+    }
@@ -0,0 +1,233 @@
+"""
+Module for look-through exposure of a fund portfolio.
+
+Each breakdown kind (sector, country, currency) is stored as a sparse
+fund x category matrix in compressed sparse row form: for every fund, the
+categories it reports and their weights. Portfolio exposure is the
+product of the holding weights with that matrix, computed with a single
+bincount over the non-zero entries. When one position changes, only that
+fund's row is applied to the running totals, so rebalancing a holding
+costs as much as the fund has categories, not the whole portfolio.
+"""
+
+import numpy as np
+
+from core.formatting import format_percentage
+
+# Breakdown kinds aggregated by default
+EXPOSURE_KINDS = ('sector', 'country', 'currency')
+
+# Category used for holding weight not covered by a fund's breakdown
+UNCLASSIFIED = 'Unclassified'
+
+# Labels that different fund providers use for the same category
+CATEGORY_ALIASES = {
+    'Technology': 'Information Technology',
+    'Telecommunication': 'Communication Services',
+    'Basic Materials': 'Materials',
+    'Others': 'Other',
+}
+
+
+class _BreakdownMatrix:
+    """
+    Fund x category weights of one breakdown kind, in CSR form.
+    """
+
+    def __init__(self):
+        self.categories = []
+        self.category_index = {}
+        self.indptr = np.zeros(1, dtype=np.int64)
+        self.indices = np.empty(0, dtype=np.int64)
+        self.data = np.empty(0)
+
+    def _category(self, label):
+        label = CATEGORY_ALIASES.get(label, label)
+        if label not in self.category_index:
+            self.category_index[label] = len(self.categories)
+            self.categories.append(label)
+        return self.category_index[label]
+
+    def append_row(self, breakdown):
+        """Add a fund's breakdown ({label: weight}) as the next row."""
+        columns = {}
+        for label, weight in (breakdown or {}).items():
+            column = self._category(label)
+            columns[column] = columns.get(column, 0.0) + weight
+        self.indices = np.concatenate([self.indices, np.fromiter(columns, dtype=np.int64, count=len(columns))])
+        self.data = np.concatenate([self.data, np.fromiter(columns.values(), dtype=float, count=len(columns))])
+        self.indptr = np.append(self.indptr, len(self.indices))
+
+    def row(self, fund):
+        """Column indices and weights of one fund."""
+        start, end = self.indptr[fund], self.indptr[fund + 1]
+        return self.indices[start:end], self.data[start:end]
+
+    def matvec(self, weights):
+        """Exposure per category for one vector of fund weights."""
+        rows = np.repeat(np.arange(len(self.indptr) - 1), np.diff(self.indptr))
+        return np.bincount(self.indices, weights=self.data * weights[rows], minlength=len(self.categories))
+
+    def matmat(self, weights):
+        """Exposure per category for each row of a (scenarios, funds) weight matrix."""
+        scenarios = weights.shape[0]
+        columns = len(self.categories)
+        rows = np.repeat(np.arange(len(self.indptr) - 1), np.diff(self.indptr))
+        flat = (np.arange(scenarios)[:, None] * columns + self.indices[None, :]).ravel()
+        values = (weights[:, rows] * self.data[None, :]).ravel()
+        return np.bincount(flat, weights=values, minlength=scenarios * columns).reshape(scenarios, columns)
+
+
+class ExposureEngine:
+    """
+    Look-through sector, country and currency exposure of a portfolio.
+    """
+
+    def __init__(self, holdings=(), kinds=EXPOSURE_KINDS):
+        """
+        Initialize the engine.
+
+        Args:
+            holdings: Holding objects (ticker, weight and breakdowns), e.g. from
+                load_compounding_workbook(...).holdings
+            kinds: Breakdown kinds to aggregate
+        """
+        self.kinds = tuple(kinds)
+        self.tickers = []
+        self.fund_index = {}
+        self.weights = np.empty(0)
+        self._matrices = {kind: _BreakdownMatrix() for kind in self.kinds}
+        self._totals = {kind: np.empty(0) for kind in self.kinds}
+        for holding in holdings:
+            self.add_holding(holding.ticker, holding.weight, holding.breakdowns)
+
+    def __len__(self):
+        return len(self.tickers)
+
+    def __contains__(self, ticker):
+        return ticker in self.fund_index
+
+    def add_holding(self, ticker, weight, breakdowns=None):
+        """
+        Add a fund to the portfolio.
+
+        Args:
+            ticker: Fund ticker
+            weight: Portfolio weight
+            breakdowns: Dictionary mapping breakdown kinds to {label: weight}
+
+        Raises:
+            ValueError: If the fund is already held
+        """
+        if ticker in self.fund_index:
+            raise ValueError(f"Fund already in portfolio: {ticker}")
+        self.fund_index[ticker] = len(self.tickers)
+        self.tickers.append(ticker)
+        self.weights = np.append(self.weights, 0.0)
+
+        breakdowns = breakdowns or {}
+        for kind, matrix in self._matrices.items():
+            matrix.append_row(breakdowns.get(kind))
+            totals = self._totals[kind]
+            if len(totals) < len(matrix.categories):
+                self._totals[kind] = np.concatenate([totals, np.zeros(len(matrix.categories) - len(totals))])
+
+        self.set_weight(ticker, weight)
+
+    def set_weight(self, ticker, weight):
+        """
+        Change the weight of one fund, updating exposures incrementally.
+
+        Args:
+            ticker: Fund ticker
+            weight: New portfolio weight (0 to close the position)
+        """
+        fund = self.fund_index[ticker]
+        delta = weight - self.weights[fund]
+        if not delta:
+            return
+        self.weights[fund] = weight
+        for kind, matrix in self._matrices.items():
+            columns, values = matrix.row(fund)
+            self._totals[kind][columns] += delta * values
+
+    def update_weights(self, weights):
+        """
+        Change the weights of several funds.
+
+        Args:
+            weights: Dictionary mapping tickers to new weights
+        """
+        for ticker, weight in weights.items():
+            self.set_weight(ticker, weight)
+
+    def recompute(self):
+        """
+        Recompute every exposure from scratch, discarding accumulated rounding.
+        """
+        for kind, matrix in self._matrices.items():
+            self._totals[kind] = matrix.matvec(self.weights)
+
+    def categories(self, kind):
+        """Category labels of a breakdown kind, in matrix column order."""
+        return list(self._matrices[kind].categories)
+
+    def exposure_array(self, kind):
+        """Exposure per category of a breakdown kind, in matrix column order."""
+        return self._totals[kind].copy()
+
+    def unclassified(self, kind):
+        """Portfolio weight not covered by the funds' breakdowns of a kind."""
+        return float(self.weights.sum() - self._totals[kind].sum())
+
+    def exposure(self, kind, include_unclassified=True):
+        """
+        Get the look-through exposure of a breakdown kind.
+
+        Args:
+            kind: Breakdown kind ('sector', 'country' or 'currency')
+            include_unclassified: Whether to report uncovered weight as UNCLASSIFIED
+
+        Returns:
+            Dictionary mapping category labels to portfolio weights, largest first
+        """
+        matrix = self._matrices[kind]
+        totals = self._totals[kind]
+        order = np.argsort(-totals, kind='stable')
+        result = {matrix.categories[column]: float(totals[column]) for column in order.tolist()}
+        if include_unclassified:
+            result[UNCLASSIFIED] = self.unclassified(kind)
+        return result
+
+    def scenario_exposures(self, kind, weights):
+        """
+        Calculate exposures for many alternative weightings at once.
+
+        Args:
+            kind: Breakdown kind
+            weights: Array of shape (scenarios, funds), columns in self.tickers order
+
+        Returns:
+            Array of shape (scenarios, categories), columns in categories(kind) order
+        """
+        return self._matrices[kind].matmat(np.atleast_2d(np.asarray(weights, dtype=float)))
+
+    def format_exposure(self, kind, top=None):
+        """
+        Format an exposure table for display.
+
+        Args:
+            kind: Breakdown kind
+            top: Optional number of largest categories to show
+
+        Returns:
+            str: One line per category
+        """
+        exposure = self.exposure(kind, include_unclassified=False)
+        items = list(exposure.items())[:top] if top else list(exposure.items())
+        lines = [f"{kind.title()} Exposure", ""]
+        lines.extend(f"{label:<30} {format_percentage(weight):>8}" for label, weight in items)
+        unclassified = self.unclassified(kind)
+        if unclassified > 1e-12:
+            lines.append(f"{UNCLASSIFIED:<30} {format_percentage(unclassified):>8}")
+        return "\n".join(lines)
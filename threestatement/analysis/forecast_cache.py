@@ -0,0 +1,349 @@
+"""
+Content-addressed memo cache for forecast results.
+
+A forecast is keyed by a SHA-256 hash of everything it depends on: the
+base FinancialData fields, the assumptions dictionary and the segment
+model, if any. Results are stored pickled, so every hit returns a fresh
+object that callers may modify freely. The first tier is an in-memory LRU
+bounded by the total size of the pickles. An optional second tier is a
+directory of files written atomically, so it can be shared by concurrent
+processes and survives between runs.
+
+FinancialForecast.generate_forecast consults the default cache, which is
+off unless set_default_cache is called or THREESTATEMENT_FORECAST_CACHE
+names a cache directory.
+"""
+
+from collections import OrderedDict
+import hashlib
+import marshal
+import os
+import pickle
+import tempfile
+import threading
+
+import numpy as np
+
+# Bump when the forecast formulas change, so stale disk entries are not reused
+CACHE_VERSION = 1
+
+# Default in-memory budget in bytes
+DEFAULT_MEMORY_BYTES = 64 * 1024 * 1024
+
+_DIRECTORY_VARIABLE = 'THREESTATEMENT_FORECAST_CACHE'
+
+# Values serialized as they are
+_SCALAR_TYPES = (float, int, str, bool, type(None))
+
+_MARSHAL_VERSION = 2
+
+
+def _canonical(value):
+    """
+    Convert inputs to nested tuples that serialize the same way for equal contents.
+
+    Dictionaries are sorted by key, arrays are spelled out in full with their
+    dtype and shape, and other objects are replaced by their class name and fields.
+    """
+    if isinstance(value, dict):
+        return tuple((key, item if type(item) in _SCALAR_TYPES else _canonical(item))
+                     for key, item in sorted(value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(item if type(item) in _SCALAR_TYPES else _canonical(item) for item in value)
+    if isinstance(value, np.ndarray):
+        return ('ndarray', str(value.dtype), value.shape, value.tolist())
+    if isinstance(value, np.generic):
+        return value.item()
+    if hasattr(value, '__dict__'):
+        return (type(value).__name__, _canonical(vars(value)))
+    return value
+
+
+def forecast_key(base_data, assumptions, segments=None, kind='forecast'):
+    """
+    Compute the content hash of a forecast's inputs.
+
+    Args:
+        base_data: FinancialData for the base period
+        assumptions: Assumptions dictionary
+        segments: Optional SegmentModel
+        kind: Name of the computation (e.g. 'forecast', 'periods:5')
+
+    Returns:
+        str: Hex SHA-256 digest
+    """
+    # marshal version 2 writes no back-references, so its output depends only on the values
+    document = marshal.dumps((CACHE_VERSION, kind, _canonical(base_data), _canonical(assumptions),
+                              _canonical(segments)), _MARSHAL_VERSION)
+    return hashlib.sha256(document).hexdigest()
+
+
+class LRUByteCache:
+    """
+    In-memory least-recently-used cache bounded by the total size of its values.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MEMORY_BYTES):
+        """
+        Initialize the cache.
+
+        Args:
+            max_bytes: Maximum total size of the stored values
+        """
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key):
+        """
+        Look up a value.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            bytes, or None on a miss
+        """
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """
+        Store a value, evicting the least recently used entries to stay within budget.
+
+        Values larger than the whole budget are not stored.
+
+        Args:
+            key: Cache key
+            value: bytes
+        """
+        size = len(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= len(previous)
+            self._entries[key] = value
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.bytes -= len(evicted)
+                self.evictions += 1
+
+    def clear(self):
+        """Remove every entry."""
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        """Get entry, byte, hit, miss and eviction counts."""
+        return {
+            'entries': len(self._entries),
+            'bytes': self.bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+
+class DiskCache:
+    """
+    Directory of cached values, one file per key, safe for concurrent processes.
+    """
+
+    def __init__(self, directory):
+        """
+        Initialize the cache, creating the directory if needed.
+
+        Args:
+            directory: Cache directory
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + '.pkl')
+
+    def get(self, key):
+        """
+        Read a value.
+
+        Returns:
+            bytes, or None on a miss
+        """
+        try:
+            with open(self._path(key), 'rb') as f:
+                value = f.read()
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """
+        Write a value atomically: readers see the old file or the new one, never a partial write.
+
+        Args:
+            key: Cache key
+            value: bytes
+        """
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        descriptor, temporary = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(descriptor, 'wb') as f:
+                f.write(value)
+            os.replace(temporary, path)
+        except BaseException:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            raise
+
+    def prune(self, max_bytes):
+        """
+        Delete the least recently written files until the directory fits a size budget.
+
+        Args:
+            max_bytes: Maximum total size to keep
+
+        Returns:
+            int: Number of files removed
+        """
+        files = []
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if name.endswith('.pkl'):
+                    path = os.path.join(root, name)
+                    status = os.stat(path)
+                    files.append((status.st_mtime, status.st_size, path))
+        total = sum(size for _, size, _ in files)
+        removed = 0
+        for _, size, path in sorted(files):
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        return removed
+
+
+class ForecastCache:
+    """
+    Two-tier memo cache for forecast results.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MEMORY_BYTES, directory=None):
+        """
+        Initialize the cache.
+
+        Args:
+            max_bytes: In-memory budget in bytes
+            directory: Optional directory for the shared on-disk tier
+        """
+        self.memory = LRUByteCache(max_bytes)
+        self.disk = DiskCache(directory) if directory else None
+
+    def get(self, key):
+        """
+        Look up a result, promoting disk hits to memory.
+
+        Returns:
+            The unpickled result, or None on a miss
+        """
+        value = self.memory.get(key)
+        if value is None and self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                self.memory.put(key, value)
+        return pickle.loads(value) if value is not None else None
+
+    def put(self, key, result):
+        """
+        Store a result in both tiers.
+
+        Args:
+            key: Cache key
+            result: Picklable result
+        """
+        value = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        self.memory.put(key, value)
+        if self.disk is not None:
+            self.disk.put(key, value)
+
+    def get_or_compute(self, key, compute):
+        """
+        Return the cached result for a key, computing and storing it on a miss.
+
+        Args:
+            key: Cache key
+            compute: Function of no arguments producing the result
+
+        Returns:
+            The result (a fresh copy on a hit)
+        """
+        result = self.get(key)
+        if result is None:
+            result = compute()
+            self.put(key, result)
+        return result
+
+    def stats(self):
+        """Get the statistics of both tiers."""
+        stats = {'memory': self.memory.stats()}
+        if self.disk is not None:
+            stats['disk'] = {'directory': self.disk.directory, 'hits': self.disk.hits, 'misses': self.disk.misses}
+        return stats
+
+
+_default_cache = None
+
+
+def set_default_cache(cache):
+    """
+    Set the cache used by FinancialForecast.
+
+    Args:
+        cache: ForecastCache, or None to disable caching
+    """
+    global _default_cache
+    _default_cache = cache
+
+
+def get_default_cache():
+    """Get the cache used by FinancialForecast (None when caching is off)."""
+    return _default_cache
+
+
+def _configure_from_environment():
+    """Use a disk-backed default cache when THREESTATEMENT_FORECAST_CACHE names a directory."""
+    directory = os.environ.get(_DIRECTORY_VARIABLE)
+    if directory:
+        set_default_cache(ForecastCache(directory=directory))
+
+
+_configure_from_environment()
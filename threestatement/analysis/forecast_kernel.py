@@ -0,0 +1,309 @@
+"""
+Vectorized forecasting kernel.
+
+forecast_step applies the same formulas as FinancialForecast's
+_forecast_income_statement, _forecast_balance_sheet and _forecast_cash_flow,
+in the same order, to column arrays instead of a single FinancialData.
+Assumptions may be scalars or arrays, so one call forecasts a whole
+universe, a set of scenarios, or every candidate of a solver iteration.
+Fixed-point bases (amounts in int64 cents) are forecast in cents, with
+every period rounded to whole cents so the statement identities stay exact.
+apply_events adds one-off write-downs, debt forgiveness and equity
+injections to a forecast period, for stress scenarios.
+"""
+
+import numpy as np
+
+from core.financial_arrays import FinancialArrays
+from core.fixed_point import CENTS_PER_UNIT, is_amount_field, round_cents
+from core.instrumentation import instrumented
+
+
+# Assumptions given per business segment, shape (segments,) or (segments, rows)
+SEGMENT_ASSUMPTIONS = ('segment_growth', 'segment_cogs_percent')
+
+# Assumptions that are amounts, scaled to cents for fixed-point forecasts
+MONEY_ASSUMPTIONS = ('debt_repayment', 'new_borrowing', 'interest_expense')
+
+# One-off events, as fractions of prior-period balances (see apply_events)
+EVENT_FIELDS = ('goodwill_impairment', 'ppe_write_down', 'debt_write_down', 'equity_bailout')
+
+# Working capital balances whose period-over-period change is reported in the cash flow statement
+_CHANGE_FIELDS = ('accounts_receivable', 'inventory', 'accounts_payable', 'accrued_expenses', 'deferred_revenue')
+
+
+def _assumption_arrays(assumptions, rows):
+    """Broadcast every assumption to one value per row (per segment and row for segment assumptions)."""
+    arrays = {}
+    for name, value in assumptions.items():
+        value = np.asarray(value, dtype=float)
+        if name in SEGMENT_ASSUMPTIONS:
+            arrays[name] = np.broadcast_to(value[:, None] if value.ndim == 1 else value, (len(value), rows))
+        else:
+            arrays[name] = np.broadcast_to(value, (rows,))
+    return arrays
+
+
+def forecast_step(base, assumptions):
+    """
+    Forecast one period for every row.
+
+    Args:
+        base: Dictionary mapping FinancialData field names to arrays for the prior period
+        assumptions: Dictionary of FinancialForecast assumptions, scalars or arrays per row;
+            an 'interest_expense' entry replaces total debt times interest_rate
+            and, when the base has a 'segment_revenue' array of shape (segments, rows),
+            'segment_growth' and 'segment_cogs_percent' replace revenue_growth and cogs_percent
+
+    Returns:
+        Dictionary of arrays for the forecast period (fields the forecast does not
+        touch are carried over from the base)
+    """
+    a = assumptions
+    f = dict(base)
+
+    # Income statement
+    if 'segment_revenue' in base:
+        # Revenue and COGS built up from the business segments
+        f['segment_revenue'] = base['segment_revenue'] * (1 + a['segment_growth'])
+        f['revenue'] = f['segment_revenue'].sum(axis=0)
+        f['cogs'] = (f['segment_revenue'] * a['segment_cogs_percent']).sum(axis=0)
+        # Growth implied by the segments, for the balance sheet items that follow revenue
+        revenue_growth = np.divide(f['revenue'], base['revenue'], out=np.ones(np.shape(f['revenue'])),
+                                   where=base['revenue'] != 0) - 1
+    else:
+        f['revenue'] = base['revenue'] * (1 + a['revenue_growth'])
+        f['cogs'] = f['revenue'] * a['cogs_percent']
+        revenue_growth = a['revenue_growth']
+    f['operating_expenses'] = base['operating_expenses'] * (1 + a['opex_growth'])
+    if 'interest_expense' in a:
+        # Interest supplied by a debt schedule
+        f['interest_expense'] = np.asarray(a['interest_expense'], dtype=float)
+    else:
+        total_debt = base['short_term_debt'] + base['long_term_debt']
+        f['interest_expense'] = total_debt * a['interest_rate']
+    f['tax_rate'] = np.broadcast_to(a['tax_rate'], f['revenue'].shape).astype(float)
+    gross_profit = f['revenue'] - f['cogs']
+    operating_income = gross_profit - f['operating_expenses']
+    ebt = operating_income - f['interest_expense']
+    income_tax = ebt * f['tax_rate']
+    f['net_income'] = ebt - income_tax
+
+    # No write-downs or bailouts unless applied by apply_events
+    zeros = np.zeros_like(f['revenue'])
+    for name in EVENT_FIELDS:
+        f[name] = zeros
+
+    # Balance sheet
+    f['cash'] = f['revenue'] * a['cash_percent']
+    f['accounts_receivable'] = f['revenue'] * (a['ar_days'] / 365)
+    f['inventory'] = f['cogs'] * (a['inventory_days'] / 365)
+    f['prepaid_expenses'] = base['prepaid_expenses'] * (1 + revenue_growth)
+    capex = f['revenue'] * a['capex_percent']
+    f['property_plant_equipment'] = base['property_plant_equipment'] + capex
+    new_depreciation = f['property_plant_equipment'] * a['depreciation_rate']
+    f['accumulated_depreciation'] = base['accumulated_depreciation'] + new_depreciation
+    f['accounts_payable'] = f['cogs'] * (a['ap_days'] / 365)
+    f['accrued_expenses'] = base['accrued_expenses'] * (1 + a['opex_growth'])
+    f['long_term_debt'] = base['long_term_debt'] - a['debt_repayment'] + a['new_borrowing']
+    f['deferred_revenue'] = base['deferred_revenue'] * (1 + revenue_growth)
+    dividends = f['net_income'] * a['dividend_payout']
+    f['retained_earnings'] = base['retained_earnings'] + f['net_income'] - dividends
+
+    # Cash flow
+    f['depreciation_amortization'] = f['property_plant_equipment'] * a['depreciation_rate']
+    f['accounts_receivable_change'] = f['accounts_receivable'] - base['accounts_receivable']
+    f['inventory_change'] = f['inventory'] - base['inventory']
+    f['accounts_payable_change'] = f['accounts_payable'] - base['accounts_payable']
+    f['accrued_expenses_change'] = f['accrued_expenses'] - base['accrued_expenses']
+    f['deferred_revenue_change'] = f['deferred_revenue'] - base['deferred_revenue']
+
+    f['capital_expenditures'] = f['revenue'] * a['capex_percent']
+    f['acquisitions'] = zeros
+    f['investments_sold'] = zeros
+    f['other_investing'] = zeros
+    f['debt_issuance'] = zeros + a['new_borrowing']
+    f['debt_repayment'] = zeros + a['debt_repayment']
+    f['dividends_paid'] = f['net_income'] * a['dividend_payout']
+    f['stock_issuance'] = zeros
+    f['stock_repurchase'] = zeros
+    f['other_financing'] = zeros
+    f['beginning_cash_balance'] = base['ending_cash_balance']
+
+    operating_cash_flow = (f['net_income'] + f['depreciation_amortization'] - f['accounts_receivable_change'] -
+                           f['inventory_change'] + f['accounts_payable_change'] + f['accrued_expenses_change'] +
+                           f['deferred_revenue_change'])
+    investing_cash_flow = -f['capital_expenditures'] - f['acquisitions'] + f['investments_sold'] + f['other_investing']
+    financing_cash_flow = (f['debt_issuance'] - f['debt_repayment'] - f['dividends_paid'] + f['stock_issuance'] -
+                           f['stock_repurchase'] + f['other_financing'])
+    f['ending_cash_balance'] = f['beginning_cash_balance'] + operating_cash_flow + investing_cash_flow + financing_cash_flow
+
+    return f
+
+
+def _round_step(base, forecast):
+    """
+    Round a forecast period computed from a fixed-point base to whole cents.
+
+    Every amount is rounded once, then the lines defined as sums or
+    differences of other lines are recomputed from the rounded values in
+    integer arithmetic, so the roll-forwards and the cash flow statement
+    reconcile exactly.
+
+    Args:
+        base: Dictionary of fixed-point field arrays for the prior period
+        forecast: Dictionary of field arrays returned by forecast_step for that base
+
+    Returns:
+        Dictionary of fixed-point field arrays
+    """
+    f = {name: round_cents(values) if is_amount_field(name) and values.dtype.kind == 'f' else values
+         for name, values in forecast.items()}
+    if 'segment_revenue' in f:
+        f['revenue'] = f['segment_revenue'].sum(axis=0)
+
+    f['property_plant_equipment'] = (base['property_plant_equipment'] + f['capital_expenditures'] -
+                                     f['ppe_write_down'])
+    f['accumulated_depreciation'] = base['accumulated_depreciation'] + f['depreciation_amortization']
+    f['goodwill'] = base['goodwill'] - f['goodwill_impairment']
+    f['long_term_debt'] = base['long_term_debt'] - f['debt_repayment'] + f['debt_issuance'] - f['debt_write_down']
+    f['retained_earnings'] = base['retained_earnings'] + f['net_income'] - f['dividends_paid']
+    f['additional_paid_in_capital'] = base['additional_paid_in_capital'] + f['equity_bailout']
+    for name in _CHANGE_FIELDS:
+        f[name + '_change'] = f[name] - base[name]
+
+    investing_cash_flow = -f['capital_expenditures'] - f['acquisitions'] + f['investments_sold'] + f['other_investing']
+    financing_cash_flow = (f['debt_issuance'] - f['debt_repayment'] - f['dividends_paid'] + f['stock_issuance'] -
+                           f['stock_repurchase'] + f['equity_bailout'] + f['other_financing'])
+    f['ending_cash_balance'] = (f['beginning_cash_balance'] + operating_cash_flow(f) + investing_cash_flow +
+                                financing_cash_flow)
+    return f
+
+
+@instrumented('kernel.forecast_periods')
+def forecast_periods(base, assumptions, periods, fixed_point=None):
+    """
+    Roll the forecast forward several periods for every row.
+
+    Args:
+        base: FinancialArrays, or dictionary of field arrays for the base period
+        assumptions: Dictionary of assumptions, scalars or arrays per row
+        periods: Number of periods to forecast
+        fixed_point: Whether the base is in fixed-point cents (default: the
+            fixed_point flag of a FinancialArrays base, False for dictionaries);
+            money assumptions stay in currency units either way
+
+    Returns:
+        List of dictionaries of field arrays, one per period (int64 cents for
+        the amounts of a fixed-point forecast)
+    """
+    if fixed_point is None:
+        fixed_point = isinstance(base, FinancialArrays) and base.fixed_point
+    columns = base.columns if isinstance(base, FinancialArrays) else base
+    rows = len(columns['revenue'])
+    if fixed_point:
+        assumptions = {name: np.asarray(value, dtype=float) * CENTS_PER_UNIT if name in MONEY_ASSUMPTIONS else value
+                       for name, value in assumptions.items()}
+    assumptions = _assumption_arrays(assumptions, rows)
+
+    forecasts = []
+    current = columns
+    for _ in range(periods):
+        step = forecast_step(current, assumptions)
+        current = _round_step(current, step) if fixed_point else step
+        forecasts.append(current)
+    return forecasts
+
+
+def apply_events(base, forecast, events, dividend_payout):
+    """
+    Apply one-off events to a forecast period for every row.
+
+    goodwill_impairment and ppe_write_down write off that fraction of the
+    prior period's goodwill and net PP&E, and debt_write_down forgives that
+    fraction of its long-term debt, a gain. Their after-tax amount flows
+    through net income, dividends and retained earnings, but as non-cash
+    items they are added back in operating cash flow, so only the tax and
+    dividend effects move cash. equity_bailout is a minimum ending cash
+    balance as a fraction of revenue (NaN for none): any shortfall after the
+    other events is met by new paid-in capital.
+
+    Args:
+        base: Dictionary of field arrays for the prior period
+        forecast: Dictionary of field arrays returned by forecast_step for that base
+        events: Dictionary mapping EVENT_FIELDS names to fractions, scalars or one per row
+        dividend_payout: Dividend payout ratio of the forecast, scalar or one per row
+
+    Returns:
+        Dictionary of field arrays for the forecast period after the events
+        (whole cents for a fixed-point forecast)
+    """
+    unknown = [name for name in events if name not in EVENT_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown events: {', '.join(unknown)}")
+    f = dict(forecast)
+    rows = len(f['revenue'])
+    fractions = {name: np.broadcast_to(np.asarray(events.get(name, 0.0), dtype=float), (rows,))
+                 for name in EVENT_FIELDS}
+    fixed_point = f['revenue'].dtype.kind == 'i'
+
+    def amount(values):
+        return round_cents(values) if fixed_point else values
+
+    impairment = amount(base['goodwill'] * fractions['goodwill_impairment'])
+    net_ppe = base['property_plant_equipment'] - base['accumulated_depreciation']
+    write_down = amount(net_ppe * fractions['ppe_write_down'])
+    forgiven = amount(base['long_term_debt'] * fractions['debt_write_down'])
+
+    # Taxed at the forecast rate; dividends follow net income
+    pre_tax = forgiven - impairment - write_down
+    net_change = amount(pre_tax * (1 - f['tax_rate']))
+    dividend_change = amount(net_change * dividend_payout)
+    f['goodwill_impairment'] = impairment
+    f['ppe_write_down'] = write_down
+    f['debt_write_down'] = forgiven
+    f['net_income'] = f['net_income'] + net_change
+    f['dividends_paid'] = f['dividends_paid'] + dividend_change
+    f['retained_earnings'] = f['retained_earnings'] + net_change - dividend_change
+    f['goodwill'] = f['goodwill'] - impairment
+    f['property_plant_equipment'] = f['property_plant_equipment'] - write_down
+    f['long_term_debt'] = f['long_term_debt'] - forgiven
+    ending_cash = f['ending_cash_balance'] + net_change - pre_tax - dividend_change
+
+    bailout = np.zeros_like(ending_cash)
+    if 'equity_bailout' in events:
+        shortfall = f['revenue'] * fractions['equity_bailout'] - ending_cash
+        bailout = amount(np.fmax(shortfall, 0))
+    f['equity_bailout'] = bailout
+    f['additional_paid_in_capital'] = f['additional_paid_in_capital'] + bailout
+    f['ending_cash_balance'] = ending_cash + bailout
+    return f
+
+
+def operating_cash_flow(forecast):
+    """
+    Get cash flow from operating activities for every row of a forecast period.
+
+    Args:
+        forecast: Dictionary of field arrays for one period
+
+    Returns:
+        Array of operating cash flow
+    """
+    f = forecast
+    return (f['net_income'] + f['depreciation_amortization'] + f['goodwill_impairment'] + f['ppe_write_down'] -
+            f['debt_write_down'] - f['accounts_receivable_change'] - f['inventory_change'] +
+            f['accounts_payable_change'] + f['accrued_expenses_change'] + f['deferred_revenue_change'])
+
+
+def free_cash_flows(forecasts):
+    """
+    Get the free cash flow of every row and period.
+
+    Args:
+        forecasts: List of dictionaries of field arrays, as returned by forecast_periods
+
+    Returns:
+        Array of shape (rows, periods)
+    """
+    return np.column_stack([operating_cash_flow(f) - f['capital_expenditures'] for f in forecasts])
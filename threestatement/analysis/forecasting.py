@@ -4,6 +4,9 @@ Module for financial forecasting.
 
 import copy
 
+from analysis.forecast_cache import forecast_key, get_default_cache
+from core.instrumentation import instrumented
+
 class FinancialForecast:
     """
     Class to handle financial forecasting.
@@ -40,6 +43,16 @@ class FinancialForecast:
             'debt_repayment': 50000, # Annual debt repayment
             'new_borrowing': 0,      # New borrowing
         }
+        
+        # Optional segment model replacing revenue_growth and cogs_percent
+        self.segments = None
+        self.segment_forecast = None
+        
+        # Optional revenue growth per period (e.g. from analysis.timeseries) replacing revenue_growth
+        self.revenue_growth_path = None
+        
+        # Optional ForecastCache memoizing generate_forecast
+        self.cache = get_default_cache()
     
     def update_assumptions(self, new_assumptions):
         """
@@ -50,6 +63,47 @@ class FinancialForecast:
         """
         self.assumptions.update(new_assumptions)
     
+    def set_segments(self, segments):
+        """
+        Build revenue and COGS from business segments.
+        
+        Args:
+            segments: SegmentModel with the base period's segment revenue, or None
+                to use revenue_growth and cogs_percent
+        """
+        self.segments = segments
+        self.segment_forecast = None
+    
+    def set_revenue_growth_path(self, growth):
+        """
+        Grow revenue at a different rate in each forecast period.
+        
+        Args:
+            growth: Revenue growth of each period, in order, or None to use
+                revenue_growth (also used for periods beyond the path)
+        """
+        self.revenue_growth_path = None if growth is None else tuple(float(rate) for rate in growth)
+    
+    def _revenue_growth(self):
+        """Revenue growth of the period being forecast."""
+        if self.revenue_growth_path:
+            return self.revenue_growth_path[0]
+        return self.assumptions['revenue_growth']
+    
+    def _implied_revenue_growth(self, forecast):
+        """Revenue growth of a forecast period, as built up from the segments when they are set."""
+        if self.segments is None:
+            return self._revenue_growth()
+        base_revenue = self.base_data.revenue
+        return forecast.revenue / base_revenue - 1 if base_revenue else 0.0
+    
+    def _key_assumptions(self):
+        """Assumptions identifying a forecast in the cache, including any growth path."""
+        if self.revenue_growth_path is None:
+            return self.assumptions
+        return dict(self.assumptions, revenue_growth_path=self.revenue_growth_path)
+    
+    @instrumented('forecast.generate')
     def generate_forecast(self):
         """
         Generate forecasted financial statements based on assumptions.
@@ -57,6 +111,22 @@ class FinancialForecast:
         Returns:
             FinancialData: Forecasted financial data
         """
+        if self.cache is None:
+            return self._compute_forecast()
+        
+        # Reuse the result of identical inputs; the cache returns a fresh copy
+        key = forecast_key(self.base_data, self._key_assumptions(), self.segments)
+        cached = self.cache.get(key)
+        if cached is not None:
+            forecast, self.segment_forecast = cached
+            return forecast
+        
+        forecast = self._compute_forecast()
+        self.cache.put(key, (forecast, self.segment_forecast))
+        return forecast
+    
+    def _compute_forecast(self):
+        """Apply the assumptions to a copy of the base data."""
         # Create a new financial data object for the forecast
         forecast = copy.deepcopy(self.base_data)
         
@@ -67,6 +137,43 @@ class FinancialForecast:
         
         return forecast
     
+    def generate_forecast_periods(self, periods):
+        """
+        Generate forecasts for several consecutive periods.
+        
+        Each period is forecast from the previous one with the same assumptions.
+        
+        Args:
+            periods: Number of periods to forecast
+            
+        Returns:
+            list: Forecasted FinancialData for each period, in order
+        """
+        if self.cache is None:
+            return self._compute_forecast_periods(periods)
+        
+        # One cache entry holds the whole path, so a hit costs a single key
+        key = forecast_key(self.base_data, self._key_assumptions(), self.segments, kind=f'periods:{periods}')
+        return self.cache.get_or_compute(key, lambda: self._compute_forecast_periods(periods))
+    
+    def _compute_forecast_periods(self, periods):
+        """Forecast each period from the previous one without the cache."""
+        forecasts = []
+        base_data = self.base_data
+        segments = self.segments
+        for period in range(periods):
+            model = FinancialForecast(base_data)
+            model.assumptions = dict(self.assumptions)
+            model.segments = segments
+            if self.revenue_growth_path:
+                model.revenue_growth_path = self.revenue_growth_path[period:]
+            model.cache = None
+            base_data = model.generate_forecast()
+            segments = model.segment_forecast
+            forecasts.append(base_data)
+        return forecasts
+    
+    @instrumented('forecast.income_statement')
     def _forecast_income_statement(self, forecast):
         """
         Forecast the income statement.
@@ -74,11 +181,17 @@ class FinancialForecast:
         Args:
             forecast: FinancialData object to update with forecasted values
         """
-        # Revenue
-        forecast.revenue = self.base_data.revenue * (1 + self.assumptions['revenue_growth'])
-        
-        # Cost of Goods Sold
-        forecast.cogs = forecast.revenue * self.assumptions['cogs_percent']
+        if self.segments is not None:
+            # Revenue and Cost of Goods Sold built up from the business segments
+            self.segment_forecast = self.segments.forecast()
+            forecast.revenue = float(self.segment_forecast.total_revenue)
+            forecast.cogs = float(self.segment_forecast.total_cogs)
+        else:
+            # Revenue
+            forecast.revenue = self.base_data.revenue * (1 + self._revenue_growth())
+            
+            # Cost of Goods Sold
+            forecast.cogs = forecast.revenue * self.assumptions['cogs_percent']
         
         # Operating Expenses
         forecast.operating_expenses = self.base_data.operating_expenses * (1 + self.assumptions['opex_growth'])
@@ -96,7 +209,13 @@ class FinancialForecast:
         ebt = operating_income - forecast.interest_expense
         income_tax = ebt * forecast.tax_rate
         forecast.net_income = ebt - income_tax
+        
+        # No write-downs unless specified
+        forecast.goodwill_impairment = 0
+        forecast.ppe_write_down = 0
+        forecast.debt_write_down = 0
     
+    @instrumented('forecast.balance_sheet')
     def _forecast_balance_sheet(self, forecast):
         """
         Forecast the balance sheet.
@@ -115,7 +234,7 @@ class FinancialForecast:
         forecast.inventory = forecast.cogs * (self.assumptions['inventory_days'] / 365)
         
         # Prepaid Expenses (assume same growth as revenue)
-        forecast.prepaid_expenses = self.base_data.prepaid_expenses * (1 + self.assumptions['revenue_growth'])
+        forecast.prepaid_expenses = self.base_data.prepaid_expenses * (1 + self._implied_revenue_growth(forecast))
         
         # Property, Plant & Equipment
         capex = forecast.revenue * self.assumptions['capex_percent']
@@ -142,7 +261,7 @@ class FinancialForecast:
         forecast.long_term_debt = self.base_data.long_term_debt - self.assumptions['debt_repayment'] + self.assumptions['new_borrowing']
         
         # Deferred Revenue (assume same growth as revenue)
-        forecast.deferred_revenue = self.base_data.deferred_revenue * (1 + self.assumptions['revenue_growth'])
+        forecast.deferred_revenue = self.base_data.deferred_revenue * (1 + self._implied_revenue_growth(forecast))
         
         # Equity
         # Common Stock (assume no change unless specified)
@@ -155,6 +274,7 @@ class FinancialForecast:
         dividends = forecast.net_income * self.assumptions['dividend_payout']
         forecast.retained_earnings = self.base_data.retained_earnings + forecast.net_income - dividends
     
+    @instrumented('forecast.cash_flow')
     def _forecast_cash_flow(self, forecast):
         """
         Forecast the cash flow statement.
@@ -184,6 +304,7 @@ class FinancialForecast:
         forecast.dividends_paid = forecast.net_income * self.assumptions['dividend_payout']
         forecast.stock_issuance = 0  # Assume no stock issuance unless specified
         forecast.stock_repurchase = 0  # Assume no stock repurchase unless specified
+        forecast.equity_bailout = 0  # Assume no equity bailout unless specified
         forecast.other_financing = 0  # Assume no other financing activities
         
         # Cash Balances
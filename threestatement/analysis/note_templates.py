@@ -0,0 +1,516 @@
+"""
+Compiled note templates for management discussion and analysis.
+
+Note rules are declared once as data. compile_statement_template turns
+them into bound str.format methods and pre-joined correlation blocks, and
+CompiledStatementTemplate.evaluate applies them to a whole batch of
+comparisons at once: deltas, significance tests, reason buckets and margins
+are computed with array operations over (rows, items) matrices, and only
+the significant cells are formatted into sentences.
+"""
+
+from itertools import compress
+
+import numpy as np
+
+# Minimum absolute percentage change for an item to be discussed
+SIGNIFICANCE_THRESHOLD = 0.01
+
+# Reason bucket boundaries, checked in order: > 15%, > 5%, < -15%, < -5%, otherwise stable
+REASON_THRESHOLDS = (0.15, 0.05, -0.15, -0.05)
+
+
+class NoteRule:
+    """
+    Declarative description of the note written for one comparison item.
+    """
+
+    def __init__(self, key, subject, reasons=None, lead="primarily due to", margin=None, correlations=()):
+        """
+        Initialize a note rule.
+
+        Args:
+            key: Comparison item key (e.g., 'revenue')
+            subject: Sentence subject (e.g., "Revenue")
+            reasons: Optional 5-tuple of reasons for changes above 15%, above 5%,
+                below -15%, below -5% and in between
+            lead: Words introducing the reason
+            margin: Optional (article, name) pair; the note then reports the item as a
+                margin of revenue instead of giving a reason
+            correlations: Lines explaining how the change affects other statements
+        """
+        self.key = key
+        self.subject = subject
+        self.reasons = reasons
+        self.lead = lead
+        self.margin = margin
+        self.correlations = tuple(correlations)
+
+
+class StatementTemplate:
+    """
+    Declarative description of the notes for one statement.
+    """
+
+    def __init__(self, groups, block_separator, empty_message):
+        """
+        Initialize a statement template.
+
+        Args:
+            groups: List of (title, rules) pairs; a title of None writes the rules without a heading
+            block_separator: Separator between a note and its correlation lines, and between notes
+            empty_message: Text used when no item changed significantly
+        """
+        self.groups = groups
+        self.block_separator = block_separator
+        self.empty_message = empty_message
+
+
+class _CompiledRule:
+    """
+    A NoteRule with its sentence template and correlation block prepared.
+    """
+
+    __slots__ = ('key', 'format', 'reasons', 'margin', 'suffix')
+
+    def __init__(self, rule, block_separator):
+        self.key = rule.key
+        self.margin = rule.margin is not None
+        self.reasons = rule.reasons
+
+        if rule.margin is not None:
+            article, name = rule.margin
+            template = (f"{rule.subject} {{}} by {{:.1%}} (${{:,.0f}}), resulting in {article} "
+                        f"{name} margin of {{:.1%}} compared to {{:.1%}} in the prior year.")
+        elif rule.reasons is not None:
+            template = f"{rule.subject} {{}} by {{:.1%}} (${{:,.0f}}), {rule.lead} {{}}"
+        else:
+            template = f"{rule.subject} {{}} by {{:.1%}} (${{:,.0f}})."
+        self.format = template.format
+
+        self.suffix = "".join(block_separator + line for line in rule.correlations)
+
+
+class CompiledStatementTemplate:
+    """
+    A StatementTemplate ready to be evaluated against delta vectors.
+    """
+
+    def __init__(self, template):
+        """
+        Compile a statement template.
+
+        Args:
+            template: StatementTemplate instance
+        """
+        self.groups = [
+            ("" if title is None else f"{title}:\n",
+             [_CompiledRule(rule, template.block_separator) for rule in rules])
+            for title, rules in template.groups
+        ]
+        self.block_separator = template.block_separator
+        self.empty_message = template.empty_message
+        self.keys = [rule.key for _, rules in self.groups for rule in rules]
+        self._revenue_column = self.keys.index('revenue') if 'revenue' in self.keys else None
+
+    def evaluate(self, base, forecast):
+        """
+        Generate the notes for every row of a batch.
+
+        Args:
+            base: Array of shape (rows, len(keys)) with base year values in key order
+            forecast: Array of the same shape with forecast year values
+
+        Returns:
+            List of note strings, one per row
+        """
+        base = np.asarray(base, dtype=float)
+        forecast = np.asarray(forecast, dtype=float)
+        rows = base.shape[0]
+
+        # Deltas, as defined by FinancialComparison: percentage is 0 when the base is 0
+        change = forecast - base
+        magnitude = np.abs(base)
+        percentage = np.divide(change, magnitude, out=np.zeros_like(change), where=magnitude != 0)
+
+        # Per-column lists, so each rule reads its own column without further indexing
+        significant = (np.abs(percentage) >= SIGNIFICANCE_THRESHOLD).T.tolist()
+        directions = np.where(change > 0, "increased", "decreased").T.tolist()
+        buckets = _reason_buckets(percentage).T.tolist()
+        abs_percentage = np.abs(percentage).T.tolist()
+        abs_change = np.abs(change).T.tolist()
+
+        if self._revenue_column is not None:
+            revenue = slice(self._revenue_column, self._revenue_column + 1)
+            forecast_margins = _margin(forecast, forecast[:, revenue]).T.tolist()
+            base_margins = _margin(base, base[:, revenue]).T.tolist()
+
+        # Format only the significant cells, one rule (column) at a time
+        column = 0
+        group_texts = []
+        for _, rules in self.groups:
+            blocks = [[] for _ in range(rows)]
+            for rule in rules:
+                selected = significant[column]
+                if any(selected):
+                    arguments = [compress(directions[column], selected),
+                                 compress(abs_percentage[column], selected),
+                                 compress(abs_change[column], selected)]
+                    if rule.margin:
+                        arguments.append(compress(forecast_margins[column], selected))
+                        arguments.append(compress(base_margins[column], selected))
+                    elif rule.reasons is not None:
+                        arguments.append(map(rule.reasons.__getitem__, compress(buckets[column], selected)))
+
+                    suffix = rule.suffix
+                    for row, sentence in zip(compress(range(rows), selected), map(rule.format, *arguments)):
+                        blocks[row].append(sentence + suffix)
+                column += 1
+            group_texts.append([self.block_separator.join(row_blocks) for row_blocks in blocks])
+
+        # Assemble each row from its non-empty groups
+        titles = [title for title, _ in self.groups]
+        results = []
+        for texts in zip(*group_texts):
+            sections = [title + text for title, text in zip(titles, texts) if text]
+            results.append("\n\n".join(sections) if sections else self.empty_message)
+        return results
+
+
+def _reason_buckets(percentage):
+    """
+    Map percentage changes to reason buckets.
+
+    Args:
+        percentage: Array of percentage changes
+
+    Returns:
+        Integer array of bucket indices into a rule's reasons
+    """
+    upper, lower, floor, ceiling = REASON_THRESHOLDS
+    return np.select(
+        [percentage > upper, percentage > lower, percentage < floor, percentage < ceiling],
+        [0, 1, 2, 3],
+        4
+    )
+
+
+def _margin(values, revenue):
+    """Divide values by revenue, returning 0 where revenue is 0."""
+    return np.divide(values, revenue, out=np.zeros_like(values), where=revenue != 0)
+
+
+def compile_statement_template(template):
+    """
+    Compile a statement template.
+
+    Args:
+        template: StatementTemplate instance
+
+    Returns:
+        CompiledStatementTemplate
+    """
+    return CompiledStatementTemplate(template)
+
+
+# Reasons for each item, ordered as REASON_THRESHOLDS plus the stable case
+REVENUE_REASONS = (
+    "significant market expansion and new product launches.",
+    "moderate growth in existing markets and increased customer demand.",
+    "challenging market conditions and decreased customer demand.",
+    "slight contraction in certain market segments.",
+    "relatively stable market conditions.",
+)
+
+OPEX_REASONS = (
+    "significant investments in research and development and marketing initiatives.",
+    "increased personnel costs and moderate expansion of operations.",
+    "major cost-cutting initiatives and operational restructuring.",
+    "improved operational efficiencies and targeted cost reductions.",
+    "relatively stable operational costs.",
+)
+
+INTEREST_REASONS = (
+    "increased debt levels and higher interest rates.",
+    "moderate increases in borrowing.",
+    "significant debt repayment and refinancing at lower interest rates.",
+    "partial debt repayment and favorable interest rate environment.",
+    "relatively stable debt levels and interest rates.",
+)
+
+CASH_REASONS = (
+    "strong operating cash flow and strategic cash management.",
+    "improved cash collection and moderate operating performance.",
+    "significant investments, debt repayment, and dividend payments.",
+    "moderate capital expenditures and shareholder returns.",
+    "balanced cash inflows and outflows.",
+)
+
+AR_REASONS = (
+    "significant sales growth and extended payment terms for key customers.",
+    "moderate sales growth and typical payment patterns.",
+    "improved collection efforts and potential reduction in credit sales.",
+    "slightly improved collection efficiency.",
+    "consistent credit policies and collection practices.",
+)
+
+INVENTORY_REASONS = (
+    "strategic inventory build-up in anticipation of increased demand.",
+    "moderate inventory increases aligned with sales growth expectations.",
+    "significant inventory reduction initiatives and improved inventory management.",
+    "slight improvements in inventory turnover and supply chain efficiency.",
+    "stable inventory management practices.",
+)
+
+PPE_REASONS = (
+    "significant capital expenditures for expansion and modernization.",
+    "moderate investments in production capacity and infrastructure.",
+    "asset disposals and limited capital investment below depreciation levels.",
+    "selective asset rationalization and focused capital spending.",
+    "maintenance capital expenditures approximately equal to depreciation.",
+)
+
+AP_REASONS = (
+    "increased purchasing activity and negotiated extended payment terms.",
+    "moderate increases in procurement aligned with business growth.",
+    "accelerated supplier payments and potential early payment discounts.",
+    "slight reduction in purchasing activity or payment term adjustments.",
+    "consistent supplier payment practices.",
+)
+
+DEBT_REASONS = (
+    "new debt issuance to fund strategic initiatives and capital investments.",
+    "moderate additional borrowing to support operations and growth.",
+    "significant debt repayment as part of deleveraging strategy.",
+    "scheduled debt repayments and modest deleveraging efforts.",
+    "relatively stable debt levels with refinancing of maturing obligations.",
+)
+
+RETAINED_EARNINGS_REASONS = (
+    "strong profitability and limited dividend distributions.",
+    "solid net income and balanced shareholder returns.",
+    "net losses or significant dividend payments exceeding current earnings.",
+    "modest profitability offset by dividend distributions.",
+    "balanced earnings and shareholder returns.",
+)
+
+OPERATING_CF_REASONS = (
+    "improved profitability and working capital management.",
+    "moderate earnings growth and stable working capital.",
+    "decreased profitability and increased working capital requirements.",
+    "slight earnings pressure and modest working capital increases.",
+    "relatively stable earnings and working capital levels.",
+)
+
+INVESTING_CF_REASONS = (
+    "reduced capital expenditures and potential asset sales.",
+    "moderately lower investment activity compared to prior year.",
+    "significant increases in capital expenditures and strategic investments.",
+    "modest increases in capital spending and investment activity.",
+    "investment activity consistent with prior year levels.",
+)
+
+FINANCING_CF_REASONS = (
+    "increased debt issuance or equity financing activities.",
+    "moderate increases in external financing.",
+    "significant debt repayment, share repurchases, or dividend increases.",
+    "modest increases in shareholder returns or debt service.",
+    "financing activities consistent with prior year levels.",
+)
+
+INCOME_STATEMENT_TEMPLATE = StatementTemplate(
+    groups=[
+        (None, [
+            NoteRule('revenue', "Revenue", REVENUE_REASONS, correlations=[
+                "  - Impact: This change in revenue directly affects gross profit, operating income, and net income.",
+                "  - Balance Sheet Effect: May increase accounts receivable if sales are on credit.",
+                "  - Cash Flow Effect: Will increase operating cash flow as receivables are collected.",
+            ]),
+            NoteRule('gross_profit', "Gross profit", margin=("a", "gross"), correlations=[
+                "  - Impact: Changes in gross profit directly affect operating income and net income.",
+                "  - Valuation Effect: Improved gross margins often lead to higher valuation multiples.",
+            ]),
+            NoteRule('operating_expenses', "Operating expenses", OPEX_REASONS, correlations=[
+                "  - Impact: Changes in operating expenses directly affect operating income and net income.",
+                "  - Cash Flow Effect: Most operating expenses reduce operating cash flow.",
+                "  - Balance Sheet Effect: May increase accrued expenses if not paid immediately.",
+            ]),
+            NoteRule('operating_income', "Operating income", margin=("an", "operating"), correlations=[
+                "  - Impact: Operating income is a key metric for evaluating operational efficiency.",
+                "  - Valuation Effect: Higher operating margins often lead to higher EV/EBITDA multiples.",
+            ]),
+            NoteRule('interest_expense', "Interest expense", INTEREST_REASONS, correlations=[
+                "  - Impact: Changes in interest expense directly affect income before tax and net income.",
+                "  - Cash Flow Effect: Interest payments reduce operating cash flow.",
+                "  - Balance Sheet Effect: Related to changes in debt levels.",
+            ]),
+            NoteRule('net_income', "Net income", margin=("a", "net"), correlations=[
+                "  - Impact: Net income increases retained earnings on the balance sheet.",
+                "  - Shareholder Effect: Affects earnings per share and potential dividend payments.",
+                "  - Valuation Effect: Directly impacts P/E ratio and other earnings-based valuation metrics.",
+            ]),
+        ]),
+    ],
+    block_separator="\n\n",
+    empty_message="No significant changes in the income statement compared to the prior year."
+)
+
+BALANCE_SHEET_TEMPLATE = StatementTemplate(
+    groups=[
+        ("Assets", [
+            NoteRule('cash', "Cash and cash equivalents", CASH_REASONS, correlations=[
+                "  - Impact: Changes in cash affect liquidity ratios like current ratio and cash ratio.",
+                "  - Enterprise Value Effect: Higher cash reduces enterprise value (EV = Market Cap + Debt - Cash).",
+            ]),
+            NoteRule('accounts_receivable', "Accounts receivable", AR_REASONS, lead="reflecting", correlations=[
+                "  - Impact: Changes in accounts receivable affect working capital and cash conversion cycle.",
+                "  - Cash Flow Effect: Increases in accounts receivable reduce operating cash flow.",
+            ]),
+            NoteRule('inventory', "Inventory", INVENTORY_REASONS, correlations=[
+                "  - Impact: Changes in inventory affect working capital and inventory turnover ratio.",
+                "  - Cash Flow Effect: Increases in inventory reduce operating cash flow.",
+            ]),
+            NoteRule('property_plant_equipment', "Property, plant, and equipment", PPE_REASONS, correlations=[
+                "  - Impact: Changes in PP&E affect asset turnover ratio and return on assets.",
+                "  - Cash Flow Effect: Capital expenditures reduce investing cash flow.",
+                "  - Income Statement Effect: Will increase depreciation expense in future periods.",
+            ]),
+            NoteRule('total_assets', "Total assets", correlations=[
+                "  - Impact: Changes in total assets affect return on assets and asset turnover ratios.",
+            ]),
+        ]),
+        ("Liabilities", [
+            NoteRule('accounts_payable', "Accounts payable", AP_REASONS, correlations=[
+                "  - Impact: Changes in accounts payable affect working capital and cash conversion cycle.",
+                "  - Cash Flow Effect: Increases in accounts payable increase operating cash flow.",
+            ]),
+            NoteRule('long_term_debt', "Long-term debt", DEBT_REASONS, correlations=[
+                "  - Impact: Changes in debt affect debt-to-equity ratio and interest coverage ratio.",
+                "  - Cash Flow Effect: New debt increases financing cash flow; repayments decrease it.",
+                "  - Income Statement Effect: Will affect interest expense in future periods.",
+                "  - Enterprise Value Effect: Higher debt increases enterprise value.",
+            ]),
+            NoteRule('total_liabilities', "Total liabilities", correlations=[
+                "  - Impact: Changes in total liabilities affect debt-to-assets ratio.",
+            ]),
+        ]),
+        ("Equity", [
+            NoteRule('retained_earnings', "Retained earnings", RETAINED_EARNINGS_REASONS, correlations=[
+                "  - Impact: Retained earnings increase from net income and decrease from dividends.",
+                "  - Shareholder Effect: Represents accumulated profits not distributed to shareholders.",
+            ]),
+            NoteRule('total_equity', "Total equity", correlations=[
+                "  - Impact: Changes in equity affect return on equity and debt-to-equity ratios.",
+                "  - Book Value Effect: Directly impacts book value per share.",
+            ]),
+        ]),
+    ],
+    block_separator="\n",
+    empty_message="No significant changes in the balance sheet compared to the prior year."
+)
+
+CASH_FLOW_TEMPLATE = StatementTemplate(
+    groups=[
+        (None, [
+            NoteRule('operating_cash_flow', "Cash flow from operating activities", OPERATING_CF_REASONS, correlations=[
+                "  - Impact: Operating cash flow is critical for sustainable business operations.",
+                "  - Balance Sheet Effect: Directly increases cash and cash equivalents.",
+                "  - Financial Health: Strong operating cash flow indicates healthy core business operations.",
+            ]),
+            NoteRule('investing_cash_flow', "Cash flow from investing activities", INVESTING_CF_REASONS, correlations=[
+                "  - Impact: Investing cash flow reflects capital expenditures and investment activities.",
+                "  - Balance Sheet Effect: Capital expenditures increase PP&E assets.",
+                "  - Growth Indicator: High capital expenditures may indicate investment in future growth.",
+            ]),
+            NoteRule('financing_cash_flow', "Cash flow from financing activities", FINANCING_CF_REASONS, correlations=[
+                "  - Impact: Financing cash flow reflects debt and equity financing activities.",
+                "  - Balance Sheet Effect: Affects debt levels and equity accounts.",
+                "  - Capital Structure: Changes in financing activities impact the company's capital structure.",
+            ]),
+            NoteRule('net_change_in_cash', "Net change in cash", correlations=[
+                "  - Impact: Net change in cash directly affects the cash balance on the balance sheet.",
+                "  - Liquidity Effect: Changes in cash impact liquidity ratios and financial flexibility.",
+            ]),
+        ]),
+    ],
+    block_separator="\n\n",
+    empty_message="No significant changes in the cash flow statement compared to the prior year."
+)
+
+COMPILED_TEMPLATES = {
+    'income': compile_statement_template(INCOME_STATEMENT_TEMPLATE),
+    'balance': compile_statement_template(BALANCE_SHEET_TEMPLATE),
+    'cash_flow': compile_statement_template(CASH_FLOW_TEMPLATE),
+}
+
+
+def evaluate_cross_statement_correlations(changes, forecast):
+    """
+    Generate the cross-statement correlation notes for a batch.
+
+    Args:
+        changes: Dictionary mapping item keys to arrays of absolute changes
+        forecast: Dictionary mapping FinancialData field names to arrays of forecast values
+
+    Returns:
+        List of correlation note strings, one per row
+    """
+    revenue_change = np.asarray(changes['revenue'], dtype=float)
+    ar_change = np.asarray(changes['accounts_receivable'], dtype=float)
+    net_income_change = np.asarray(changes['net_income'], dtype=float)
+    retained_earnings_change = np.asarray(changes['retained_earnings'], dtype=float)
+    ppe_change = np.asarray(changes['property_plant_equipment'], dtype=float)
+    debt_change = np.asarray(changes['long_term_debt'], dtype=float) + np.asarray(changes['short_term_debt'], dtype=float)
+    interest_change = np.asarray(changes['interest_expense'], dtype=float)
+    equity_change = np.asarray(changes['total_equity'], dtype=float)
+
+    capex = np.asarray(forecast['capital_expenditures'], dtype=float)
+    share_issuance = np.asarray(forecast['stock_issuance'], dtype=float)
+    share_repurchase = np.asarray(forecast['stock_repurchase'], dtype=float)
+
+    # Conditions for each correlation
+    revenue_ar = ((revenue_change != 0) & (ar_change != 0)).tolist()
+    revenue_ar_same = (np.sign(revenue_change) == np.sign(ar_change)).tolist()
+    earnings = ((net_income_change != 0) & (retained_earnings_change != 0)).tolist()
+    capex_ppe = ((capex > 0) & (ppe_change > 0)).tolist()
+    debt_interest = ((debt_change != 0) & (interest_change != 0)).tolist()
+    debt_interest_same = (np.sign(debt_change) == np.sign(interest_change)).tolist()
+    equity_moved = (equity_change != 0).tolist()
+
+    # Values quoted in the notes
+    net_income = np.asarray(forecast['net_income'], dtype=float).tolist()
+    dividends_paid = np.asarray(forecast['dividends_paid'], dtype=float).tolist()
+    ocf = (np.asarray(forecast['net_income'], dtype=float) +
+           np.asarray(forecast['depreciation_amortization'], dtype=float)).tolist()
+    fcf = (np.asarray(forecast['debt_issuance'], dtype=float) -
+           np.asarray(forecast['debt_repayment'], dtype=float)).tolist()
+    cash_change = np.asarray(changes['cash'], dtype=float).tolist()
+    capex_values = capex.tolist()
+    issuance_values = share_issuance.tolist()
+    repurchase_values = share_repurchase.tolist()
+
+    results = []
+    for i in range(len(revenue_ar)):
+        notes = []
+        if revenue_ar[i]:
+            if revenue_ar_same[i]:
+                notes.append("Revenue and accounts receivable are moving in the same direction, which is consistent with business growth or contraction.")
+            else:
+                notes.append("Revenue and accounts receivable are moving in opposite directions, which may indicate changes in collection efficiency or credit policies.")
+        if earnings[i]:
+            notes.append(f"Net income of ${net_income[i]:,.0f} contributes to the change in retained earnings, adjusted for dividends paid of ${dividends_paid[i]:,.0f}.")
+        if capex_ppe[i]:
+            notes.append(f"Capital expenditures of ${capex_values[i]:,.0f} are reflected in the increase in property, plant, and equipment, before accounting for depreciation.")
+        if debt_interest[i]:
+            if debt_interest_same[i]:
+                notes.append("Changes in debt levels are reflected in corresponding changes to interest expense.")
+            else:
+                notes.append("Changes in debt levels and interest expense are moving in opposite directions, which may indicate refinancing at different interest rates.")
+        notes.append(f"The net change in cash of ${cash_change[i]:,.0f} is the result of operating cash flow (${ocf[i]:,.0f}), investing cash flow (${0.0 - capex_values[i]:,.0f}), and financing cash flow (${fcf[i]:,.0f}).")
+        if equity_moved[i]:
+            if issuance_values[i] > 0:
+                notes.append(f"Stock issuance of ${issuance_values[i]:,.0f} contributes to the change in total equity.")
+            if repurchase_values[i] > 0:
+                notes.append(f"Stock repurchase of ${repurchase_values[i]:,.0f} reduces total equity.")
+        results.append("\n".join(notes))
+    return results
@@ -0,0 +1,270 @@
+"""
+Module for ranking companies against a peer universe.
+
+PeerRatioIndex keeps one sorted array of values per ratio, so percentile
+ranks are answered with two binary searches and nearest peers with a
+binary search followed by a walk outwards from the insertion point. New
+filings are inserted in place with bisect, without re-sorting.
+"""
+
+from bisect import bisect_left, bisect_right
+import math
+
+from analysis.ratios import FinancialRatios
+
+
+class PeerRatioIndex:
+    """
+    Sorted per-ratio index over a universe of peer companies.
+    """
+
+    def __init__(self, ratio_names=None):
+        """
+        Initialize an empty index.
+
+        Args:
+            ratio_names: Ratios to index (e.g., ['pe_ratio', 'ev_to_ebitda']);
+                all ratios from FinancialRatios are indexed if None
+        """
+        self.ratio_names = list(ratio_names) if ratio_names is not None else None
+
+        # Per ratio: sorted values and the company keys in the same order
+        self._values = {}
+        self._keys = {}
+
+        # Latest ratios for every company, used to replace a company on a new filing
+        self._companies = {}
+
+    def __len__(self):
+        return len(self._companies)
+
+    def __contains__(self, key):
+        return key in self._companies
+
+    def _indexed(self, ratios):
+        """Select the indexed ratios, dropping NaN values which have no rank."""
+        if self.ratio_names is None:
+            self.ratio_names = list(ratios)
+            for name in self.ratio_names:
+                self._values.setdefault(name, [])
+                self._keys.setdefault(name, [])
+        return {name: ratios[name] for name in self.ratio_names
+                if name in ratios and not math.isnan(ratios[name])}
+
+    def add(self, key, ratios):
+        """
+        Insert or replace a company.
+
+        Args:
+            key: Unique company key (e.g., company name or ticker)
+            ratios: Dictionary mapping ratio names to values, as returned by
+                FinancialRatios.get_flat_ratios
+        """
+        if key in self._companies:
+            self.remove(key)
+
+        ratios = self._indexed(ratios)
+        for name, value in ratios.items():
+            values = self._values.setdefault(name, [])
+            keys = self._keys.setdefault(name, [])
+            position = bisect_right(values, value)
+            values.insert(position, value)
+            keys.insert(position, key)
+        self._companies[key] = ratios
+
+    def add_financial_data(self, financial_data, key=None):
+        """
+        Calculate a company's ratios and insert it.
+
+        Args:
+            financial_data: FinancialData instance
+            key: Company key (defaults to the company name)
+        """
+        if key is None:
+            key = financial_data.company_name
+        self.add(key, FinancialRatios(financial_data).get_flat_ratios())
+
+    def remove(self, key):
+        """
+        Remove a company from the index.
+
+        Args:
+            key: Company key
+
+        Raises:
+            KeyError: If the company is not in the index
+        """
+        ratios = self._companies.pop(key)
+        for name, value in ratios.items():
+            values = self._values[name]
+            keys = self._keys[name]
+            # Search only the run of equal values for the company's key
+            start = bisect_left(values, value)
+            end = bisect_right(values, value, start)
+            position = keys.index(key, start, end)
+            del values[position]
+            del keys[position]
+
+    def get_ratios(self, key):
+        """
+        Get the indexed ratios of a company.
+
+        Args:
+            key: Company key
+
+        Returns:
+            Dictionary mapping ratio names to values
+        """
+        return dict(self._companies[key])
+
+    def count(self, ratio_name):
+        """
+        Get the number of companies ranked on a ratio.
+
+        Args:
+            ratio_name: Ratio name
+
+        Returns:
+            int: Number of indexed values
+        """
+        return len(self._values.get(ratio_name, ()))
+
+    def percentile_rank(self, ratio_name, value):
+        """
+        Get the percentile rank of a value among the peers.
+
+        Ties count as half below and half above, so a value equal to every
+        peer ranks at 0.5.
+
+        Args:
+            ratio_name: Ratio name
+            value: Ratio value to rank
+
+        Returns:
+            float: Fraction of peers below the value (0 to 1), or None if no peers are indexed
+        """
+        values = self._values.get(ratio_name)
+        if not values:
+            return None
+        below = bisect_left(values, value)
+        equal = bisect_right(values, value, below) - below
+        return (below + 0.5 * equal) / len(values)
+
+    def company_percentiles(self, key):
+        """
+        Get the percentile rank of a company on every indexed ratio.
+
+        Args:
+            key: Company key
+
+        Returns:
+            Dictionary mapping ratio names to percentile ranks
+        """
+        return {name: self.percentile_rank(name, value) for name, value in self._companies[key].items()}
+
+    def value_at_percentile(self, ratio_name, percentile):
+        """
+        Get the peer value at a percentile (nearest rank).
+
+        Args:
+            ratio_name: Ratio name
+            percentile: Percentile as a fraction (0 to 1)
+
+        Returns:
+            float: Ratio value, or None if no peers are indexed
+        """
+        values = self._values.get(ratio_name)
+        if not values:
+            return None
+        position = min(max(int(math.ceil(percentile * len(values))) - 1, 0), len(values) - 1)
+        return values[position]
+
+    def nearest_peers(self, ratio_name, value, count=5, exclude=None):
+        """
+        Get the peers whose ratio is closest to a value.
+
+        Args:
+            ratio_name: Ratio name
+            value: Ratio value to compare against
+            count: Number of peers to return
+            exclude: Optional company key to leave out (e.g., the company itself)
+
+        Returns:
+            List of (key, value) tuples ordered by distance
+        """
+        values = self._values.get(ratio_name, [])
+        keys = self._keys.get(ratio_name, [])
+        right = bisect_left(values, value)
+        left = right - 1
+        peers = []
+
+        # Walk outwards from the insertion point, taking the closer side each time
+        while len(peers) < count and (left >= 0 or right < len(values)):
+            if right >= len(values) or (left >= 0 and value - values[left] <= values[right] - value):
+                position = left
+                left -= 1
+            else:
+                position = right
+                right += 1
+            if keys[position] != exclude:
+                peers.append((keys[position], values[position]))
+        return peers
+
+    def company_nearest_peers(self, key, ratio_name, count=5):
+        """
+        Get a company's nearest peers on a ratio.
+
+        Args:
+            key: Company key
+            ratio_name: Ratio name
+            count: Number of peers to return
+
+        Returns:
+            List of (key, value) tuples ordered by distance; empty if the
+            company has no value for the ratio (e.g. it was NaN)
+
+        Raises:
+            KeyError: If the company is not in the index
+        """
+        value = self._companies[key].get(ratio_name)
+        if value is None:
+            return []
+        return self.nearest_peers(ratio_name, value, count, exclude=key)
+
+
+def build_peer_index(companies, ratio_names=None):
+    """
+    Build a peer index from many companies at once.
+
+    Sorts each ratio once instead of inserting companies one by one.
+
+    Args:
+        companies: Iterable of FinancialData or (key, ratios) pairs
+        ratio_names: Ratios to index; all ratios if None
+
+    Returns:
+        PeerRatioIndex
+    """
+    index = PeerRatioIndex(ratio_names)
+    columns = {}
+
+    for company in companies:
+        if isinstance(company, tuple):
+            key, ratios = company
+        else:
+            key, ratios = company.company_name, FinancialRatios(company).get_flat_ratios()
+
+        if key in index._companies:
+            raise ValueError(f"Duplicate company key: {key}")
+
+        ratios = index._indexed(ratios)
+        index._companies[key] = ratios
+        for name, value in ratios.items():
+            columns.setdefault(name, []).append((value, key))
+
+    for name, column in columns.items():
+        column.sort(key=lambda item: item[0])
+        index._values[name] = [value for value, _ in column]
+        index._keys[name] = [key for _, key in column]
+
+    return index
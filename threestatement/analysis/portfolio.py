@@ -0,0 +1,411 @@
+"""
+Module for projecting the compounded value of an ETF portfolio.
+
+The holdings, contribution plan and exposure breakdowns are read from the
+compounding workbook. Projections apply the workbook's rule (contributions
+for the year are added, then the balance grows by the year's return) to
+arrays of paths at once, so deterministic plans, return/contribution grids
+and Monte Carlo simulations share the same code. Simulated fan charts keep
+only one period of paths in memory and reduce it to percentiles before
+moving on, so hundreds of thousands of paths fit in a few vectors.
+"""
+
+import numpy as np
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+MONTHS_PER_YEAR = 12
+
+# Percentile bands drawn on fan charts (pairs around the median)
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+
+# Cell layout of compounding.xlsx
+_PLAN_SHEET = 'Sheet1'
+_PLAN_FIRST_ROW = 1
+_PLAN_COLUMNS = {'monthly_contribution': 'K', 'year': 'M'}
+_PLAN_GROWTH_CELL = 'E10'
+_ALLOCATION_COLUMNS = 'CDEFGH'
+_ALLOCATION_ROWS = {'amount': 4, 'name': 5, 'expected_return': 6}
+_HOLDINGS_SHEET = 'Sheet2'
+_HOLDINGS_ROWS = {'weight': 2, 'ticker': 3, 'expense_ratio': 4}
+_BREAKDOWN_SHEET = 'Sheet3'
+_BREAKDOWN_NAME_ROW = 3
+_BREAKDOWN_BLOCKS = ((4, 13), (17, 26))
+
+# Fund names used on the breakdown sheet, by ticker
+FUND_NAMES = {
+    'MGT': 'Amundi DJ Global Titans 50 UCITS ETF Dist',
+    'IWQU': 'iShares Edge MSCI World Quality Factor UCITS ETF',
+    'XDWT': 'Xtrackers MSCI World Information Technology UCITS ETF 1C',
+    'XDWC': 'Xtrackers MSCI World Consumer Discretionary',
+    'LYP6': 'Amundi Stoxx Europe 600 UCITS ETF',
+    'IJPE': 'Japan hedged',
+    '5MVL': 'EM Value Facto',
+}
+
+
+class Holding:
+    """
+    A fund held in the portfolio.
+    """
+
+    __slots__ = ('ticker', 'weight', 'expense_ratio', 'name', 'breakdowns')
+
+    def __init__(self, ticker, weight, expense_ratio=0.0, name=None, breakdowns=None):
+        """
+        Initialize a holding.
+
+        Args:
+            ticker: Fund ticker (e.g., "IWQU")
+            weight: Portfolio weight (0 to 1)
+            expense_ratio: Annual total expense ratio (e.g., 0.0025)
+            name: Optional fund name
+            breakdowns: Optional dictionary mapping a breakdown kind ('sector',
+                'country' or 'currency') to {label: weight}
+        """
+        self.ticker = ticker
+        self.weight = weight
+        self.expense_ratio = expense_ratio
+        self.name = name or ticker
+        self.breakdowns = breakdowns or {}
+
+    def __repr__(self):
+        return f"Holding({self.ticker!r}, {self.weight:g})"
+
+
+class Portfolio:
+    """
+    A portfolio of funds with a contribution plan.
+    """
+
+    def __init__(self, holdings, contributions=None, growth_rate=None, years=None, allocations=None):
+        """
+        Initialize a portfolio.
+
+        Args:
+            holdings: List of Holding objects
+            contributions: Optional annual contributions, one per year of the plan
+            growth_rate: Optional planned annual return
+            years: Optional calendar years matching the contributions
+            allocations: Optional list of {'name', 'amount', 'expected_return'} dictionaries
+        """
+        self.holdings = list(holdings)
+        self.contributions = np.asarray(contributions if contributions is not None else [], dtype=float)
+        self.growth_rate = growth_rate
+        self.years = list(years) if years is not None else list(range(1, len(self.contributions) + 1))
+        self.allocations = list(allocations or [])
+
+    @property
+    def weights(self):
+        """Array of holding weights."""
+        return np.array([holding.weight for holding in self.holdings], dtype=float)
+
+    @property
+    def expense_ratio(self):
+        """Weighted average expense ratio of the holdings."""
+        return float(sum(holding.weight * holding.expense_ratio for holding in self.holdings))
+
+    @property
+    def expected_return(self):
+        """Amount-weighted expected return of the allocations (planned growth rate if none)."""
+        total = sum(allocation['amount'] for allocation in self.allocations)
+        if not total:
+            return self.growth_rate
+        return sum(allocation['amount'] * allocation['expected_return'] for allocation in self.allocations) / total
+
+    def project(self, growth_rate=None, expense_ratio=0.0, initial_value=0.0):
+        """
+        Project the planned contributions at a constant return.
+
+        Args:
+            growth_rate: Annual return (defaults to the planned growth rate)
+            expense_ratio: Annual fee charged on the balance after growth
+            initial_value: Starting balance
+
+        Returns:
+            Dictionary with 'years', 'contributed' and 'value' arrays
+        """
+        rate = self.growth_rate if growth_rate is None else growth_rate
+        values = project_values(self.contributions, rate, initial_value, expense_ratio)
+        return {
+            'years': self.years,
+            'contributed': initial_value + np.cumsum(self.contributions),
+            'value': values,
+        }
+
+    def simulate(self, volatility, paths, growth_rate=None, expense_ratio=None, percentiles=DEFAULT_PERCENTILES,
+                 initial_value=0.0, seed=None):
+        """
+        Simulate the contribution plan under random annual returns.
+
+        Args:
+            volatility: Annual standard deviation of returns
+            paths: Number of simulated paths
+            growth_rate: Expected annual return (defaults to the planned growth rate)
+            expense_ratio: Annual fee (defaults to the holdings' weighted expense ratio)
+            percentiles: Percentiles reported per year
+            initial_value: Starting balance
+            seed: Optional random seed
+
+        Returns:
+            Dictionary as returned by simulate_percentiles, with 'years' added
+        """
+        result = simulate_percentiles(
+            self.contributions,
+            self.growth_rate if growth_rate is None else growth_rate,
+            volatility,
+            paths,
+            initial_value=initial_value,
+            expense_ratio=self.expense_ratio if expense_ratio is None else expense_ratio,
+            percentiles=percentiles,
+            seed=seed
+        )
+        result['years'] = self.years
+        return result
+
+
+def _read_breakdowns(sheet):
+    """
+    Read the per-fund breakdown tables.
+
+    Each fund takes a label column and a value column, with its name above
+    them. The first block lists sectors, the second countries or, for funds
+    reporting them, currencies.
+    """
+    funds = {}
+    for column in range(1, sheet.max_column + 1):
+        name = sheet.cell(_BREAKDOWN_NAME_ROW, column).value
+        if not isinstance(name, str) or not name.strip():
+            continue
+        breakdowns = {}
+        for kind, (first, last) in zip(('sector', 'country'), _BREAKDOWN_BLOCKS):
+            block = {}
+            for row in range(first, last + 1):
+                label = sheet.cell(row, column).value
+                value = sheet.cell(row, column + 1).value
+                if isinstance(label, str) and label.strip() and isinstance(value, (int, float)):
+                    block[label.strip()] = float(value)
+            # Three-letter upper-case labels are currency codes, not countries
+            if kind == 'country' and all(len(label) == 3 and label.isupper() for label in block if label != 'Others'):
+                kind = 'currency'
+            if block:
+                breakdowns[kind] = block
+        funds[name.strip()] = breakdowns
+    return funds
+
+
+def load_compounding_workbook(path):
+    """
+    Load the portfolio in compounding.xlsx.
+
+    Requires openpyxl.
+
+    Args:
+        path: Path to the workbook
+
+    Returns:
+        Portfolio with holdings (weights, expense ratios and breakdowns),
+        annual contributions, planned growth rate and allocations
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, data_only=True)
+
+    # Contribution plan: one row per year with the monthly contribution; the
+    # first row of the contribution column holds the months per year and its
+    # year uses the next row's contribution
+    plan = workbook[_PLAN_SHEET]
+    contribution_column = _PLAN_COLUMNS['monthly_contribution']
+    year_column = _PLAN_COLUMNS['year']
+    months = plan[f"{contribution_column}{_PLAN_FIRST_ROW}"].value or MONTHS_PER_YEAR
+    contributions = []
+    years = []
+    row = _PLAN_FIRST_ROW
+    while plan[f"{year_column}{row}"].value is not None:
+        monthly = plan[f"{contribution_column}{max(row, _PLAN_FIRST_ROW + 1)}"].value
+        contributions.append(float(monthly or 0) * months)
+        years.append(int(plan[f"{year_column}{row}"].value))
+        row += 1
+    growth = plan[_PLAN_GROWTH_CELL].value
+    growth_rate = float(growth) - 1 if growth is not None else None
+
+    allocations = []
+    for column in _ALLOCATION_COLUMNS:
+        name = plan[f"{column}{_ALLOCATION_ROWS['name']}"].value
+        if name is None:
+            continue
+        allocations.append({
+            'name': str(name).strip(),
+            'amount': float(plan[f"{column}{_ALLOCATION_ROWS['amount']}"].value or 0),
+            'expected_return': float(plan[f"{column}{_ALLOCATION_ROWS['expected_return']}"].value or 0),
+        })
+
+    # Holdings, matched to their breakdowns by fund name
+    breakdowns = _read_breakdowns(workbook[_BREAKDOWN_SHEET]) if _BREAKDOWN_SHEET in workbook.sheetnames else {}
+    sheet = workbook[_HOLDINGS_SHEET]
+    holdings = []
+    for column in range(1, sheet.max_column + 1):
+        ticker = sheet.cell(_HOLDINGS_ROWS['ticker'], column).value
+        weight = sheet.cell(_HOLDINGS_ROWS['weight'], column).value
+        if not isinstance(ticker, str) or not isinstance(weight, (int, float)):
+            continue
+        ticker = ticker.strip().upper()
+        name = FUND_NAMES.get(ticker)
+        holdings.append(Holding(
+            ticker,
+            float(weight),
+            float(sheet.cell(_HOLDINGS_ROWS['expense_ratio'], column).value or 0),
+            name,
+            breakdowns.get(name.strip()) if name else None
+        ))
+
+    return Portfolio(holdings, contributions, growth_rate, years, allocations)
+
+
+def project_values(contributions, returns, initial_value=0.0, expense_ratio=0.0):
+    """
+    Compound contributions over many paths.
+
+    Each period the contribution is added and the balance then grows by the
+    period's return, less the expense ratio:
+    value[t] = (value[t-1] + contribution[t]) * (1 + return[t]) * (1 - expense_ratio).
+
+    Args:
+        contributions: Contributions per period, shape (T,) or (paths, T)
+        returns: Returns per period, scalar, shape (T,) or (paths, T)
+        initial_value: Starting balance, scalar or one per path
+        expense_ratio: Annual fee, scalar or one per path
+
+    Returns:
+        Array of balances at the end of each period, shape (T,) or (paths, T)
+    """
+    contributions = np.asarray(contributions, dtype=float)
+    initial_value = np.asarray(initial_value, dtype=float)
+    fee_factor = 1 - np.asarray(expense_ratio, dtype=float)
+    growth = (1 + np.asarray(returns, dtype=float)) * (fee_factor[..., None] if fee_factor.ndim else fee_factor)
+
+    shape = np.broadcast_shapes(contributions.shape, growth.shape, initial_value.shape + (1,))
+    contributions = np.broadcast_to(contributions, shape)
+    growth = np.broadcast_to(growth, shape)
+    periods = shape[-1]
+
+    values = np.empty(shape)
+    value = np.broadcast_to(initial_value, shape[:-1]).copy()
+    for period in range(periods):
+        value += contributions[..., period]
+        value *= growth[..., period]
+        values[..., period] = value
+    return values
+
+
+def lognormal_parameters(mean_return, volatility):
+    """
+    Convert an arithmetic mean return and volatility to log-return parameters.
+
+    Args:
+        mean_return: Expected annual return
+        volatility: Standard deviation of annual returns
+
+    Returns:
+        Tuple of (mu, sigma) of the annual log return
+    """
+    sigma_squared = np.log1p(np.square(volatility) / np.square(1 + np.asarray(mean_return, dtype=float)))
+    return np.log1p(mean_return) - sigma_squared / 2, np.sqrt(sigma_squared)
+
+
+def simulate_percentiles(contributions, mean_return, volatility, paths, initial_value=0.0, expense_ratio=0.0,
+                         percentiles=DEFAULT_PERCENTILES, seed=None):
+    """
+    Simulate compounded values with lognormal annual returns and summarise them per period.
+
+    Only the current balance of every path is held in memory; each period
+    it is updated with fresh returns and reduced to the requested
+    percentiles, so memory does not grow with the horizon.
+
+    Args:
+        contributions: Contributions per period, shape (T,)
+        mean_return: Expected annual return
+        volatility: Standard deviation of annual returns
+        paths: Number of simulated paths
+        initial_value: Starting balance
+        expense_ratio: Annual fee
+        percentiles: Percentiles to report
+        seed: Optional random seed or numpy Generator
+
+    Returns:
+        Dictionary with 'percentiles', 'bands' (len(percentiles), T), 'mean' (T,),
+        'contributed' (T,), 'final_values' (paths,) and 'shortfall_probability',
+        the share of paths ending below the amount contributed
+    """
+    contributions = np.asarray(contributions, dtype=float)
+    rng = seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+    mu, sigma = lognormal_parameters(mean_return, volatility)
+    fee_factor = 1 - expense_ratio
+
+    periods = len(contributions)
+    bands = np.empty((len(percentiles), periods))
+    means = np.empty(periods)
+    value = np.full(paths, float(initial_value))
+    shocks = np.empty(paths)
+    for period in range(periods):
+        rng.standard_normal(out=shocks)
+        shocks *= sigma
+        shocks += mu
+        np.exp(shocks, out=shocks)
+        value += contributions[period]
+        value *= shocks
+        value *= fee_factor
+        bands[:, period] = np.percentile(value, percentiles)
+        means[period] = value.mean()
+
+    contributed = initial_value + np.cumsum(contributions)
+    return {
+        'percentiles': tuple(percentiles),
+        'bands': bands,
+        'mean': means,
+        'contributed': contributed,
+        'final_values': value,
+        'shortfall_probability': float(np.mean(value < contributed[-1])) if periods else 0.0,
+    }
+
+
+def plot_fan_chart(simulation, ax=None, years=None, title="Projected Portfolio Value"):
+    """
+    Draw a percentile fan chart of a simulation.
+
+    Args:
+        simulation: Dictionary as returned by simulate_percentiles
+        ax: Optional matplotlib Axes; a new Agg-backed Figure is created if None
+        years: Optional x-axis labels (defaults to the simulation's 'years' or period numbers)
+        title: Chart title
+
+    Returns:
+        The Figure drawn on
+    """
+    if ax is None:
+        fig = Figure(figsize=(10, 6))
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
+    else:
+        fig = ax.figure
+
+    bands = simulation['bands']
+    percentiles = simulation['percentiles']
+    if years is None:
+        years = simulation.get('years') or list(range(1, bands.shape[1] + 1))
+
+    # Shade symmetric percentile pairs, darker towards the median
+    pairs = len(percentiles) // 2
+    for i in range(pairs):
+        ax.fill_between(years, bands[i], bands[-1 - i], color='tab:blue', alpha=0.15 + 0.2 * i,
+                        linewidth=0, label=f"P{percentiles[i]:g}-P{percentiles[-1 - i]:g}")
+    if len(percentiles) % 2:
+        ax.plot(years, bands[pairs], color='tab:blue', label=f"P{percentiles[pairs]:g}")
+    ax.plot(years, simulation['contributed'], color='black', linestyle='--', label="Contributed")
+
+    ax.set_title(title)
+    ax.set_ylabel("Value")
+    ax.legend(loc='upper left')
+    ax.grid(True, alpha=0.3)
+    return fig
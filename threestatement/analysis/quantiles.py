@@ -0,0 +1,363 @@
+"""
+Streaming quantile estimation for Monte Carlo outputs.
+
+A TDigest summarises any number of values in a bounded set of weighted
+centroids: small near the tails, where percentiles such as P5 and P95 need
+resolution, and large in the middle. Values are added in array batches and
+two digests are merged by pooling their centroids, so simulations can be
+split across batches or worker processes and combined afterwards in
+constant memory. ForecastQuantiles keeps one digest per forecast output
+and period, and simulate_forecast_quantiles runs a Monte Carlo around the
+forecast assumptions without ever storing the paths.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from analysis.forecast_kernel import forecast_periods
+from analysis.forecasting import FinancialForecast
+from analysis.sampling import ANTITHETIC, RANDOM, SAMPLING_METHODS, SOBOL, standard_normal_draws
+from core.financial_arrays import FinancialArrays, from_financial_data
+
+# Compression: larger keeps more centroids (about compression / 2) and is more accurate
+DEFAULT_COMPRESSION = 200
+
+# Values buffered before they are merged into the centroids
+DEFAULT_BUFFER_SIZE = 50000
+
+# Forecast outputs and percentiles summarised by default
+DEFAULT_OUTPUTS = ('net_income', 'ending_cash_balance')
+DEFAULT_PERCENTILES = (5, 50, 95)
+
+# Paths forecast together in one batch of a simulation
+DEFAULT_BATCH_SIZE = 50000
+
+
+class TDigest:
+    """
+    Mergeable t-digest sketch of a stream of values.
+    """
+
+    def __init__(self, compression=DEFAULT_COMPRESSION, buffer_size=DEFAULT_BUFFER_SIZE):
+        """
+        Initialize an empty digest.
+
+        Args:
+            compression: Scale of the k1 size limit (about compression / 2 centroids)
+            buffer_size: Number of values buffered before merging
+        """
+        self.compression = compression
+        self.buffer_size = buffer_size
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.count = 0.0
+        self.total = 0.0
+        self.minimum = np.inf
+        self.maximum = -np.inf
+        self._buffer = []
+        self._buffered = 0
+
+    def __len__(self):
+        return int(self.count)
+
+    def update(self, values, weights=None):
+        """
+        Add values.
+
+        Args:
+            values: Array of values (NaNs are ignored)
+            weights: Optional array of weights, one per value
+        """
+        values = np.asarray(values, dtype=float).ravel()
+        weights = np.ones_like(values) if weights is None else np.asarray(weights, dtype=float).ravel()
+        valid = ~np.isnan(values)
+        if not valid.all():
+            values, weights = values[valid], weights[valid]
+        if not len(values):
+            return
+        self.count += weights.sum()
+        self.total += values @ weights
+        self.minimum = min(self.minimum, values.min())
+        self.maximum = max(self.maximum, values.max())
+        self._buffer.append((values, weights))
+        self._buffered += len(values)
+        if self._buffered >= self.buffer_size:
+            self._compress()
+
+    def merge(self, other):
+        """
+        Add every value summarised by another digest.
+
+        Args:
+            other: TDigest
+        """
+        other._compress()
+        if not other.count:
+            return
+        self.count += other.count
+        self.total += other.total
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        self._buffer.append((other.means, other.weights))
+        self._buffered += len(other.means)
+        self._compress()
+
+    def _compress(self):
+        """Merge the buffered values into the centroids."""
+        if not self._buffer:
+            return
+        means = np.concatenate([self.means] + [values for values, _ in self._buffer])
+        weights = np.concatenate([self.weights] + [weights for _, weights in self._buffer])
+        self._buffer = []
+        self._buffered = 0
+
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+        # Group neighbours whose left cumulative quantile falls in the same unit of the k1 scale
+        q = (np.cumsum(weights) - weights) / weights.sum()
+        k = self.compression / (2 * np.pi) * np.arcsin(2 * q - 1)
+        groups = np.floor(k - k[0]).astype(np.int64)
+
+        merged = np.bincount(groups, weights)
+        sums = np.bincount(groups, weights * means)
+        used = merged > 0
+        self.weights = merged[used]
+        self.means = sums[used] / self.weights
+
+    def quantile(self, q):
+        """
+        Estimate quantiles.
+
+        Args:
+            q: Quantile or array of quantiles (0 to 1)
+
+        Returns:
+            Estimated values (NaN for an empty digest)
+        """
+        self._compress()
+        q = np.asarray(q, dtype=float)
+        if not self.count:
+            return np.full(q.shape, np.nan)
+        # Centroid means sit at the middle of their weight; the extremes are exact
+        positions = np.concatenate(([0.0], np.cumsum(self.weights) - self.weights / 2, [self.count]))
+        values = np.concatenate(([self.minimum], self.means, [self.maximum]))
+        return np.interp(q * self.count, positions, values)
+
+    def percentiles(self, percentiles=DEFAULT_PERCENTILES):
+        """Estimate percentiles (0 to 100)."""
+        return self.quantile(np.asarray(percentiles, dtype=float) / 100)
+
+    def cdf(self, x):
+        """
+        Estimate the share of values at or below x.
+
+        Args:
+            x: Value or array of values
+
+        Returns:
+            Fractions (NaN for an empty digest)
+        """
+        self._compress()
+        x = np.asarray(x, dtype=float)
+        if not self.count:
+            return np.full(x.shape, np.nan)
+        positions = np.concatenate(([0.0], np.cumsum(self.weights) - self.weights / 2, [self.count]))
+        values = np.concatenate(([self.minimum], self.means, [self.maximum]))
+        return np.interp(x, values, positions) / self.count
+
+    @property
+    def mean(self):
+        """Exact mean of the values added."""
+        return self.total / self.count if self.count else np.nan
+
+    def to_dict(self):
+        """
+        Get the digest as a dictionary of plain values.
+
+        Returns:
+            Dictionary with the compression, centroid 'means' and 'weights',
+            'count', 'sum', 'min' and 'max'
+        """
+        self._compress()
+        return {
+            'compression': self.compression,
+            'means': self.means.tolist(),
+            'weights': self.weights.tolist(),
+            'count': self.count,
+            'sum': self.total,
+            'min': float(self.minimum),
+            'max': float(self.maximum),
+        }
+
+
+def digest_from_dict(values):
+    """
+    Rebuild a TDigest from TDigest.to_dict output.
+
+    Args:
+        values: Dictionary as returned by to_dict
+
+    Returns:
+        TDigest
+    """
+    digest = TDigest(values['compression'])
+    digest.means = np.asarray(values['means'], dtype=float)
+    digest.weights = np.asarray(values['weights'], dtype=float)
+    digest.count = values['count']
+    digest.total = values['sum']
+    digest.minimum = values['min']
+    digest.maximum = values['max']
+    return digest
+
+
+class ForecastQuantiles:
+    """
+    One TDigest per forecast output and period.
+    """
+
+    def __init__(self, outputs=DEFAULT_OUTPUTS, periods=1, compression=DEFAULT_COMPRESSION):
+        """
+        Initialize empty sketches.
+
+        Args:
+            outputs: FinancialData field names to summarise
+            periods: Number of forecast periods
+            compression: TDigest compression
+        """
+        self.outputs = list(outputs)
+        self.periods = periods
+        self.digests = {name: [TDigest(compression) for _ in range(periods)] for name in self.outputs}
+
+    def update(self, period, forecast):
+        """
+        Add the paths of one forecast period.
+
+        Args:
+            period: Period index (0 for the first forecast period)
+            forecast: Dictionary of field arrays, one value per path
+        """
+        for name in self.outputs:
+            self.digests[name][period].update(forecast[name])
+
+    def merge(self, other):
+        """
+        Add the paths summarised by another ForecastQuantiles with the same outputs and periods.
+
+        Args:
+            other: ForecastQuantiles
+        """
+        for name in self.outputs:
+            for digest, other_digest in zip(self.digests[name], other.digests[name]):
+                digest.merge(other_digest)
+
+    def percentiles(self, percentiles=DEFAULT_PERCENTILES):
+        """
+        Estimate percentiles of every output and period.
+
+        Args:
+            percentiles: Percentiles (0 to 100)
+
+        Returns:
+            Dictionary mapping output names to arrays of shape (len(percentiles), periods)
+        """
+        return {name: np.column_stack([digest.percentiles(percentiles) for digest in digests])
+                for name, digests in self.digests.items()}
+
+    def means(self):
+        """Exact mean of every output per period, as arrays of shape (periods,)."""
+        return {name: np.array([digest.mean for digest in digests]) for name, digests in self.digests.items()}
+
+
+def _simulate_batches(base_data, assumptions, uncertainty, periods, paths, batch_size, outputs, compression, seed,
+                      sampling):
+    """Simulate paths in batches into a ForecastQuantiles (run in each worker)."""
+    rng = np.random.default_rng(seed)
+    # A Sobol stream keeps one scramble across batches and continues where the last batch stopped
+    scramble = rng.integers(2 ** 63)
+    names = list(uncertainty)
+    base = base_data if isinstance(base_data, FinancialArrays) else from_financial_data([base_data])
+    sketch = ForecastQuantiles(outputs, periods, compression)
+    done = 0
+    while done < paths:
+        size = min(batch_size, paths - done)
+        sampled = dict(assumptions)
+        draws = standard_normal_draws(size, len(names), sampling, scramble if sampling == SOBOL else rng, done)
+        for j, name in enumerate(names):
+            sampled[name] = assumptions[name] + uncertainty[name] * draws[:, j]
+        current = {name: np.repeat(values, size) for name, values in base.columns.items()}
+        # Step one period at a time, so only the current period of the batch is in memory
+        for period in range(periods):
+            current = forecast_periods(current, sampled, 1)[0]
+            sketch.update(period, current)
+        done += size
+    return sketch
+
+
+def simulate_forecast_quantiles(base_data, uncertainty, paths, periods, assumptions=None, outputs=DEFAULT_OUTPUTS,
+                                percentiles=DEFAULT_PERCENTILES, batch_size=DEFAULT_BATCH_SIZE,
+                                compression=DEFAULT_COMPRESSION, workers=1, seed=None, sampling=RANDOM):
+    """
+    Monte Carlo simulation of forecast outputs summarised by streaming quantiles.
+
+    Each path draws its assumptions from normal distributions around the
+    forecast assumptions. Paths are forecast in batches and folded into
+    t-digests, so memory depends on batch_size, not on paths. With several
+    workers each process simulates its share with an independent random
+    stream and the digests are merged.
+
+    Args:
+        base_data: FinancialData (or single-row FinancialArrays) for the base period
+        uncertainty: Dictionary mapping assumption names to standard deviations
+        paths: Number of simulated paths
+        periods: Number of periods to forecast
+        assumptions: Optional assumption overrides (FinancialForecast defaults otherwise)
+        outputs: FinancialData fields to summarise
+        percentiles: Percentiles to report (0 to 100)
+        batch_size: Paths forecast together
+        compression: TDigest compression
+        workers: Number of worker processes
+        seed: Optional random seed
+        sampling: RANDOM, ANTITHETIC or SOBOL draws (see analysis.sampling)
+
+    Returns:
+        Dictionary with 'percentiles', 'bands' (output name -> array of shape
+        (len(percentiles), periods)), 'mean' (output name -> array (periods,)),
+        'paths' and the merged 'sketch' (ForecastQuantiles)
+    """
+    model_assumptions = dict(FinancialForecast(None).assumptions)
+    model_assumptions.update(assumptions or {})
+    unknown = [name for name in uncertainty if name not in model_assumptions]
+    if unknown:
+        raise ValueError(f"Unknown assumptions: {', '.join(unknown)}")
+    if sampling not in SAMPLING_METHODS:
+        raise ValueError(f"Unknown sampling method: {sampling}")
+
+    # Antithetic pairs must not be split between batches or workers
+    step = 2 if sampling == ANTITHETIC else 1
+    if paths % step or batch_size % step:
+        raise ValueError("Antithetic sampling needs an even number of paths and batch size")
+    workers = max(1, min(workers, paths // step))
+    pairs = paths // step
+    shares = [step * (pairs // workers + (i < pairs % workers)) for i in range(workers)]
+    seeds = np.random.SeedSequence(seed).spawn(workers)
+    jobs = [(base_data, model_assumptions, uncertainty, periods, share, batch_size, outputs, compression, job_seed,
+             sampling)
+            for share, job_seed in zip(shares, seeds)]
+
+    if workers == 1:
+        sketches = [_simulate_batches(*jobs[0])]
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            sketches = list(pool.map(_simulate_batches, *zip(*jobs)))
+
+    sketch = sketches[0]
+    for other in sketches[1:]:
+        sketch.merge(other)
+    return {
+        'percentiles': tuple(percentiles),
+        'bands': sketch.percentiles(percentiles),
+        'mean': sketch.means(),
+        'paths': paths,
+        'sketch': sketch,
+    }
@@ -2,6 +2,10 @@
 Module for calculating financial ratios and metrics.
 """
 
+import numpy as np
+
+from core.instrumentation import instrumented
+
 class FinancialRatios:
     """
     Class to calculate financial ratios from financial data.
@@ -137,6 +141,7 @@ class FinancialRatios:
             'dividend_yield': self.data.dividends_declared / market_cap if market_cap > 0 else 0
         }
     
+    @instrumented('ratios.all')
     def get_all_ratios(self):
         """
         Get all financial ratios.
@@ -150,4 +155,100 @@ class FinancialRatios:
             'solvency': self.get_solvency_ratios(),
             'efficiency': self.get_efficiency_ratios(),
             'valuation': self.get_valuation_ratios()
-        }
\ No newline at end of file
+        }
+    
+    def get_flat_ratios(self):
+        """
+        Get all financial ratios in a single dictionary.
+        
+        Ratio names are unique across categories, so the categories can be dropped.
+        
+        Returns:
+            Dictionary mapping ratio names to values
+        """
+        ratios = {}
+        for category in self.get_all_ratios().values():
+            ratios.update(category)
+        return ratios
+
+
+def _ratio(numerator, denominator, valid, default):
+    """Divide where valid, using default elsewhere, without division warnings."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(valid, numerator / np.where(valid, denominator, 1), default)
+
+
+@instrumented('ratios.arrays')
+def compute_ratio_arrays(data):
+    """
+    Calculate every ratio of FinancialRatios for many companies at once.
+
+    Applies the same formulas and zero-denominator guards as FinancialRatios,
+    element-wise.
+
+    Args:
+        data: FinancialData whose fields are arrays (see core.financial_arrays)
+
+    Returns:
+        Dictionary mapping ratio names to float arrays, in get_flat_ratios order
+    """
+    revenue = np.asarray(data.revenue, dtype=float)
+    cogs = data.cogs
+    net_income = data.net_income
+    total_assets = data.total_assets
+    total_equity = data.total_equity
+    ebitda = data.ebitda
+    interest_expense = data.interest_expense
+    has_revenue = revenue > 0
+    
+    # Profitability (all zero when revenue is zero)
+    nonzero_revenue = revenue != 0
+    ratios = {
+        'gross_margin': _ratio(revenue - cogs, revenue, has_revenue, 0),
+        'operating_margin': _ratio(data.operating_income, revenue, has_revenue, 0),
+        'net_margin': _ratio(net_income, revenue, has_revenue, 0),
+        'return_on_assets': _ratio(net_income, total_assets, nonzero_revenue & (total_assets > 0), 0),
+        'return_on_equity': _ratio(net_income, total_equity, nonzero_revenue & (total_equity > 0), 0),
+    }
+    
+    # Liquidity
+    current_assets = data.cash + data.accounts_receivable + data.inventory + data.prepaid_expenses
+    current_liabilities = data.accounts_payable + data.accrued_expenses + data.short_term_debt + data.deferred_revenue
+    has_liabilities = current_liabilities > 0
+    ratios['current_ratio'] = _ratio(current_assets, current_liabilities, has_liabilities, np.inf)
+    ratios['quick_ratio'] = _ratio(current_assets - data.inventory, current_liabilities, has_liabilities, np.inf)
+    ratios['cash_ratio'] = _ratio(data.cash, current_liabilities, has_liabilities, np.inf)
+    
+    # Solvency
+    total_debt = data.short_term_debt + data.long_term_debt
+    ratios['debt_to_assets'] = _ratio(total_debt, total_assets, total_assets > 0, 0)
+    ratios['debt_to_equity'] = _ratio(total_debt, total_equity, total_equity > 0, np.inf)
+    ratios['interest_coverage'] = _ratio(ebitda, interest_expense, interest_expense > 0, np.inf)
+    ratios['debt_to_ebitda'] = _ratio(total_debt, ebitda, ebitda > 0, np.inf)
+    
+    # Efficiency
+    accounts_receivable = data.accounts_receivable
+    inventory = data.inventory
+    accounts_payable = data.accounts_payable
+    ratios['asset_turnover'] = _ratio(revenue, total_assets, total_assets > 0, 0)
+    ratios['receivables_turnover'] = _ratio(revenue, accounts_receivable, accounts_receivable > 0, np.inf)
+    ratios['inventory_turnover'] = _ratio(cogs, inventory, inventory > 0, np.inf)
+    ratios['payables_turnover'] = _ratio(cogs, accounts_payable, accounts_payable > 0, np.inf)
+    ratios['days_sales_outstanding'] = _ratio(365 * accounts_receivable, revenue, has_revenue, 0)
+    ratios['days_inventory_outstanding'] = _ratio(365 * inventory, cogs, cogs > 0, 0)
+    ratios['days_payable_outstanding'] = _ratio(365 * accounts_payable, cogs, cogs > 0, 0)
+    
+    # Valuation
+    shares_outstanding = data.shares_outstanding
+    market_cap = data.market_cap
+    enterprise_value = data.enterprise_value
+    book_value = data.book_value
+    earnings_per_share = _ratio(net_income, shares_outstanding, shares_outstanding > 0, 0)
+    ratios['pe_ratio'] = _ratio(data.share_price, earnings_per_share, earnings_per_share > 0, np.inf)
+    ratios['price_to_book'] = _ratio(market_cap, book_value, book_value > 0, np.inf)
+    ratios['price_to_sales'] = _ratio(market_cap, revenue, has_revenue, np.inf)
+    ratios['ev_to_ebitda'] = _ratio(enterprise_value, ebitda, ebitda > 0, np.inf)
+    ratios['ev_to_revenue'] = _ratio(enterprise_value, revenue, has_revenue, np.inf)
+    ratios['dividend_yield'] = _ratio(data.dividends_declared, market_cap, market_cap > 0, 0)
+    
+    return {name: np.asarray(values, dtype=float) for name, values in ratios.items()}
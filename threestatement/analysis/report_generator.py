@@ -0,0 +1,332 @@
+"""
+Module for generating report packs for many companies at once.
+
+Each pack contains the three statements for the base and forecast years,
+the comparison tables, the MD&A notes and the comparison charts. Charts
+are drawn on matplotlib Figure objects with the Agg canvas, so packs can
+be produced in worker processes without a display or a pyplot backend.
+"""
+
+import html
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.backends.backend_pdf import PdfPages
+from matplotlib.figure import Figure
+
+from analysis.comparison import (
+    FinancialComparison,
+    _format_income_statement_comparison,
+    _format_balance_sheet_comparison,
+    _format_cash_flow_comparison,
+    _get_income_statement_chart_data,
+    _get_balance_sheet_chart_data,
+    _get_cash_flow_chart_data,
+    _create_comparison_chart,
+    _create_ratio_chart
+)
+from analysis.forecasting import FinancialForecast
+from core.renderers import render_csv, render_html, render_text
+from core.statements import build_statements
+
+# Stages timed for every report pack, in execution order
+REPORT_STAGES = ('forecast', 'statements', 'comparison', 'notes', 'charts', 'write')
+
+# Lines of monospaced text per PDF page
+PDF_LINES_PER_PAGE = 70
+
+
+class _StageTimer:
+    """
+    Accumulate wall-clock time per report stage.
+    """
+
+    def __init__(self):
+        self.timings = dict.fromkeys(REPORT_STAGES, 0.0)
+        self._stage = None
+        self._start = None
+
+    def start(self, stage):
+        """Finish the current stage and start timing the next one."""
+        now = time.perf_counter()
+        if self._stage is not None:
+            self.timings[self._stage] += now - self._start
+        self._stage = stage
+        self._start = now
+
+    def stop(self):
+        """Finish the current stage."""
+        self.start(None)
+        return self.timings
+
+
+def _slugify(text):
+    """Turn a company name into a safe directory name."""
+    slug = re.sub(r'[^A-Za-z0-9]+', '-', text).strip('-').lower()
+    return slug or 'company'
+
+
+def _report_years(base_data, base_year=None, forecast_year=None):
+    """
+    Determine the column labels for the base and forecast years.
+
+    Mirrors the dashboard, which takes the base year from the last four
+    characters of the reporting period.
+    """
+    if base_year is None:
+        base_year = base_data.reporting_period[-4:]
+    if forecast_year is None:
+        forecast_year = str(int(base_year) + 1) if base_year.isdigit() else "Forecast"
+    return base_year, forecast_year
+
+
+def _render_chart(chart, path, comparison, base_year, forecast_year):
+    """
+    Draw one comparison chart on an Agg canvas and save it as a PNG.
+
+    Args:
+        chart: Tuple of (title, chart_data), with chart_data None for the ratio chart
+        path: Output file path
+        comparison: FinancialComparison instance
+        base_year: Base year label
+        forecast_year: Forecast year label
+
+    Returns:
+        The rendered Figure
+    """
+    title, chart_data = chart
+    fig = Figure(figsize=(10, 6))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+
+    if chart_data is None:
+        _create_ratio_chart(ax, comparison, base_year, forecast_year)
+    else:
+        _create_comparison_chart(ax, chart_data, base_year, forecast_year)
+    ax.set_title(title)
+
+    fig.tight_layout()
+    fig.savefig(path, dpi=100)
+    return fig
+
+
+def _text_figures(text):
+    """
+    Lay out monospaced text over as many PDF pages as needed.
+
+    Args:
+        text: Text to lay out
+
+    Returns:
+        List of Figures, one per page
+    """
+    lines = text.strip("\n").splitlines() or [""]
+    figures = []
+    for start in range(0, len(lines), PDF_LINES_PER_PAGE):
+        fig = Figure(figsize=(8.5, 11))
+        FigureCanvasAgg(fig)
+        fig.text(0.05, 0.97, "\n".join(lines[start:start + PDF_LINES_PER_PAGE]),
+                 family='monospace', fontsize=6, va='top', ha='left')
+        figures.append(fig)
+    return figures
+
+
+def _report_html(company_name, base_year, forecast_year, statement_html, comparison_text, notes, chart_files):
+    """Assemble the HTML report page."""
+    charts = "\n".join(f'<img src="{html.escape(name)}" alt="{html.escape(name)}">' for name in chart_files)
+    return f"""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{html.escape(company_name)} - {base_year} vs. {forecast_year}</title>
+<style>
+body {{ font-family: Arial, sans-serif; margin: 2em; }}
+table {{ border-collapse: collapse; min-width: 32em; }}
+td.value {{ text-align: right; }}
+tr.rule-above td {{ border-top: 1px solid #999; }}
+tr.indent-1 td:first-child {{ padding-left: 1.5em; }}
+tr.indent-2 td:first-child {{ padding-left: 3em; }}
+pre {{ background: #f7f7f7; padding: 1em; }}
+img {{ max-width: 100%; }}
+</style>
+</head>
+<body>
+<h1>{html.escape(company_name)}</h1>
+<p>{base_year} vs. {forecast_year}</p>
+<h2>Financial Statements</h2>
+{statement_html}
+<h2>Comparison</h2>
+<pre>{html.escape(comparison_text)}</pre>
+<h2>Management Discussion and Analysis</h2>
+<pre>{html.escape(notes)}</pre>
+<h2>Charts</h2>
+{charts}
+</body>
+</html>
+"""
+
+
+def _pack_name(company_name, base_year):
+    """Default pack directory name of a company and base year."""
+    return f"{_slugify(company_name)}-{base_year}"
+
+def generate_report_pack(base_data, forecast_data=None, output_dir="reports", base_year=None,
+                         forecast_year=None, formats=('html', 'pdf'), pack_name=None):
+    """
+    Generate a full report pack for one company.
+
+    Args:
+        base_data: FinancialData for the base year
+        forecast_data: Forecasted FinancialData, generated with default assumptions if None
+        output_dir: Directory in which the company's pack directory is created
+        base_year: Optional base year label (taken from the reporting period by default)
+        forecast_year: Optional forecast year label
+        formats: Report formats to write, any of 'html' and 'pdf'
+        pack_name: Optional pack directory name (the slugified company name and
+            base year by default)
+
+    Returns:
+        Dictionary with the company name, pack directory and per-stage timings in seconds
+    """
+    timer = _StageTimer()
+    base_year, forecast_year = _report_years(base_data, base_year, forecast_year)
+
+    timer.start('forecast')
+    if forecast_data is None:
+        forecast_data = FinancialForecast(base_data).generate_forecast()
+
+    # Statements for both years
+    timer.start('statements')
+    base_statements = build_statements(base_data)
+    forecast_statements = build_statements(forecast_data)
+    statement_html = "".join(
+        f"<h3>{label}</h3>\n" + "".join(render_html(statement) for statement in statements.values())
+        for label, statements in ((base_year, base_statements), (forecast_year, forecast_statements))
+    )
+    statement_csv = "".join(
+        render_csv(statement) for statements in (base_statements, forecast_statements)
+        for statement in statements.values()
+    )
+    statement_texts = [
+        render_text(statement) for statements in (base_statements, forecast_statements)
+        for statement in statements.values()
+    ]
+
+    # Comparison tables
+    timer.start('comparison')
+    comparison = FinancialComparison(base_data, forecast_data)
+    income_data = comparison.get_income_statement_comparison()
+    balance_data = comparison.get_balance_sheet_comparison()
+    cash_flow_data = comparison.get_cash_flow_comparison()
+    comparison_text = (
+        _format_income_statement_comparison(income_data, base_year, forecast_year) +
+        _format_balance_sheet_comparison(balance_data, base_year, forecast_year) +
+        _format_cash_flow_comparison(cash_flow_data, base_year, forecast_year)
+    )
+
+    # MD&A
+    timer.start('notes')
+    notes = comparison.notes_generator.generate_comprehensive_notes()
+
+    # Charts
+    timer.start('charts')
+    pack_dir = os.path.join(output_dir, pack_name or _pack_name(base_data.company_name, base_year))
+    os.makedirs(pack_dir, exist_ok=True)
+
+    charts = {
+        'income_chart.png': ("Income Statement Comparison", _get_income_statement_chart_data(income_data)),
+        'balance_chart.png': ("Balance Sheet Comparison", _get_balance_sheet_chart_data(balance_data)),
+        'cash_flow_chart.png': ("Cash Flow Comparison", _get_cash_flow_chart_data(cash_flow_data)),
+        'ratio_chart.png': ("Key Ratios Comparison", None),
+    }
+    figures = [
+        _render_chart(chart, os.path.join(pack_dir, name), comparison, base_year, forecast_year)
+        for name, chart in charts.items()
+    ]
+
+    # Write the pack
+    timer.start('write')
+    with open(os.path.join(pack_dir, 'statements.csv'), 'w', encoding='utf-8') as f:
+        f.write(statement_csv)
+    with open(os.path.join(pack_dir, 'comparison.txt'), 'w', encoding='utf-8') as f:
+        f.write(comparison_text)
+    with open(os.path.join(pack_dir, 'mda.md'), 'w', encoding='utf-8') as f:
+        f.write(notes)
+
+    if 'html' in formats:
+        with open(os.path.join(pack_dir, 'report.html'), 'w', encoding='utf-8') as f:
+            f.write(_report_html(base_data.company_name, base_year, forecast_year,
+                                 statement_html, comparison_text, notes, list(charts)))
+
+    if 'pdf' in formats:
+        # Each statement starts on a new page, ahead of the comparison
+        statement_figures = [fig for text in statement_texts for fig in _text_figures(text)]
+        with PdfPages(os.path.join(pack_dir, 'report.pdf')) as pdf:
+            for fig in statement_figures + _text_figures(comparison_text) + _text_figures(notes) + figures:
+                pdf.savefig(fig)
+
+    return {
+        'company': base_data.company_name,
+        'path': pack_dir,
+        'timings': timer.stop(),
+    }
+
+
+def _generate_report_pack_job(job):
+    """Process pool entry point; unpacks a job tuple."""
+    base_data, forecast_data, output_dir, formats, pack_name = job
+    return generate_report_pack(base_data, forecast_data, output_dir, formats=formats, pack_name=pack_name)
+
+
+def generate_report_packs(companies, output_dir="reports", max_workers=None, formats=('html', 'pdf'), chunksize=1):
+    """
+    Generate report packs for many companies in parallel.
+
+    Args:
+        companies: Iterable of FinancialData or (base_data, forecast_data) pairs;
+            a forecast of None is generated with default assumptions
+        output_dir: Directory in which the pack directories are created; companies
+            whose names give the same directory (e.g. "ABC Corp." and "ABC Corp")
+            get a numeric suffix, so parallel workers never share a directory
+        max_workers: Number of worker processes (defaults to the CPU count)
+        formats: Report formats to write, any of 'html' and 'pdf'
+        chunksize: Number of companies handed to a worker at a time
+
+    Returns:
+        Dictionary with the per-company results, the total time spent in each
+        stage across all workers, and the elapsed wall-clock time
+    """
+    jobs = []
+    used = set()
+    for company in companies:
+        if isinstance(company, tuple):
+            base_data, forecast_data = company
+        else:
+            base_data, forecast_data = company, None
+        name = pack_name = _pack_name(base_data.company_name, _report_years(base_data)[0])
+        suffix = 1
+        while pack_name in used:
+            suffix += 1
+            pack_name = f"{name}-{suffix}"
+        used.add(pack_name)
+        jobs.append((base_data, forecast_data, output_dir, formats, pack_name))
+
+    os.makedirs(output_dir, exist_ok=True)
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(_generate_report_pack_job, jobs, chunksize=chunksize))
+
+    stage_totals = dict.fromkeys(REPORT_STAGES, 0.0)
+    for result in results:
+        for stage, seconds in result['timings'].items():
+            stage_totals[stage] += seconds
+
+    return {
+        'reports': results,
+        'stage_totals': stage_totals,
+        'wall_time': time.perf_counter() - start,
+    }
@@ -0,0 +1,373 @@
+"""
+Quasi-Monte Carlo and variance-reduction sampling for forecast simulations.
+
+Stochastic forecasts draw their assumptions as mean + deviation * Z for
+standard normal Z. This module produces Z three ways: plain pseudo-random
+draws, antithetic pairs (Z, -Z) and scrambled Sobol low-discrepancy points
+mapped through the inverse normal CDF. simulate_forecast_mean adds a
+control variate built from the deterministic forecast, the first-order
+expansion of the output around the assumption means, whose expectation is
+known exactly. Standard errors are estimated the way each method needs:
+over antithetic pair means, and over independently scrambled Sobol
+replicates.
+"""
+
+import numpy as np
+
+from analysis.forecast_kernel import forecast_periods
+from analysis.forecasting import FinancialForecast
+from core.financial_arrays import FinancialArrays, from_financial_data
+
+# Sampling methods
+RANDOM = 'random'
+ANTITHETIC = 'antithetic'
+SOBOL = 'sobol'
+SAMPLING_METHODS = (RANDOM, ANTITHETIC, SOBOL)
+
+# Independently scrambled Sobol replicates used for standard errors
+DEFAULT_REPLICATES = 8
+
+# Two-sided 95% normal quantile
+Z_95 = 1.959963984540054
+
+# Bits of precision of the Sobol points (at most 2**32 points per sequence)
+_BITS = 32
+
+# Sobol direction numbers of dimensions 2 and up (Joe and Kuo): degree s and
+# coefficients a of the primitive polynomial, and the initial m values
+_DIRECTIONS = (
+    (1, 0, (1,)),
+    (2, 1, (1, 3)),
+    (3, 1, (1, 3, 1)),
+    (3, 2, (1, 1, 1)),
+    (4, 1, (1, 1, 3, 3)),
+    (4, 4, (1, 3, 5, 13)),
+    (5, 2, (1, 1, 5, 5, 17)),
+    (5, 4, (1, 1, 5, 5, 5)),
+    (5, 7, (1, 1, 7, 11, 19)),
+    (5, 11, (1, 1, 5, 1, 1)),
+    (5, 13, (1, 1, 1, 3, 11)),
+    (5, 14, (1, 3, 5, 5, 31)),
+    (6, 1, (1, 3, 3, 9, 7, 49)),
+    (6, 13, (1, 1, 1, 15, 21, 21)),
+    (6, 16, (1, 3, 1, 13, 27, 49)),
+    (6, 19, (1, 1, 1, 15, 7, 5)),
+    (6, 22, (1, 3, 1, 15, 13, 25)),
+    (6, 25, (1, 1, 5, 5, 19, 61)),
+    (7, 1, (1, 3, 7, 11, 23, 15, 103)),
+    (7, 4, (1, 3, 7, 13, 13, 15, 69)),
+)
+
+MAX_SOBOL_DIMENSIONS = len(_DIRECTIONS) + 1
+
+# Coefficients of Acklam's rational approximation of the inverse normal CDF
+_PPF_A = (-3.969683028665376e+01, 2.209460984245205e+02, -2.759285104469687e+02,
+          1.383577518672690e+02, -3.066479806614716e+01, 2.506628277459239e+00)
+_PPF_B = (-5.447609879822406e+01, 1.615858368580409e+02, -1.556989798598866e+02,
+          6.680131188771972e+01, -1.328068155288572e+01)
+_PPF_C = (-7.784894002430293e-03, -3.223964580411365e-01, -2.400758277161838e+00,
+          -2.549732539343734e+00, 4.374664141464968e+00, 2.938163982698783e+00)
+_PPF_D = (7.784695709041462e-03, 3.224671290700398e-01, 2.445134137142996e+00, 3.754408661907416e+00)
+_PPF_LOW = 0.02425
+
+
+def _direction_numbers(dimensions):
+    """Direction numbers V, shape (dimensions, _BITS), as integers scaled by 2**_BITS."""
+    shifts = _BITS - 1 - np.arange(_BITS, dtype=np.uint64)
+    v = np.empty((dimensions, _BITS), dtype=np.uint64)
+    v[0] = np.uint64(1) << shifts
+    for d in range(1, dimensions):
+        s, a, initial = _DIRECTIONS[d - 1]
+        m = list(initial)
+        for j in range(s, _BITS):
+            value = m[j - s] ^ (m[j - s] << s)
+            for k in range(1, s):
+                if (a >> (s - 1 - k)) & 1:
+                    value ^= m[j - k] << k
+            m.append(value)
+        v[d] = np.array(m, dtype=np.uint64) << shifts
+    return v
+
+
+def _parity(x):
+    """Parity of the set bits of 32-bit unsigned integers."""
+    for shift in (16, 8, 4, 2, 1):
+        x = x ^ (x >> np.uint64(shift))
+    return x & np.uint64(1)
+
+
+def _scramble_directions(v, rng):
+    """Apply a random linear matrix scramble to direction numbers."""
+    scrambled = np.zeros_like(v)
+    for d in range(len(v)):
+        for digit in range(_BITS):
+            # Row of a random lower-triangular matrix with unit diagonal, as a bit mask
+            position = _BITS - 1 - digit
+            row = (int(rng.integers(0, 2 ** digit)) << (position + 1)) | (1 << position)
+            scrambled[d] |= _parity(v[d] & np.uint64(row)) << np.uint64(position)
+    return scrambled
+
+
+def sobol_points(count, dimensions, skip=0, scramble=True, seed=None):
+    """
+    Generate Sobol low-discrepancy points in the unit hypercube.
+
+    Scrambling multiplies the generator matrices by random lower-triangular
+    binary matrices and applies a random digital shift (XOR). Both keep the
+    stratification of the sequence while making every set of points an
+    unbiased sample; different seeds give independent replicates.
+
+    Args:
+        count: Number of points
+        dimensions: Number of dimensions (at most MAX_SOBOL_DIMENSIONS)
+        skip: Index of the first point, to continue a sequence in batches
+        scramble: Apply a random digital shift
+        seed: Optional random seed or numpy Generator for the shift
+
+    Returns:
+        Array of shape (count, dimensions) with values strictly between 0 and 1
+    """
+    if not 1 <= dimensions <= MAX_SOBOL_DIMENSIONS:
+        raise ValueError(f"Sobol points support 1 to {MAX_SOBOL_DIMENSIONS} dimensions")
+    if skip + count > 2 ** _BITS:
+        raise ValueError(f"Sobol sequences hold at most 2**{_BITS} points")
+    v = _direction_numbers(dimensions)
+    if scramble:
+        rng = seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+        v = _scramble_directions(v, rng)
+    index = np.arange(skip, skip + count, dtype=np.uint64)
+    points = np.zeros((count, dimensions), dtype=np.uint64)
+    for bit in range(int(skip + count).bit_length()):
+        mask = ((index >> np.uint64(bit)) & np.uint64(1)).astype(bool)
+        points[mask] ^= v[:, bit]
+    if scramble:
+        points ^= rng.integers(0, 2 ** _BITS, dimensions, dtype=np.uint64)
+    # Centre each point in its cell of width 2**-_BITS, so no value is exactly 0
+    return (points.astype(float) + 0.5) / 2.0 ** _BITS
+
+
+def _polynomial(coefficients, x):
+    result = np.zeros_like(x)
+    for coefficient in coefficients:
+        result = result * x + coefficient
+    return result
+
+
+def normal_ppf(u):
+    """
+    Inverse of the standard normal CDF.
+
+    Uses Acklam's rational approximation (relative error below 1.2e-9).
+
+    Args:
+        u: Probabilities strictly between 0 and 1
+
+    Returns:
+        Standard normal quantiles
+    """
+    u = np.asarray(u, dtype=float)
+    result = np.empty_like(u)
+    low = u < _PPF_LOW
+    high = u > 1 - _PPF_LOW
+    central = ~(low | high)
+
+    q = u[central] - 0.5
+    r = q * q
+    result[central] = _polynomial(_PPF_A, r) * q / (_polynomial(_PPF_B, r) * r + 1)
+    for mask, sign, tail in ((low, 1, u[low]), (high, -1, 1 - u[high])):
+        q = np.sqrt(-2 * np.log(tail))
+        result[mask] = sign * _polynomial(_PPF_C, q) / (_polynomial(_PPF_D, q) * q + 1)
+    return result
+
+
+def standard_normal_draws(count, dimensions, method=RANDOM, seed=None, skip=0):
+    """
+    Draw standard normal vectors.
+
+    Args:
+        count: Number of draws (even for ANTITHETIC)
+        dimensions: Number of dimensions
+        method: RANDOM, ANTITHETIC or SOBOL
+        seed: Optional random seed or numpy Generator (the scramble of SOBOL)
+        skip: For SOBOL, index of the first point of the sequence
+
+    Returns:
+        Array of shape (count, dimensions); ANTITHETIC draws are pairs,
+        rows 2i and 2i + 1 being Z and -Z
+    """
+    rng = seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+    if method == RANDOM:
+        return rng.standard_normal((count, dimensions))
+    if method == ANTITHETIC:
+        if count % 2:
+            raise ValueError("Antithetic sampling needs an even number of draws")
+        half = rng.standard_normal((count // 2, dimensions))
+        return np.stack((half, -half), axis=1).reshape(count, dimensions)
+    if method == SOBOL:
+        return normal_ppf(sobol_points(count, dimensions, skip, True, rng))
+    raise ValueError(f"Unknown sampling method: {method}")
+
+
+def control_variate(values, control, control_mean):
+    """
+    Adjust samples with a control variate of known mean.
+
+    Args:
+        values: Samples, shape (paths,) or (paths, outputs)
+        control: Control variate samples, same shape
+        control_mean: Exact expectation of the control variate
+
+    Returns:
+        Tuple of (adjusted samples, coefficient beta), with
+        adjusted = values - beta * (control - control_mean) and the
+        variance-minimising beta = cov(values, control) / var(control)
+    """
+    values = np.asarray(values, dtype=float)
+    control = np.asarray(control, dtype=float)
+    centred = control - control.mean(axis=0)
+    variance = (centred * centred).sum(axis=0)
+    covariance = (centred * (values - values.mean(axis=0))).sum(axis=0)
+    beta = np.divide(covariance, variance, out=np.zeros_like(covariance), where=variance > 0)
+    return values - beta * (control - control_mean), beta
+
+
+def mean_and_error(values, method=RANDOM, replicates=1):
+    """
+    Estimate the mean of samples and its standard error.
+
+    Args:
+        values: Samples, shape (paths,) or (paths, outputs)
+        method: Sampling method the samples came from
+        replicates: For SOBOL, number of independently scrambled replicates the
+            paths consist of (in equal consecutive blocks)
+
+    Returns:
+        Tuple of (mean, standard error)
+    """
+    values = np.asarray(values, dtype=float)
+    if method == ANTITHETIC:
+        # Pair means are independent; the pairs themselves are not
+        units = values.reshape((-1, 2) + values.shape[1:]).mean(axis=1)
+    elif method == SOBOL:
+        if replicates < 2:
+            raise ValueError("Sobol standard errors need at least 2 replicates")
+        units = values.reshape((replicates, -1) + values.shape[1:]).mean(axis=1)
+    else:
+        units = values
+    return values.mean(axis=0), units.std(axis=0, ddof=1) / np.sqrt(len(units))
+
+
+def t_critical(degrees_of_freedom, z=Z_95):
+    """
+    Student t quantile matching a normal quantile, for small-sample intervals.
+
+    Uses the Cornish-Fisher expansion (accurate to about 1e-3 from 3 degrees of freedom).
+
+    Args:
+        degrees_of_freedom: Degrees of freedom
+        z: Normal quantile (default two-sided 95%)
+
+    Returns:
+        t quantile
+    """
+    v = float(degrees_of_freedom)
+    return (z + (z ** 3 + z) / (4 * v) + (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96 * v ** 2) +
+            (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z) / (384 * v ** 3))
+
+
+def _output_gradient(base_columns, assumptions, names, deviations, periods, output):
+    """Change of the output per standard deviation of each assumption, by central differences."""
+    rows = 2 * len(names)
+    shifted = dict(assumptions)
+    for j, (name, deviation) in enumerate(zip(names, deviations)):
+        values = np.full(rows, float(assumptions[name]))
+        step = deviation * 1e-3
+        values[2 * j] += step
+        values[2 * j + 1] -= step
+        shifted[name] = values
+    columns = {name: np.repeat(values, rows) for name, values in base_columns.items()}
+    results = [forecast[output] for forecast in forecast_periods(columns, shifted, periods)]
+    # (periods, rows) -> (periods, assumptions)
+    results = np.array(results)
+    return (results[:, 0::2] - results[:, 1::2]) / 2e-3
+
+
+def simulate_forecast_mean(base_data, uncertainty, paths, periods, output='net_income', assumptions=None,
+                           method=RANDOM, control=True, replicates=DEFAULT_REPLICATES, seed=None):
+    """
+    Estimate the expected value of a forecast output with a confidence interval.
+
+    Assumptions are drawn as mean + deviation * Z with Z from the chosen
+    sampling method. With control=True the first-order expansion of the
+    output around the deterministic forecast (FinancialForecast with the
+    mean assumptions) serves as control variate: its expectation is the
+    deterministic forecast itself, so only the non-linear part of the
+    output's variation is left to the sampling error.
+
+    Args:
+        base_data: FinancialData (or single-row FinancialArrays) for the base period
+        uncertainty: Dictionary mapping assumption names to standard deviations
+        paths: Number of simulated paths (a multiple of replicates for SOBOL,
+            even for ANTITHETIC)
+        periods: Number of periods to forecast
+        output: FinancialData field to estimate
+        assumptions: Optional assumption overrides (FinancialForecast defaults otherwise)
+        method: RANDOM, ANTITHETIC or SOBOL
+        control: Use the deterministic forecast as control variate
+        replicates: Independently scrambled replicates for SOBOL standard errors
+        seed: Optional random seed
+
+    Returns:
+        Dictionary with per-period arrays 'mean', 'standard_error', 'lower' and
+        'upper' (95% confidence interval, from the t distribution for SOBOL), the 'deterministic' forecast of the
+        output, the control coefficients 'beta' (None without control), and
+        'method' and 'paths'
+    """
+    model_assumptions = dict(FinancialForecast(None).assumptions)
+    model_assumptions.update(assumptions or {})
+    names = list(uncertainty)
+    unknown = [name for name in names if name not in model_assumptions]
+    if unknown:
+        raise ValueError(f"Unknown assumptions: {', '.join(unknown)}")
+    if method == SOBOL and paths % replicates:
+        raise ValueError("paths must be a multiple of replicates for Sobol sampling")
+    deviations = np.array([uncertainty[name] for name in names], dtype=float)
+
+    rng = np.random.default_rng(seed)
+    if method == SOBOL:
+        block = paths // replicates
+        draws = np.concatenate([standard_normal_draws(block, len(names), SOBOL, rng) for _ in range(replicates)])
+    else:
+        draws = standard_normal_draws(paths, len(names), method, rng)
+
+    base = base_data if isinstance(base_data, FinancialArrays) else from_financial_data([base_data])
+    sampled = dict(model_assumptions)
+    for j, name in enumerate(names):
+        sampled[name] = model_assumptions[name] + deviations[j] * draws[:, j]
+    current = {name: np.repeat(values, paths) for name, values in base.columns.items()}
+    values = np.empty((paths, periods))
+    for period in range(periods):
+        current = forecast_periods(current, sampled, 1)[0]
+        values[:, period] = current[output]
+
+    deterministic = forecast_periods(base, model_assumptions, periods)
+    deterministic = np.array([float(forecast[output][0]) for forecast in deterministic])
+    beta = None
+    if control and names:
+        gradient = _output_gradient(base.columns, model_assumptions, names, deviations, periods, output)
+        linear = deterministic + draws @ gradient.T
+        values, beta = control_variate(values, linear, deterministic)
+
+    mean, error = mean_and_error(values, method, replicates)
+    # Sobol errors come from a handful of replicates, so the interval uses the t distribution
+    critical = t_critical(replicates - 1) if method == SOBOL else Z_95
+    return {
+        'mean': mean,
+        'standard_error': error,
+        'lower': mean - critical * error,
+        'upper': mean + critical * error,
+        'deterministic': deterministic,
+        'beta': beta,
+        'method': method,
+        'paths': paths,
+    }
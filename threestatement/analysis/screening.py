@@ -0,0 +1,314 @@
+"""
+Module for screening a universe of companies on financial ratios.
+
+RatioStore keeps the FinancialRatios outputs of every company as columns,
+split into fixed-size blocks with a min/max zone map per column. A query
+such as "current_ratio > 1.5 and debt_to_ebitda < 3" is parsed into
+predicates, ordered so the most selective one (estimated on a sample of
+rows) runs first, and evaluated block by block: blocks the zone maps rule
+out are skipped, predicates the zone maps prove true for a whole block are
+not evaluated, and later predicates only look at rows that passed the
+earlier ones.
+"""
+
+import operator
+import re
+
+import numpy as np
+
+from analysis.ratios import compute_ratio_arrays
+from core.financial_arrays import from_financial_data
+
+# Rows per block for the min/max zone maps
+DEFAULT_BLOCK_SIZE = 4096
+
+# Rows sampled to estimate predicate selectivity
+SELECTIVITY_SAMPLE_SIZE = 1024
+
+_OPERATORS = {
+    '>': operator.gt,
+    '>=': operator.ge,
+    '<': operator.lt,
+    '<=': operator.le,
+    '==': operator.eq,
+    '!=': operator.ne,
+}
+
+_PREDICATE_PATTERN = re.compile(
+    r'^\s*([A-Za-z_][A-Za-z0-9_]*)\s*(>=|<=|==|!=|>|<)\s*([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?|[-+]?inf)\s*$'
+)
+
+
+class Predicate:
+    """
+    A single comparison of a ratio column against a constant.
+    """
+
+    __slots__ = ('column', 'op', 'value', 'compare')
+
+    def __init__(self, column, op, value):
+        """
+        Initialize a predicate.
+
+        Args:
+            column: Ratio name
+            op: Comparison operator ('>', '>=', '<', '<=', '==' or '!=')
+            value: Constant to compare against
+        """
+        if op not in _OPERATORS:
+            raise ValueError(f"Unsupported operator: {op}")
+        self.column = column
+        self.op = op
+        self.value = float(value)
+        self.compare = _OPERATORS[op]
+
+    def __repr__(self):
+        return f"{self.column} {self.op} {self.value:g}"
+
+    def evaluate(self, values):
+        """
+        Evaluate the predicate on an array of values.
+
+        A missing (NaN) value never matches, whatever the operator.
+
+        Args:
+            values: Array of ratio values
+
+        Returns:
+            Boolean array
+        """
+        result = self.compare(values, self.value)
+        if self.op == '!=':
+            result &= ~np.isnan(values)
+        return result
+
+    def block_bounds(self, minimum, maximum, nans=None):
+        """
+        Classify blocks by their zone maps.
+
+        Args:
+            minimum: Array of per-block minimums, ignoring NaN (NaN for all-NaN blocks)
+            maximum: Array of per-block maximums, ignoring NaN (NaN for all-NaN blocks)
+            nans: Optional array of per-block NaN counts; a block with NaN rows
+                is never certain, as those rows do not match
+
+        Returns:
+            Tuple of (possible, certain) boolean arrays: whether any row of a
+            block can match, and whether every row of a block matches
+        """
+        value = self.value
+        if self.op == '>':
+            possible, certain = maximum > value, minimum > value
+        elif self.op == '>=':
+            possible, certain = maximum >= value, minimum >= value
+        elif self.op == '<':
+            possible, certain = minimum < value, maximum < value
+        elif self.op == '<=':
+            possible, certain = minimum <= value, maximum <= value
+        elif self.op == '==':
+            possible, certain = (minimum <= value) & (maximum >= value), (minimum == value) & (maximum == value)
+        else:
+            possible = ~np.isnan(minimum) & ~((minimum == value) & (maximum == value))
+            certain = (maximum < value) | (minimum > value)
+        if nans is not None:
+            certain = certain & (nans == 0)
+        return possible, certain
+
+
+def parse_query(query):
+    """
+    Parse a screening query into predicates.
+
+    Queries are conjunctions of comparisons between a ratio name and a number,
+    e.g. "current_ratio > 1.5 and debt_to_ebitda < 3 and gross_margin > 0.4".
+
+    Args:
+        query: Query string
+
+    Returns:
+        List of Predicate objects
+
+    Raises:
+        ValueError: If the query cannot be parsed
+    """
+    predicates = []
+    for clause in re.split(r'\s+and\s+', query.strip(), flags=re.IGNORECASE):
+        match = _PREDICATE_PATTERN.match(clause)
+        if not match:
+            raise ValueError(f"Cannot parse screening clause: {clause!r}")
+        column, op, value = match.groups()
+        predicates.append(Predicate(column, op, value))
+    return predicates
+
+
+class RatioStore:
+    """
+    Columnar store of financial ratios with per-block min/max indexes.
+    """
+
+    def __init__(self, columns, keys, block_size=DEFAULT_BLOCK_SIZE):
+        """
+        Initialize the store.
+
+        Args:
+            columns: Dictionary mapping ratio names to equal-length arrays
+            keys: Company keys, one per row
+            block_size: Rows per zone-map block
+        """
+        self.columns = {name: np.asarray(values, dtype=float) for name, values in columns.items()}
+        self.keys = list(keys)
+        self.rows = len(self.keys)
+        self.block_size = block_size
+
+        # Zone maps; NaN never matches a predicate, so it is left out of the bounds and counted instead
+        self.block_starts = np.arange(0, self.rows, block_size)
+        self.block_min = {}
+        self.block_max = {}
+        self.block_nans = {}
+        for name, values in self.columns.items():
+            if self.rows:
+                with np.errstate(invalid='ignore'):
+                    self.block_min[name] = np.fmin.reduceat(values, self.block_starts)
+                    self.block_max[name] = np.fmax.reduceat(values, self.block_starts)
+                self.block_nans[name] = np.add.reduceat(np.isnan(values).astype(np.int64), self.block_starts)
+            else:
+                self.block_min[name] = self.block_max[name] = np.empty(0)
+                self.block_nans[name] = np.empty(0, dtype=np.int64)
+
+        # Evenly spaced rows used for selectivity estimates
+        step = max(1, self.rows // SELECTIVITY_SAMPLE_SIZE)
+        self._sample = np.arange(0, self.rows, step)
+
+    def __len__(self):
+        return self.rows
+
+    def _column(self, name):
+        try:
+            return self.columns[name]
+        except KeyError:
+            raise ValueError(f"Unknown ratio: {name}")
+
+    def estimate_selectivity(self, predicate):
+        """
+        Estimate the fraction of rows matching a predicate from the sample.
+
+        Args:
+            predicate: Predicate instance
+
+        Returns:
+            float: Estimated matching fraction (0 to 1)
+        """
+        if not self.rows:
+            return 0.0
+        return float(np.mean(predicate.evaluate(self._column(predicate.column)[self._sample])))
+
+    def plan(self, query):
+        """
+        Parse a query and order its predicates, most selective first.
+
+        Args:
+            query: Query string or list of Predicate objects
+
+        Returns:
+            List of (predicate, estimated selectivity) tuples in evaluation order
+        """
+        predicates = parse_query(query) if isinstance(query, str) else list(query)
+        estimates = [(predicate, self.estimate_selectivity(predicate)) for predicate in predicates]
+        return sorted(estimates, key=lambda item: item[1])
+
+    def screen_rows(self, query, stats=None):
+        """
+        Find the rows matching a query.
+
+        Args:
+            query: Query string or list of Predicate objects
+            stats: Optional dictionary filled with block and evaluation counts
+
+        Returns:
+            Sorted integer array of matching row numbers
+        """
+        plan = [predicate for predicate, _ in self.plan(query)]
+        blocks = len(self.block_starts)
+        counters = {'blocks': blocks, 'blocks_skipped': 0, 'predicate_evaluations': 0, 'rows_evaluated': 0}
+
+        # Zone maps decide, per predicate and block, whether rows need checking at all
+        possible = np.ones(blocks, dtype=bool)
+        certain = []
+        for predicate in plan:
+            block_possible, block_certain = predicate.block_bounds(self.block_min[predicate.column],
+                                                                   self.block_max[predicate.column],
+                                                                   self.block_nans[predicate.column])
+            possible &= block_possible
+            certain.append(block_certain)
+        counters['blocks_skipped'] = int(blocks - possible.sum())
+
+        matches = []
+        for block in np.flatnonzero(possible).tolist():
+            start = block * self.block_size
+            rows = np.arange(start, min(start + self.block_size, self.rows))
+            for predicate, block_certain in zip(plan, certain):
+                if block_certain[block]:
+                    continue
+                counters['predicate_evaluations'] += 1
+                counters['rows_evaluated'] += len(rows)
+                rows = rows[predicate.evaluate(self.columns[predicate.column][rows])]
+                if not len(rows):
+                    break
+            if len(rows):
+                matches.append(rows)
+
+        if stats is not None:
+            stats.update(counters)
+        return np.concatenate(matches) if matches else np.empty(0, dtype=np.int64)
+
+    def screen(self, query, stats=None):
+        """
+        Find the companies matching a query.
+
+        Args:
+            query: Query string, e.g. "current_ratio > 1.5 and debt_to_ebitda < 3"
+            stats: Optional dictionary filled with block and evaluation counts
+
+        Returns:
+            List of matching company keys
+        """
+        return [self.keys[row] for row in self.screen_rows(query, stats).tolist()]
+
+    def explain(self, query):
+        """
+        Describe how a query would be executed.
+
+        Args:
+            query: Query string or list of Predicate objects
+
+        Returns:
+            Dictionary with the ordered predicates and their estimated selectivity,
+            and the execution counters of a run
+        """
+        stats = {}
+        matches = len(self.screen_rows(query, stats))
+        return {
+            'plan': [(repr(predicate), selectivity) for predicate, selectivity in self.plan(query)],
+            'matches': matches,
+            **stats,
+        }
+
+
+def build_ratio_store(companies, keys=None, block_size=DEFAULT_BLOCK_SIZE):
+    """
+    Calculate the ratios of many companies and load them into a RatioStore.
+
+    Args:
+        companies: FinancialArrays, or a sequence of FinancialData instances
+        keys: Optional company keys (default to the company names)
+        block_size: Rows per zone-map block
+
+    Returns:
+        RatioStore
+    """
+    if hasattr(companies, 'as_financial_data'):
+        arrays = companies
+    else:
+        arrays = from_financial_data(companies, keys)
+    ratios = compute_ratio_arrays(arrays.as_financial_data())
+    return RatioStore(ratios, keys if keys is not None else arrays.keys, block_size)
@@ -0,0 +1,293 @@
+"""
+Module for segment-level revenue and cost of goods sold.
+
+A SegmentModel holds the revenue of each business segment (e.g.
+Automotive, Energy, Services) with its own growth rate and COGS
+percentage, as arrays indexed by segment. Forecasting a period is one
+array expression whatever the number of segments; the totals replace
+revenue and cogs in FinancialForecast, and segment_assumptions feeds the
+same arrays to the vectorized forecast kernel for scenario runs.
+"""
+
+import re
+
+import numpy as np
+
+from analysis.forecast_kernel import forecast_periods
+from analysis.forecasting import FinancialForecast
+from core.financial_arrays import FinancialArrays, from_financial_data
+
+# Segment revenue and COGS rows of the TSLA.xlsx "Model" sheet
+WORKBOOK_SHEET = 'Model'
+WORKBOOK_SEGMENTS = {
+    'Automotive': 'Auto COGS',
+    'Energy': 'Energy COGS',
+    'Services': 'Services COGS',
+}
+
+# Label column and header row of the model sheet
+_LABEL_COLUMN = 2
+_HEADER_ROW = 2
+
+# Integer headers in this range are fiscal years
+_FIRST_YEAR = 1900
+_LAST_YEAR = 2200
+
+# Quarter headers such as "Q123" or "Q12023": quarter number, then fiscal year
+_QUARTER_PATTERN = re.compile(r'^Q([1-4])(\d{2}|\d{4})$', re.IGNORECASE)
+
+
+class SegmentModel:
+    """
+    Revenue, growth and COGS assumptions for each business segment.
+    """
+
+    def __init__(self, names, revenue, growth, cogs_percent):
+        """
+        Initialize the segment model.
+
+        Args:
+            names: Segment names
+            revenue: Revenue of the current period, one per segment
+            growth: Revenue growth per period, one per segment
+                (or shape (segments, scenarios))
+            cogs_percent: COGS as % of revenue, one per segment
+                (or shape (segments, scenarios))
+        """
+        self.names = list(names)
+        self.revenue = np.array(revenue, dtype=float)
+        self.growth = np.array(growth, dtype=float)
+        self.cogs_percent = np.array(cogs_percent, dtype=float)
+        if len(self.revenue) != len(self.names):
+            raise ValueError("One revenue value is required per segment")
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def cogs(self):
+        """COGS of each segment for the current period."""
+        return self.revenue * self.cogs_percent
+
+    @property
+    def total_revenue(self):
+        """Revenue summed over the segments."""
+        return self.revenue.sum(axis=0)
+
+    @property
+    def total_cogs(self):
+        """COGS summed over the segments."""
+        return self.cogs.sum(axis=0)
+
+    @property
+    def mix(self):
+        """Share of each segment in total revenue."""
+        total = self.total_revenue
+        return np.divide(self.revenue, total, out=np.zeros(np.broadcast(self.revenue, total).shape),
+                         where=total != 0)
+
+    def forecast(self):
+        """
+        Forecast the next period.
+
+        Returns:
+            SegmentModel for the next period with the same assumptions
+        """
+        return SegmentModel(self.names, self.revenue * (1 + self.growth), self.growth, self.cogs_percent)
+
+    def update_assumptions(self, growth=None, cogs_percent=None):
+        """
+        Update assumptions by segment name.
+
+        Args:
+            growth: Optional dictionary mapping segment names to growth rates
+            cogs_percent: Optional dictionary mapping segment names to COGS percentages
+        """
+        for values, updates in ((self.growth, growth), (self.cogs_percent, cogs_percent)):
+            for name, value in (updates or {}).items():
+                values[self.names.index(name)] = value
+
+    def to_dict(self):
+        """
+        Get the segments as a dictionary.
+
+        Returns:
+            Dictionary mapping segment names to their revenue, growth, COGS % and mix
+        """
+        mix = self.mix
+        return {
+            name: {
+                'revenue': self.revenue[i].tolist(),
+                'growth': self.growth[i].tolist(),
+                'cogs_percent': self.cogs_percent[i].tolist(),
+                'mix': mix[i].tolist(),
+            }
+            for i, name in enumerate(self.names)
+        }
+
+
+def segment_model_from_history(names, revenue, cogs, lag=1):
+    """
+    Build a segment model from historical segment revenue and COGS.
+
+    Growth is measured over the last `lag` periods (4 for year-over-year
+    growth of quarterly data) and the COGS percentage is taken from the
+    latest period.
+
+    Args:
+        names: Segment names
+        revenue: Historical revenue, shape (segments, periods)
+        cogs: Historical COGS, shape (segments, periods)
+        lag: Number of periods between the compared values
+
+    Returns:
+        SegmentModel based on the latest period
+    """
+    revenue = np.asarray(revenue, dtype=float)
+    cogs = np.asarray(cogs, dtype=float)
+    latest = revenue[:, -1]
+    previous = revenue[:, -1 - lag] if revenue.shape[1] > lag else latest
+    growth = np.divide(latest, previous, out=np.ones_like(latest), where=previous != 0) - 1
+    cogs_percent = np.divide(cogs[:, -1], latest, out=np.zeros_like(latest), where=latest != 0)
+    return SegmentModel(names, latest, growth, cogs_percent)
+
+
+def _quarter_year(label):
+    """Fiscal year of a quarter label, or None if it has no recognizable year."""
+    match = _QUARTER_PATTERN.match(label)
+    if not match:
+        return None
+    year = int(match.group(2))
+    return year + 2000 if year < 100 else year
+
+
+def load_segment_workbook(path, sheet_name=WORKBOOK_SHEET, segments=WORKBOOK_SEGMENTS, last_quarter=None):
+    """
+    Load segment revenue and COGS history from a model workbook such as TSLA.xlsx.
+
+    Columns headed with a quarter label (e.g. "Q123") are read as quarterly
+    data and columns headed with a year as annual data; only columns with a
+    value for every segment are kept. Model workbooks continue the quarters
+    with projections (in TSLA.xlsx, Q125 is Q324 revenue scaled by a guess
+    and Q424 COGS copied forward), so by default quarters of fiscal years
+    after the last one with annual actuals are dropped. Pass last_quarter to
+    cut off elsewhere, e.g. when the current year is only partly reported.
+    Requires openpyxl.
+
+    Args:
+        path: Path to the workbook
+        sheet_name: Name of the model sheet
+        segments: Dictionary mapping segment revenue row labels to their COGS row labels
+        last_quarter: Optional label of the last actual quarter (e.g. "Q424")
+
+    Returns:
+        Dictionary with 'segments', 'quarters', 'quarterly_revenue',
+        'quarterly_cogs', 'years', 'annual_revenue' and 'annual_cogs'
+        (arrays of shape (segments, periods))
+    """
+    from openpyxl import load_workbook
+
+    sheet = load_workbook(path, data_only=True)[sheet_name]
+    rows = {}
+    for row in range(1, sheet.max_row + 1):
+        label = sheet.cell(row, _LABEL_COLUMN).value
+        if isinstance(label, str):
+            rows.setdefault(label.strip(), row)
+
+    names = list(segments)
+    missing = [label for label in names + list(segments.values()) if label not in rows]
+    if missing:
+        raise ValueError(f"Rows not found in {sheet_name}: {', '.join(missing)}")
+
+    def complete(column):
+        values = [sheet.cell(rows[label], column).value for label in names + list(segments.values())]
+        return all(isinstance(value, (int, float)) for value in values)
+
+    quarters, quarter_columns, years, year_columns = [], [], [], []
+    for column in range(_LABEL_COLUMN + 1, sheet.max_column + 1):
+        header = sheet.cell(_HEADER_ROW, column).value
+        if isinstance(header, str) and header.strip().upper().startswith('Q') and complete(column):
+            quarters.append(header.strip())
+            quarter_columns.append(column)
+        elif isinstance(header, int) and _FIRST_YEAR <= header <= _LAST_YEAR and complete(column):
+            years.append(header)
+            year_columns.append(column)
+
+    if last_quarter is not None:
+        if last_quarter not in quarters:
+            raise ValueError(f"Quarter not found in {sheet_name}: {last_quarter}")
+        actual = quarters.index(last_quarter) + 1
+    else:
+        actual = len(quarters)
+        if years:
+            while actual and (_quarter_year(quarters[actual - 1]) or 0) > max(years):
+                actual -= 1
+    quarters, quarter_columns = quarters[:actual], quarter_columns[:actual]
+
+    def table(labels, columns):
+        return np.array([[sheet.cell(rows[label], column).value for column in columns] for label in labels],
+                        dtype=float).reshape(len(labels), len(columns))
+
+    return {
+        'segments': names,
+        'quarters': quarters,
+        'quarterly_revenue': table(names, quarter_columns),
+        'quarterly_cogs': table(segments.values(), quarter_columns),
+        'years': years,
+        'annual_revenue': table(names, year_columns),
+        'annual_cogs': table(segments.values(), year_columns),
+    }
+
+
+def segment_assumptions(model):
+    """
+    Express a segment model as forecast kernel inputs.
+
+    Args:
+        model: SegmentModel
+
+    Returns:
+        Tuple of (base revenue per segment, dictionary of segment assumptions)
+        for forecast_step's 'segment_revenue' column and assumptions
+    """
+    return model.revenue, {'segment_growth': model.growth, 'segment_cogs_percent': model.cogs_percent}
+
+
+def forecast_segment_scenarios(base_data, model, periods, assumptions=None, segment_growth=None,
+                               segment_cogs_percent=None):
+    """
+    Forecast a company under many segment scenarios at once.
+
+    Args:
+        base_data: FinancialData for the base period
+        model: SegmentModel with the base segment revenue
+        periods: Number of periods to forecast
+        assumptions: Optional FinancialForecast assumption overrides, scalars or one per scenario
+        segment_growth: Optional growth per segment and scenario, shape (segments, scenarios)
+        segment_cogs_percent: Optional COGS % per segment and scenario, shape (segments, scenarios)
+
+    Returns:
+        List of dictionaries of field arrays, one per period, each with a
+        'segment_revenue' array of shape (segments, scenarios)
+    """
+    model_assumptions = dict(FinancialForecast(base_data).assumptions)
+    model_assumptions.update(assumptions or {})
+    revenue, segment = segment_assumptions(model)
+    if segment_growth is not None:
+        segment['segment_growth'] = np.asarray(segment_growth, dtype=float)
+    if segment_cogs_percent is not None:
+        segment['segment_cogs_percent'] = np.asarray(segment_cogs_percent, dtype=float)
+    model_assumptions.update(segment)
+
+    sizes = {np.size(value) for name, value in model_assumptions.items()
+             if not name.startswith('segment_') and np.ndim(value)}
+    sizes.update(np.shape(value)[1] for value in segment.values() if np.ndim(value) == 2)
+    if len(sizes) > 1:
+        raise ValueError("Scenario arrays must all have the same length")
+    scenarios = sizes.pop() if sizes else 1
+
+    base = base_data if isinstance(base_data, FinancialArrays) else from_financial_data([base_data])
+    columns = {name: np.repeat(values, scenarios) if len(values) == 1 else values
+               for name, values in base.columns.items()}
+    columns['segment_revenue'] = np.broadcast_to(revenue[:, None], (len(model), scenarios))
+    return forecast_periods(columns, model_assumptions, periods)
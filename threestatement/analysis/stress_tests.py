@@ -0,0 +1,277 @@
+"""
+Module for stress testing a universe of companies.
+
+A StressScenario is an overlay on the forecast assumptions (amounts added
+to the baseline value of each assumption, every period) plus optional
+one-off events in a given period: goodwill impairments, PP&E write-downs,
+debt write-downs and equity bailouts (see forecast_kernel.apply_events).
+run_stress_tests forecasts every company under the baseline and every
+scenario in one vectorized batch, stacking the scenarios as blocks of
+rows, then checks breach conditions such as "interest_coverage < 2" in
+every period and reports, per scenario, how many companies breach and how
+far net income, cash and equity move against the baseline.
+"""
+
+import numpy as np
+
+from analysis.forecast_kernel import EVENT_FIELDS, apply_events, forecast_step
+from analysis.forecasting import FinancialForecast
+from analysis.ratios import compute_ratio_arrays
+from analysis.screening import parse_query
+from core.financial_arrays import FinancialArrays, from_financial_data
+
+# Name of the unstressed scenario every report is measured against
+BASELINE = 'baseline'
+
+# Conditions that count as a breach when true in any forecast period
+DEFAULT_BREACH_CONDITIONS = (
+    'interest_coverage < 2',
+    'debt_to_ebitda > 4',
+    'ending_cash_balance < 0',
+    'total_equity < 0',
+)
+
+# Companies forecast together in one batch (times the number of scenarios in rows)
+DEFAULT_CHUNK_SIZE = 20000
+
+
+class StressScenario:
+    """
+    A named set of assumption shifts and one-off events.
+    """
+
+    def __init__(self, name, description, shifts=None, events=None, event_period=1):
+        """
+        Initialize a scenario.
+
+        Args:
+            name: Scenario name
+            description: One-line description
+            shifts: Dictionary mapping FinancialForecast assumption names to
+                amounts added to their baseline values in every period
+            events: Dictionary mapping EVENT_FIELDS names to fractions (see
+                forecast_kernel.apply_events)
+            event_period: Forecast period of the events (1 for the first)
+        """
+        unknown = [name for name in (events or {}) if name not in EVENT_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown events: {', '.join(unknown)}")
+        self.name = name
+        self.description = description
+        self.shifts = dict(shifts or {})
+        self.events = dict(events or {})
+        self.event_period = event_period
+
+    def __repr__(self):
+        return f"StressScenario({self.name!r})"
+
+
+# Scenario library
+SCENARIOS = {scenario.name: scenario for scenario in (
+    StressScenario(
+        'recession', "Revenue falls, costs are sticky and working capital stretches",
+        shifts={'revenue_growth': -0.12, 'opex_growth': -0.01, 'cogs_percent': 0.03,
+                'ar_days': 15, 'inventory_days': 20, 'capex_percent': -0.03}),
+    StressScenario(
+        'rate_shock', "Interest rates rise 400 basis points and demand softens",
+        shifts={'interest_rate': 0.04, 'revenue_growth': -0.02}),
+    StressScenario(
+        'margin_squeeze', "Input costs and operating expenses outgrow revenue",
+        shifts={'cogs_percent': 0.08, 'opex_growth': 0.05}),
+    StressScenario(
+        'impairment_wave', "Acquired goodwill and productive assets are written down",
+        shifts={'revenue_growth': -0.05},
+        events={'goodwill_impairment': 0.6, 'ppe_write_down': 0.25}),
+    StressScenario(
+        'restructuring', "A deep downturn forces a debt write-down and an equity bailout",
+        shifts={'revenue_growth': -0.20, 'cogs_percent': 0.05},
+        events={'debt_write_down': 0.4, 'equity_bailout': 0.05}),
+)}
+
+
+def _metric_values(forecast, names):
+    """Values of fields, FinancialData properties or ratios for every row of a forecast period."""
+    data = FinancialArrays(forecast).as_financial_data()
+    values = {}
+    ratios = None
+    for name in names:
+        if name in forecast or isinstance(getattr(type(data), name, None), property):
+            values[name] = np.asarray(getattr(data, name), dtype=float)
+            continue
+        if ratios is None:
+            ratios = compute_ratio_arrays(data)
+        if name not in ratios:
+            raise ValueError(f"Unknown metric: {name}")
+        values[name] = ratios[name]
+    return values
+
+
+def _stress_chunk(columns, assumptions, scenarios, periods, predicates):
+    """
+    Forecast one chunk of companies under every scenario.
+
+    Returns:
+        Tuple of (breaches, first_breach, totals): boolean array (scenarios,
+        companies, conditions), the first breaching period per scenario and
+        company (0 for none), and a dictionary of (scenarios, companies) arrays
+        of cumulative net income, final cash and equity, write-downs and bailouts
+    """
+    companies = len(columns['revenue'])
+    count = len(scenarios)
+    current = {name: np.tile(values, count) for name, values in columns.items()}
+
+    # Baseline assumptions per company, tiled over the scenarios, plus each scenario's shifts
+    names = set(assumptions).union(*(scenario.shifts for scenario in scenarios))
+    stressed = {}
+    for name in names:
+        tiled = np.tile(np.broadcast_to(np.asarray(assumptions[name], dtype=float), (companies,)), count)
+        shifts = np.array([scenario.shifts.get(name, 0.0) for scenario in scenarios])
+        stressed[name] = tiled + np.repeat(shifts, companies) if shifts.any() else tiled
+
+    columns_used = [predicate.column for predicate in predicates]
+    breached = np.zeros((len(predicates), count * companies), dtype=bool)
+    first_breach = np.zeros(count * companies, dtype=np.int64)
+    net_income = np.zeros(count * companies)
+    write_downs = np.zeros(count * companies)
+    bailouts = np.zeros(count * companies)
+
+    for period in range(1, periods + 1):
+        forecast = forecast_step(current, stressed)
+        timed = [scenario for scenario in scenarios if scenario.events and scenario.event_period == period]
+        if timed:
+            events = {}
+            for name in set().union(*(scenario.events for scenario in timed)):
+                # No minimum cash (NaN) for scenarios without a bailout; no write-down (0) otherwise
+                missing = np.nan if name == 'equity_bailout' else 0.0
+                fractions = np.array([scenario.events.get(name, missing) if scenario in timed else missing
+                                      for scenario in scenarios])
+                events[name] = np.repeat(fractions, companies)
+            forecast = apply_events(current, forecast, events, stressed['dividend_payout'])
+            write_downs += forecast['goodwill_impairment'] + forecast['ppe_write_down']
+            bailouts += forecast['equity_bailout']
+
+        metrics = _metric_values(forecast, columns_used)
+        for row, predicate in enumerate(predicates):
+            now = predicate.evaluate(metrics[predicate.column])
+            first_breach[(first_breach == 0) & now] = period
+            breached[row] |= now
+        net_income += forecast['net_income']
+        current = forecast
+
+    data = FinancialArrays(current).as_financial_data()
+    totals = {
+        'net_income': net_income,
+        'ending_cash_balance': np.asarray(current['ending_cash_balance'], dtype=float),
+        'total_equity': np.asarray(data.total_equity, dtype=float),
+        'write_downs': write_downs,
+        'bailouts': bailouts,
+    }
+    breaches = breached.reshape(len(predicates), count, companies).transpose(1, 2, 0)
+    return (breaches, first_breach.reshape(count, companies),
+            {name: values.reshape(count, companies) for name, values in totals.items()})
+
+
+def _relative_change(stressed, baseline):
+    """Change of an aggregate against the baseline, as a fraction of its magnitude."""
+    return (stressed - baseline) / abs(baseline) if baseline else 0.0
+
+
+def run_stress_tests(companies, scenarios=None, periods=3, assumptions=None,
+                     conditions=DEFAULT_BREACH_CONDITIONS, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Stress test a universe of companies.
+
+    Args:
+        companies: FinancialArrays, or a sequence of FinancialData instances
+        scenarios: StressScenario objects or names from SCENARIOS (all of SCENARIOS by default)
+        periods: Number of periods to forecast
+        assumptions: Optional baseline assumption overrides, scalars or one per company
+        conditions: Breach conditions, each a comparison of a field, FinancialData
+            property or ratio with a number (e.g. "debt_to_ebitda > 4")
+        chunk_size: Companies forecast together in one batch
+
+    Returns:
+        Dictionary with 'scenarios' (names, BASELINE first), 'keys',
+        'conditions', 'breaches' (boolean array of shape (scenarios,
+        companies, conditions)), 'first_breach' (first breaching period per
+        scenario and company, 0 for none), 'totals' (field name -> array of
+        shape (scenarios, companies)) and 'summary' (one dictionary per scenario)
+    """
+    if scenarios is None:
+        scenarios = list(SCENARIOS.values())
+    scenarios = [SCENARIOS[scenario] if isinstance(scenario, str) else scenario for scenario in scenarios]
+    scenarios = [StressScenario(BASELINE, "Forecast assumptions without stress")] + scenarios
+
+    model_assumptions = dict(FinancialForecast(None).assumptions)
+    model_assumptions.update(assumptions or {})
+    unknown = sorted({name for scenario in scenarios for name in scenario.shifts if name not in model_assumptions})
+    if unknown:
+        raise ValueError(f"Unknown assumptions: {', '.join(unknown)}")
+    predicates = [predicate for condition in conditions for predicate in parse_query(condition)]
+
+    arrays = companies if isinstance(companies, FinancialArrays) else from_financial_data(companies)
+    if arrays.fixed_point:
+        arrays = arrays.to_float()
+    results = []
+    for start in range(0, max(len(arrays), 1), chunk_size):
+        stop = min(start + chunk_size, len(arrays))
+        columns = {name: values[start:stop] for name, values in arrays.columns.items()}
+        chunk_assumptions = {name: value[start:stop] if np.ndim(value) else value
+                             for name, value in model_assumptions.items()}
+        results.append(_stress_chunk(columns, chunk_assumptions, scenarios, periods, predicates))
+
+    breaches = np.concatenate([result[0] for result in results], axis=1)
+    first_breach = np.concatenate([result[1] for result in results], axis=1)
+    totals = {name: np.concatenate([result[2][name] for result in results], axis=1) for name in results[0][2]}
+    any_breach = breaches.any(axis=2)
+
+    summary = []
+    for index, scenario in enumerate(scenarios):
+        summary.append({
+            'scenario': scenario.name,
+            'description': scenario.description,
+            'companies': len(arrays),
+            'breaches': {repr(predicate): int(breaches[index, :, row].sum())
+                         for row, predicate in enumerate(predicates)},
+            'companies_breaching': int(any_breach[index].sum()),
+            'new_breaches': int((any_breach[index] & ~any_breach[0]).sum()),
+            'net_income_change': _relative_change(totals['net_income'][index].sum(), totals['net_income'][0].sum()),
+            'ending_cash_change': _relative_change(totals['ending_cash_balance'][index].sum(),
+                                                   totals['ending_cash_balance'][0].sum()),
+            'equity_change': _relative_change(totals['total_equity'][index].sum(), totals['total_equity'][0].sum()),
+            'write_downs': float(totals['write_downs'][index].sum()),
+            'bailouts': float(totals['bailouts'][index].sum()),
+        })
+
+    return {
+        'scenarios': [scenario.name for scenario in scenarios],
+        'keys': arrays.keys,
+        'conditions': [repr(predicate) for predicate in predicates],
+        'breaches': breaches,
+        'first_breach': first_breach,
+        'totals': totals,
+        'summary': summary,
+    }
+
+
+def format_stress_report(report):
+    """
+    Format the summary of run_stress_tests as a text table.
+
+    Args:
+        report: Dictionary returned by run_stress_tests
+
+    Returns:
+        str: One line per scenario with its breach counts and impacts
+    """
+    conditions = report['conditions']
+    header = (f"{'Scenario':<16} {'Breaching':>10} {'New':>8} " +
+              " ".join(f"{condition:>24}" for condition in conditions) +
+              f" {'Net income':>11} {'Cash':>8} {'Equity':>8}")
+    lines = [header, "-" * len(header)]
+    for row in report['summary']:
+        counts = " ".join(f"{row['breaches'][condition]:>24,}" for condition in conditions)
+        lines.append(f"{row['scenario']:<16} {row['companies_breaching']:>10,} {row['new_breaches']:>8,} {counts} "
+                     f"{row['net_income_change']:>11.1%} {row['ending_cash_change']:>8.1%} "
+                     f"{row['equity_change']:>8.1%}")
+    return "\n".join(lines)
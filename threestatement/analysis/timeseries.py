@@ -0,0 +1,314 @@
+"""
+Module for statistical revenue forecasting of many series at once.
+
+Series are the rows of one array of shape (series, periods), e.g. the
+quarterly segment revenue of load_segment_workbook or the revenue history
+of a whole universe. Two model families are fitted to every row together:
+
+- Holt-Winters exponential smoothing with additive trend and additive or
+  multiplicative seasonality. Every combination of a grid of smoothing
+  parameters is filtered through all series in one pass of array updates,
+  and each series keeps the combination with the smallest one-step error.
+- Seasonal autoregressions in the style of ARIMA(p, 0, 0)(0, 1, 0): the
+  (log) series is differenced over one season, and an AR(p) with intercept
+  is fitted to the differences by batched least squares.
+
+revenue_growth_paths turns the forecasts into revenue growth per period,
+the driver FinancialForecast.set_revenue_growth_path and
+forecast_with_revenue_growth accept in place of the flat revenue_growth.
+"""
+
+import itertools
+
+import numpy as np
+
+from analysis.forecast_kernel import forecast_step
+from core.financial_arrays import FinancialArrays
+
+# Seasonality of Holt-Winters models
+ADDITIVE = 'additive'
+MULTIPLICATIVE = 'multiplicative'
+
+# Model families of revenue_growth_paths
+HOLT_WINTERS = 'holt_winters'
+AUTOREGRESSIVE = 'autoregressive'
+
+# Periods per season of quarterly series
+QUARTERLY = 4
+
+# Smoothing parameters searched for the level, trend and seasonal components
+ALPHA_GRID = (0.05, 0.1, 0.2, 0.3, 0.5, 0.7, 0.9)
+BETA_GRID = (0.0, 0.05, 0.1, 0.2, 0.3)
+GAMMA_GRID = (0.0, 0.05, 0.1, 0.2, 0.3, 0.5)
+
+# Ridge added to the autoregression normal equations, relative to their scale
+_RIDGE = 1e-8
+
+
+def _as_series(series):
+    """Series as a float array of shape (series, periods)."""
+    series = np.asarray(series, dtype=float)
+    if series.ndim == 1:
+        series = series[None, :]
+    if series.ndim != 2 or not np.isfinite(series).all():
+        raise ValueError("Series must be a finite array of shape (series, periods)")
+    return series
+
+
+class HoltWintersFit:
+    """
+    Fitted Holt-Winters models, one per series.
+    """
+
+    def __init__(self, alpha, beta, gamma, level, trend, seasonals, sse, season_length, seasonal, damping,
+                 periods):
+        """
+        Initialize from the fitted parameters and final states.
+
+        Args:
+            alpha: Level smoothing per series
+            beta: Trend smoothing per series
+            gamma: Seasonal smoothing per series
+            level: Final level per series
+            trend: Final trend per series
+            seasonals: Final seasonal factors, shape (series, season_length),
+                indexed by period number modulo season_length
+            sse: Sum of squared one-step errors per series
+            season_length: Periods per season
+            seasonal: ADDITIVE or MULTIPLICATIVE
+            damping: Trend damping factor (1 for none)
+            periods: Number of periods fitted
+        """
+        self.alpha = alpha
+        self.beta = beta
+        self.gamma = gamma
+        self.level = level
+        self.trend = trend
+        self.seasonals = seasonals
+        self.sse = sse
+        self.season_length = season_length
+        self.seasonal = seasonal
+        self.damping = damping
+        self.periods = periods
+
+    def forecast(self, horizon):
+        """
+        Forecast every series.
+
+        Args:
+            horizon: Number of periods ahead
+
+        Returns:
+            Array of shape (series, horizon)
+        """
+        steps = np.arange(1, horizon + 1)
+        # Sum of damping^1 .. damping^h multiplies the trend
+        trend_weight = np.cumsum(self.damping ** steps)
+        trend = self.level[:, None] + self.trend[:, None] * trend_weight[None, :]
+        season = self.seasonals[:, (self.periods + steps - 1) % self.season_length]
+        return trend * season if self.seasonal == MULTIPLICATIVE else trend + season
+
+
+def fit_holt_winters(series, season_length=QUARTERLY, seasonal=MULTIPLICATIVE, damping=1.0,
+                     alphas=ALPHA_GRID, betas=BETA_GRID, gammas=GAMMA_GRID):
+    """
+    Fit Holt-Winters exponential smoothing to every series.
+
+    The first season sets the initial level and seasonal factors, the
+    second (when there is one) the initial trend. Every (alpha, beta,
+    gamma) combination of the grids runs through all series at once.
+
+    Args:
+        series: Array of shape (series, periods) with more than one full season
+        season_length: Periods per season (1 for no seasonality)
+        seasonal: ADDITIVE or MULTIPLICATIVE (needs positive series)
+        damping: Trend damping factor (1 for a linear trend)
+        alphas: Level smoothing parameters searched
+        betas: Trend smoothing parameters searched
+        gammas: Seasonal smoothing parameters searched
+
+    Returns:
+        HoltWintersFit
+    """
+    series = _as_series(series)
+    count, periods = series.shape
+    m = season_length
+    if seasonal not in (ADDITIVE, MULTIPLICATIVE):
+        raise ValueError(f"Unknown seasonality: {seasonal}")
+    if periods < m + 1:
+        raise ValueError("Series need more than one full season")
+    multiplicative = seasonal == MULTIPLICATIVE
+    if multiplicative and (series <= 0).any():
+        raise ValueError("Multiplicative seasonality needs positive series")
+
+    grid = np.array(list(itertools.product(alphas, betas, gammas)))
+    alpha, beta, gamma = (grid[:, i][None, :] for i in range(3))
+    combinations = len(grid)
+
+    # Initial states from the first one or two seasons, shared by every combination
+    level0 = series[:, :m].mean(axis=1)
+    trend0 = (series[:, m:2 * m].mean(axis=1) - level0) / m if periods >= 2 * m else np.zeros(count)
+    seasonals0 = series[:, :m] / level0[:, None] if multiplicative else series[:, :m] - level0[:, None]
+    level = np.repeat(level0[:, None], combinations, axis=1)
+    trend = np.repeat(trend0[:, None], combinations, axis=1)
+    seasonals = np.repeat(seasonals0[:, None, :], combinations, axis=1)
+    # The first season's mean is its mid-point level; roll it to the season's last period
+    level = level + trend * (m - 1) / 2
+    sse = np.zeros((count, combinations))
+
+    for t in range(m, periods):
+        y = series[:, t][:, None]
+        s = t % m
+        season = seasonals[:, :, s]
+        damped = damping * trend
+        predicted = (level + damped) * season if multiplicative else level + damped + season
+        sse += (y - predicted) ** 2
+        deseasonalized = y / season if multiplicative else y - season
+        new_level = alpha * deseasonalized + (1 - alpha) * (level + damped)
+        trend = beta * (new_level - level) + (1 - beta) * damped
+        level = new_level
+        seasonals[:, :, s] = (gamma * (y / level if multiplicative else y - level) + (1 - gamma) * season)
+
+    best = np.argmin(sse, axis=1)
+    rows = np.arange(count)
+    return HoltWintersFit(grid[best, 0], grid[best, 1], grid[best, 2], level[rows, best], trend[rows, best],
+                          seasonals[rows, best], sse[rows, best], m, seasonal, damping, periods)
+
+
+class AutoregressiveFit:
+    """
+    Fitted seasonal autoregressions, one per series.
+    """
+
+    def __init__(self, coefficients, history, order, season_length, log, sigma):
+        """
+        Initialize from the fitted coefficients.
+
+        Args:
+            coefficients: Intercept and AR coefficients, shape (series, order + 1)
+            history: Transformed series the model was fitted on, shape (series, periods)
+            order: Autoregressive order
+            season_length: Differencing lag (1 for a first difference)
+            log: Whether the series were log-transformed
+            sigma: Residual standard deviation per series
+        """
+        self.coefficients = coefficients
+        self.history = history
+        self.order = order
+        self.season_length = season_length
+        self.log = log
+        self.sigma = sigma
+
+    def forecast(self, horizon):
+        """
+        Forecast every series.
+
+        Args:
+            horizon: Number of periods ahead
+
+        Returns:
+            Array of shape (series, horizon)
+        """
+        m = self.season_length
+        levels = list(self.history.T)
+        differences = list((self.history[:, m:] - self.history[:, :-m]).T)
+        forecasts = []
+        for _ in range(horizon):
+            difference = self.coefficients[:, 0].copy()
+            for lag in range(1, self.order + 1):
+                difference += self.coefficients[:, lag] * differences[-lag]
+            differences.append(difference)
+            levels.append(levels[-m] + difference)
+            forecasts.append(levels[-1])
+        forecasts = np.column_stack(forecasts)
+        return np.exp(forecasts) if self.log else forecasts
+
+
+def fit_autoregressive(series, order=1, season_length=QUARTERLY, log=True):
+    """
+    Fit a seasonally differenced autoregression to every series.
+
+    Args:
+        series: Array of shape (series, periods)
+        order: Autoregressive order p
+        season_length: Differencing lag (1 for ARIMA(p, 1, 0))
+        log: Model log values, so differences are growth rates (needs positive series)
+
+    Returns:
+        AutoregressiveFit
+    """
+    series = _as_series(series)
+    count, periods = series.shape
+    m = season_length
+    if periods - m <= order + 1:
+        raise ValueError("Series are too short for this order and season length")
+    if log and (series <= 0).any():
+        raise ValueError("Log models need positive series")
+    history = np.log(series) if log else series
+    differences = history[:, m:] - history[:, :-m]
+
+    # Regress each difference on an intercept and its previous `order` values, for all series at once
+    targets = differences[:, order:]
+    observations = targets.shape[1]
+    design = np.ones((count, observations, order + 1))
+    for lag in range(1, order + 1):
+        design[:, :, lag] = differences[:, order - lag:order - lag + observations]
+    normal = design.transpose(0, 2, 1) @ design
+    ridge = _RIDGE * np.trace(normal, axis1=1, axis2=2)[:, None, None] * np.eye(order + 1)
+    coefficients = np.linalg.solve(normal + ridge, (design.transpose(0, 2, 1) @ targets[:, :, None]))[:, :, 0]
+
+    residuals = targets - (design @ coefficients[:, :, None])[:, :, 0]
+    sigma = np.sqrt((residuals ** 2).sum(axis=1) / max(observations - order - 1, 1))
+    return AutoregressiveFit(coefficients, history, order, m, log, sigma)
+
+
+def revenue_growth_paths(series, horizon, method=HOLT_WINTERS, **options):
+    """
+    Forecast revenue series and express the forecasts as growth per period.
+
+    Args:
+        series: Revenue history, array of shape (series, periods), one row per company
+        horizon: Number of periods to forecast
+        method: HOLT_WINTERS or AUTOREGRESSIVE
+        **options: Options of fit_holt_winters or fit_autoregressive
+
+    Returns:
+        Array of shape (series, horizon): growth of each forecast period over the
+        previous one, the first over the last actual period
+    """
+    series = _as_series(series)
+    if method == HOLT_WINTERS:
+        fit = fit_holt_winters(series, **options)
+    elif method == AUTOREGRESSIVE:
+        fit = fit_autoregressive(series, **options)
+    else:
+        raise ValueError(f"Unknown method: {method}")
+    path = np.column_stack([series[:, -1], fit.forecast(horizon)])
+    return np.divide(path[:, 1:], path[:, :-1], out=np.ones((len(series), horizon)),
+                     where=path[:, :-1] != 0) - 1
+
+
+def forecast_with_revenue_growth(base, assumptions, revenue_growth):
+    """
+    Roll the forecast kernel forward with a different revenue growth in every period.
+
+    Args:
+        base: FinancialArrays, or dictionary of field arrays for the base period
+        assumptions: Dictionary of FinancialForecast assumptions, scalars or arrays per row
+        revenue_growth: Array of shape (rows, periods), e.g. from revenue_growth_paths
+
+    Returns:
+        List of dictionaries of field arrays, one per period
+    """
+    columns = base.to_float().columns if isinstance(base, FinancialArrays) else base
+    revenue_growth = np.asarray(revenue_growth, dtype=float)
+    rows = len(columns['revenue'])
+    period_assumptions = {name: np.broadcast_to(np.asarray(value, dtype=float), (rows,))
+                          for name, value in assumptions.items()}
+    current = columns
+    forecasts = []
+    for period in range(revenue_growth.shape[1]):
+        period_assumptions['revenue_growth'] = revenue_growth[:, period]
+        current = forecast_step(current, period_assumptions)
+        forecasts.append(current)
+    return forecasts
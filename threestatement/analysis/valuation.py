@@ -0,0 +1,359 @@
+"""
+Module for discounted cash flow (DCF) valuation.
+
+Free cash flow (operating cash flow less capital expenditures) is taken
+from a multi-period FinancialForecast, discounted at the weighted average
+cost of capital, and topped up with a Gordon growth terminal value. The
+grid functions evaluate every WACC x terminal growth combination, and
+optionally many companies, as one broadcast array computation.
+"""
+
+import numpy as np
+
+from analysis.forecast_kernel import forecast_periods, free_cash_flows
+from analysis.forecasting import FinancialForecast
+from core.financial_arrays import FinancialArrays, from_financial_data
+
+# Default projection horizon in years
+DEFAULT_PERIODS = 5
+
+# Default search interval for reverse DCF, per solvable assumption
+REVERSE_DCF_BOUNDS = {
+    'revenue_growth': (-0.5, 1.0),
+    'cogs_percent': (0.0, 1.0),
+    'opex_growth': (-0.5, 1.0),
+    'capex_percent': (0.0, 0.5),
+}
+
+
+def capm_cost_of_equity(risk_free_rate, beta, equity_risk_premium):
+    """
+    Calculate the cost of equity with the capital asset pricing model.
+
+    Args:
+        risk_free_rate: Risk-free rate (e.g., 0.04)
+        beta: Equity beta
+        equity_risk_premium: Expected market return over the risk-free rate
+
+    Returns:
+        float: Cost of equity
+    """
+    return risk_free_rate + beta * equity_risk_premium
+
+
+def calculate_wacc(financial_data, cost_of_equity, cost_of_debt=None, tax_rate=None):
+    """
+    Calculate the weighted average cost of capital.
+
+    Equity is weighted at market capitalization and debt at book value.
+
+    Args:
+        financial_data: FinancialData instance
+        cost_of_equity: Cost of equity
+        cost_of_debt: Pre-tax cost of debt (defaults to interest expense over total debt)
+        tax_rate: Tax rate for the debt tax shield (defaults to the company's tax rate)
+
+    Returns:
+        float: WACC
+    """
+    equity = financial_data.market_cap
+    debt = financial_data.short_term_debt + financial_data.long_term_debt
+    if tax_rate is None:
+        tax_rate = financial_data.tax_rate
+    if cost_of_debt is None:
+        cost_of_debt = financial_data.interest_expense / debt if debt > 0 else 0
+
+    capital = equity + debt
+    if capital <= 0:
+        return cost_of_equity
+    return equity / capital * cost_of_equity + debt / capital * cost_of_debt * (1 - tax_rate)
+
+
+def dcf_value_grid(free_cash_flows, net_debt, shares_outstanding, waccs, terminal_growths, mid_year=False):
+    """
+    Value one or many companies over a grid of discount rates and terminal growth rates.
+
+    Args:
+        free_cash_flows: Projected free cash flows, shape (periods,) for one company
+            or (companies, periods) for many
+        net_debt: Total debt less cash, scalar or shape (companies,)
+        shares_outstanding: Shares outstanding, scalar or shape (companies,)
+        waccs: Discount rates, shape (W,)
+        terminal_growths: Terminal growth rates, shape (G,)
+        mid_year: Whether cash flows are discounted from the middle of each year
+
+    Returns:
+        Dictionary of arrays with shape (W, G), or (companies, W, G) for many companies:
+        'enterprise_value', 'equity_value', 'share_price', 'pv_cash_flows' and
+        'pv_terminal_value'. Cells with WACC <= growth are NaN.
+    """
+    cash_flows = np.asarray(free_cash_flows, dtype=float)
+    single = cash_flows.ndim == 1
+    cash_flows = np.atleast_2d(cash_flows)                                    # (N, T)
+    waccs = np.atleast_1d(np.asarray(waccs, dtype=float))                     # (W,)
+    growths = np.atleast_1d(np.asarray(terminal_growths, dtype=float))        # (G,)
+    net_debt = np.broadcast_to(np.asarray(net_debt, dtype=float), cash_flows.shape[:1])
+    shares = np.broadcast_to(np.asarray(shares_outstanding, dtype=float), cash_flows.shape[:1])
+
+    # Discount factors for every WACC and period
+    periods = np.arange(1, cash_flows.shape[1] + 1, dtype=float)
+    timing = periods - 0.5 if mid_year else periods
+    discount = (1 + waccs[:, None]) ** -timing[None, :]                       # (W, T)
+
+    pv_cash_flows = cash_flows @ discount.T                                   # (N, W)
+
+    # Gordon growth terminal value at the end of the horizon
+    spread = waccs[:, None] - growths[None, :]                                # (W, G)
+    valid = spread > 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        terminal_value = np.where(
+            valid,
+            cash_flows[:, -1, None, None] * (1 + growths[None, None, :]) / np.where(valid, spread, 1),
+            np.nan
+        )                                                                     # (N, W, G)
+    terminal_discount = (1 + waccs) ** -periods[-1]
+    pv_terminal_value = terminal_value * terminal_discount[None, :, None]
+
+    enterprise_value = pv_cash_flows[:, :, None] + pv_terminal_value
+    equity_value = enterprise_value - net_debt[:, None, None]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        share_price = np.where(shares[:, None, None] > 0, equity_value / shares[:, None, None], np.nan)
+
+    result = {
+        'enterprise_value': enterprise_value,
+        'equity_value': equity_value,
+        'share_price': share_price,
+        'pv_cash_flows': np.broadcast_to(pv_cash_flows[:, :, None], enterprise_value.shape),
+        'pv_terminal_value': pv_terminal_value,
+    }
+    if single:
+        result = {name: values[0] for name, values in result.items()}
+    return result
+
+
+def dcf_share_price(free_cash_flows, net_debt, shares_outstanding, wacc, terminal_growth, mid_year=False):
+    """
+    Value many companies, each at its own discount rate and terminal growth rate.
+
+    Args:
+        free_cash_flows: Projected free cash flows, shape (companies, periods)
+        net_debt: Total debt less cash, scalar or shape (companies,)
+        shares_outstanding: Shares outstanding, scalar or shape (companies,)
+        wacc: Discount rate, scalar or shape (companies,)
+        terminal_growth: Terminal growth rate, scalar or shape (companies,)
+        mid_year: Whether cash flows are discounted from the middle of each year
+
+    Returns:
+        Array of implied share prices, NaN where WACC <= growth or there are no shares
+    """
+    cash_flows = np.atleast_2d(np.asarray(free_cash_flows, dtype=float))
+    wacc = np.asarray(wacc, dtype=float)[..., None]
+    growth = np.asarray(terminal_growth, dtype=float)
+    shares = np.asarray(shares_outstanding, dtype=float)
+
+    periods = np.arange(1, cash_flows.shape[1] + 1, dtype=float)
+    timing = periods - 0.5 if mid_year else periods
+    pv_cash_flows = (cash_flows * (1 + wacc) ** -timing).sum(axis=1)
+
+    spread = wacc[..., 0] - growth
+    with np.errstate(divide='ignore', invalid='ignore'):
+        terminal_value = np.where(spread > 0, cash_flows[:, -1] * (1 + growth) / spread, np.nan)
+        equity_value = pv_cash_flows + terminal_value * (1 + wacc[..., 0]) ** -periods[-1] - net_debt
+        return np.where(shares > 0, equity_value / shares, np.nan)
+
+
+def bisect_roots(func, lower, upper, tolerance=1e-7, max_iterations=100):
+    """
+    Find a root of many monotonic problems at once by bisection.
+
+    Args:
+        func: Function mapping an array of candidates to an array of residuals,
+            element by element
+        lower: Lower ends of the search intervals
+        upper: Upper ends of the search intervals
+        tolerance: Interval width at which a root is accepted
+        max_iterations: Maximum number of halvings
+
+    Returns:
+        Tuple of (roots, bracketed, iterations): roots are NaN where the interval
+        does not bracket a sign change
+    """
+    lower, upper = np.broadcast_arrays(np.asarray(lower, dtype=float), np.asarray(upper, dtype=float))
+    lower = lower.copy()
+    upper = upper.copy()
+    f_lower = func(lower)
+    f_upper = func(upper)
+    bracketed = np.isfinite(f_lower) & np.isfinite(f_upper) & (np.sign(f_lower) * np.sign(f_upper) <= 0)
+
+    iterations = 0
+    while iterations < max_iterations and np.any(bracketed & (upper - lower > tolerance)):
+        middle = (lower + upper) / 2
+        f_middle = func(middle)
+        # Keep the half whose ends still have opposite signs
+        move_lower = np.sign(f_middle) == np.sign(f_lower)
+        lower = np.where(move_lower, middle, lower)
+        f_lower = np.where(move_lower, f_middle, f_lower)
+        upper = np.where(move_lower, upper, middle)
+        iterations += 1
+
+    return np.where(bracketed, (lower + upper) / 2, np.nan), bracketed, iterations
+
+
+def reverse_dcf(companies, wacc, terminal_growth, assumption='revenue_growth', bounds=None,
+                assumptions=None, periods=DEFAULT_PERIODS, mid_year=False, tolerance=1e-6):
+    """
+    Solve for the assumption that makes the DCF value equal the current share price.
+
+    The assumption (e.g., revenue growth or COGS percent) is applied to every
+    forecast period; all other assumptions are held at their values.
+
+    Args:
+        companies: FinancialArrays, or a sequence of FinancialData instances
+        wacc: Discount rate, scalar or one per company
+        terminal_growth: Terminal growth rate, scalar or one per company
+        assumption: Name of the FinancialForecast assumption to solve for
+        bounds: (lower, upper) search interval (defaults from REVERSE_DCF_BOUNDS)
+        assumptions: Optional assumption overrides, scalars or one per company
+        periods: Number of years to project
+        mid_year: Whether cash flows are discounted from the middle of each year
+        tolerance: Accuracy of the solved assumption
+
+    Returns:
+        Dictionary with 'implied' (solved assumption per company, NaN where the
+        share price cannot be reached within the bounds), 'solved' (mask),
+        'share_price' (target prices), 'keys' and 'iterations'
+    """
+    arrays = companies if isinstance(companies, FinancialArrays) else from_financial_data(companies)
+    columns = arrays.columns
+    if bounds is None:
+        bounds = REVERSE_DCF_BOUNDS.get(assumption, (-1.0, 1.0))
+
+    # Defaults as in FinancialForecast, with the caller's overrides
+    model_assumptions = dict(FinancialForecast(None).assumptions)
+    if assumptions:
+        model_assumptions.update(assumptions)
+    if assumption not in model_assumptions:
+        raise ValueError(f"Unknown assumption: {assumption}")
+
+    target = columns['share_price']
+    net_debt = columns['short_term_debt'] + columns['long_term_debt'] - columns['cash']
+    shares = columns['shares_outstanding']
+
+    def residual(candidates):
+        model_assumptions[assumption] = candidates
+        cash_flows = free_cash_flows(forecast_periods(columns, model_assumptions, periods))
+        return dcf_share_price(cash_flows, net_debt, shares, wacc, terminal_growth, mid_year) - target
+
+    rows = len(arrays)
+    implied, solved, iterations = bisect_roots(residual, np.full(rows, bounds[0]), np.full(rows, bounds[1]),
+                                               tolerance)
+    return {
+        'implied': implied,
+        'solved': solved,
+        'share_price': target,
+        'keys': arrays.keys,
+        'iterations': iterations,
+    }
+
+
+def format_value_grid(grid, waccs, terminal_growths, title="Implied Share Price"):
+    """
+    Format a WACC x terminal growth grid as a text table.
+
+    Args:
+        grid: Array of shape (W, G)
+        waccs: Discount rates labelling the rows
+        terminal_growths: Growth rates labelling the columns
+        title: Table title
+
+    Returns:
+        str: Text table
+    """
+    header = f"{'WACC / g':>10}" + "".join(f"{growth:>12.1%}" for growth in terminal_growths)
+    lines = [title, header, "-" * len(header)]
+    for wacc, row in zip(waccs, np.asarray(grid)):
+        cells = "".join(f"{'n/a':>12}" if np.isnan(value) else f"{value:>12,.2f}" for value in row)
+        lines.append(f"{wacc:>10.1%}" + cells)
+    return "\n".join(lines) + "\n"
+
+
+class DCFValuation:
+    """
+    Class to value a company from its multi-period forecast.
+    """
+
+    def __init__(self, base_data, forecast=None, periods=DEFAULT_PERIODS):
+        """
+        Initialize with base financial data.
+
+        Args:
+            base_data: Current year's financial data
+            forecast: Optional FinancialForecast providing the assumptions
+                (default assumptions are used if None)
+            periods: Number of years to project
+        """
+        self.base_data = base_data
+        self.forecast = forecast if forecast is not None else FinancialForecast(base_data)
+        self.periods = periods
+        self._forecasts = None
+
+    def get_forecasts(self):
+        """
+        Get the projected FinancialData for each year (computed once).
+
+        Returns:
+            list: Forecasted FinancialData per period
+        """
+        if self._forecasts is None:
+            self._forecasts = self.forecast.generate_forecast_periods(self.periods)
+        return self._forecasts
+
+    def get_free_cash_flows(self):
+        """
+        Get the projected free cash flows.
+
+        Returns:
+            numpy array of free cash flow per period
+        """
+        return np.array([data.free_cash_flow for data in self.get_forecasts()], dtype=float)
+
+    def get_net_debt(self):
+        """Get total debt less cash at the valuation date."""
+        data = self.base_data
+        return data.short_term_debt + data.long_term_debt - data.cash
+
+    def value(self, wacc, terminal_growth, mid_year=False):
+        """
+        Value the company at a single discount rate and terminal growth rate.
+
+        Args:
+            wacc: Discount rate
+            terminal_growth: Terminal growth rate
+            mid_year: Whether cash flows are discounted from the middle of each year
+
+        Returns:
+            Dictionary with enterprise value, equity value, implied share price,
+            the present values of the cash flows and terminal value, and the
+            upside to the current share price
+        """
+        grid = self.value_grid([wacc], [terminal_growth], mid_year)
+        return {name: float(values[0, 0]) for name, values in grid.items()}
+
+    def value_grid(self, waccs, terminal_growths, mid_year=False):
+        """
+        Value the company over a WACC x terminal growth grid.
+
+        Args:
+            waccs: Discount rates
+            terminal_growths: Terminal growth rates
+            mid_year: Whether cash flows are discounted from the middle of each year
+
+        Returns:
+            Dictionary of (W, G) arrays as returned by dcf_value_grid, plus 'upside'
+            (implied share price over the current share price, less one)
+        """
+        grid = dcf_value_grid(self.get_free_cash_flows(), self.get_net_debt(),
+                              self.base_data.shares_outstanding, waccs, terminal_growths, mid_year)
+        share_price = self.base_data.share_price
+        grid['upside'] = grid['share_price'] / share_price - 1 if share_price > 0 else np.full_like(grid['share_price'], np.nan)
+        return grid
@@ -0,0 +1,348 @@
+"""
+Benchmark suite for the forecasting, ratio, comparison, notes and rendering engines.
+
+Synthetic universes of 1, 1k, 100k and 1M companies are generated from the
+sample data with random scale and noise. Each benchmark is timed for the
+scalar engine (the per-company classes) and, where one exists, the
+vectorized engine over FinancialArrays. Scalar engines are timed on at most
+--scalar-limit companies and their time at full scale is extrapolated, so
+large scales finish in reasonable time. Results are written as JSON and can
+be compared against a previous run to flag regressions.
+
+Usage:
+    python benchmarks.py --scales 1 1000 100000 1000000 --output results.json
+    python benchmarks.py --baseline results.json --output new.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+
+from analysis.comparison import FinancialComparison, _COMPARISON_ITEMS, get_item_arrays
+from analysis.forecast_kernel import forecast_periods
+from analysis.forecasting import FinancialForecast
+from analysis.notes_generator import NotesGenerator, generate_comprehensive_notes_arrays
+from analysis.ratios import FinancialRatios, compute_ratio_arrays
+from core.data_models import FinancialData
+from core import instrumentation
+from core.financial_arrays import FinancialArrays, numeric_fields
+from core.renderers import render_csv, render_html, render_text
+from core.statements import build_statements
+
+# Universe sizes benchmarked by default
+DEFAULT_SCALES = (1, 1000, 100000, 1000000)
+
+# Companies timed for scalar engines; larger scales are extrapolated
+SCALAR_SAMPLE_LIMIT = 1000
+
+# Companies timed for vectorized notes, whose output strings dominate memory
+NOTES_SAMPLE_LIMIT = 100000
+
+# Timing repetitions (best of) for runs below and above REPEAT_THRESHOLD companies
+REPEAT_SMALL = 5
+REPEAT_LARGE = 1
+REPEAT_THRESHOLD = 10000
+
+# Relative slowdown in time per company reported as a regression
+DEFAULT_TOLERANCE = 0.2
+
+# Fields that are rates or prices rather than amounts, so do not scale with company size
+_UNSCALED_FIELDS = ('tax_rate', 'share_price')
+
+
+def synthetic_universe(size, seed=0):
+    """
+    Generate a universe of synthetic companies.
+
+    Every numeric field of the sample data is multiplied by a company size
+    factor (amounts only) and by independent lognormal noise.
+
+    Args:
+        size: Number of companies
+        seed: Random seed
+
+    Returns:
+        FinancialArrays with company keys "CO0000000", ...
+    """
+    sample = FinancialData("Sample", "Year Ended December 31, 2023", "December 31, 2023")
+    sample.load_sample_data()
+    rng = np.random.default_rng(seed)
+
+    scale = rng.lognormal(0.0, 1.0, size)
+    columns = {}
+    for name in numeric_fields(sample):
+        values = getattr(sample, name) * rng.lognormal(0.0, 0.2, size)
+        columns[name] = values if name in _UNSCALED_FIELDS else values * scale
+    return FinancialArrays(columns, [f"CO{i:07d}" for i in range(size)])
+
+
+def universe_objects(universe, count):
+    """
+    Build FinancialData objects for the first companies of a universe.
+
+    Args:
+        universe: FinancialArrays
+        count: Number of companies
+
+    Returns:
+        List of FinancialData instances
+    """
+    names = list(universe.columns)
+    rows = np.column_stack([universe.columns[name][:count] for name in names]).tolist()
+    datas = []
+    for key, row in zip(universe.keys[:count], rows):
+        data = FinancialData(key, "Year Ended December 31, 2023", "December 31, 2023")
+        vars(data).update(zip(names, row))
+        datas.append(data)
+    return datas
+
+
+def _default_assumptions():
+    return dict(FinancialForecast(None).assumptions)
+
+
+# Scalar engines: setup receives FinancialData objects and returns the timed callable
+
+def _scalar_forecast(datas):
+    return lambda: [FinancialForecast(data).generate_forecast() for data in datas]
+
+
+def _scalar_ratios(datas):
+    return lambda: [FinancialRatios(data).get_all_ratios() for data in datas]
+
+
+def _scalar_comparison(datas):
+    forecasts = [FinancialForecast(data).generate_forecast() for data in datas]
+    return lambda: [FinancialComparison(data, forecast) for data, forecast in zip(datas, forecasts)]
+
+
+def _scalar_notes(datas):
+    comparisons = [FinancialComparison(data, FinancialForecast(data).generate_forecast()) for data in datas]
+    return lambda: [NotesGenerator(comparison).generate_comprehensive_notes() for comparison in comparisons]
+
+
+def _scalar_rendering(datas):
+    def render():
+        for data in datas:
+            for statement in build_statements(data).values():
+                render_text(statement)
+                render_html(statement)
+                render_csv(statement)
+    return render
+
+
+# Vectorized engines: setup receives FinancialArrays and returns the timed callable
+
+def _vector_forecast(universe):
+    assumptions = _default_assumptions()
+    return lambda: forecast_periods(universe, assumptions, 1)
+
+
+def _vector_ratios(universe):
+    return lambda: compute_ratio_arrays(universe.as_financial_data())
+
+
+def _vector_comparison(universe):
+    forecast = FinancialArrays(forecast_periods(universe, _default_assumptions(), 1)[0], universe.keys)
+    keys = list(_COMPARISON_ITEMS)
+    return lambda: get_item_arrays(universe.as_financial_data(), forecast.as_financial_data(), keys)
+
+
+def _vector_notes(universe):
+    forecast = FinancialArrays(forecast_periods(universe, _default_assumptions(), 1)[0], universe.keys)
+    return lambda: generate_comprehensive_notes_arrays(universe, forecast)
+
+
+# Benchmark name -> engine -> (setup function, maximum companies timed)
+BENCHMARKS = {
+    'forecast': {
+        'scalar': (_scalar_forecast, SCALAR_SAMPLE_LIMIT),
+        'vectorized': (_vector_forecast, None),
+    },
+    'ratios': {
+        'scalar': (_scalar_ratios, SCALAR_SAMPLE_LIMIT),
+        'vectorized': (_vector_ratios, None),
+    },
+    'comparison': {
+        'scalar': (_scalar_comparison, SCALAR_SAMPLE_LIMIT),
+        'vectorized': (_vector_comparison, None),
+    },
+    'notes': {
+        'scalar': (_scalar_notes, SCALAR_SAMPLE_LIMIT),
+        'vectorized': (_vector_notes, NOTES_SAMPLE_LIMIT),
+    },
+    'rendering': {
+        'scalar': (_scalar_rendering, SCALAR_SAMPLE_LIMIT),
+    },
+}
+
+
+def _best_time(func, repeat):
+    """Best wall-clock time of several runs."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def environment_metadata():
+    """
+    Describe the machine and library versions a run was measured on.
+
+    Returns:
+        Dictionary of metadata
+    """
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def run_benchmarks(scales=DEFAULT_SCALES, benchmarks=None, engines=None, scalar_limit=SCALAR_SAMPLE_LIMIT,
+                   seed=0, progress=None):
+    """
+    Run the benchmark suite.
+
+    Args:
+        scales: Universe sizes to benchmark
+        benchmarks: Optional benchmark names to run (all if None)
+        engines: Optional engines to run ('scalar', 'vectorized'; all if None)
+        scalar_limit: Maximum companies timed for scalar engines
+        seed: Random seed for the synthetic universes
+        progress: Optional callable receiving each result as it is measured
+
+    Returns:
+        Dictionary with 'metadata' and 'results'; each result records the
+        benchmark, engine, scale, companies timed, seconds, microseconds per
+        company, the estimated seconds at full scale and whether it was sampled
+    """
+    names = list(benchmarks) if benchmarks else list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        raise ValueError(f"Unknown benchmarks: {', '.join(unknown)}")
+
+    results = []
+    for scale in scales:
+        universe = synthetic_universe(scale, seed)
+        objects = universe_objects(universe, min(scale, scalar_limit))
+        for name in names:
+            for engine, (setup, limit) in BENCHMARKS[name].items():
+                if engines and engine not in engines:
+                    continue
+                if engine == 'scalar':
+                    limit = scalar_limit
+                entities = min(scale, limit) if limit else scale
+                if engine == 'scalar':
+                    func = setup(objects[:entities])
+                else:
+                    func = setup(universe if entities == scale else universe.take(np.arange(entities)))
+
+                seconds = _best_time(func, REPEAT_SMALL if entities < REPEAT_THRESHOLD else REPEAT_LARGE)
+                result = {
+                    'benchmark': name,
+                    'engine': engine,
+                    'scale': scale,
+                    'entities': entities,
+                    'seconds': seconds,
+                    'per_entity_us': seconds / entities * 1e6,
+                    'estimated_seconds': seconds * scale / entities,
+                    'sampled': entities < scale,
+                }
+                results.append(result)
+                if progress is not None:
+                    progress(result)
+
+    return {'metadata': environment_metadata(), 'results': results}
+
+
+def compare_results(baseline, current, tolerance=DEFAULT_TOLERANCE):
+    """
+    Find benchmarks that got slower than a baseline run.
+
+    Args:
+        baseline: Results dictionary of an earlier run
+        current: Results dictionary of this run
+        tolerance: Allowed relative increase in time per company
+
+    Returns:
+        List of dictionaries with the benchmark, engine, scale, both times per
+        company and their ratio, for every regression
+    """
+    previous = {(r['benchmark'], r['engine'], r['scale']): r for r in baseline['results']}
+    regressions = []
+    for result in current['results']:
+        before = previous.get((result['benchmark'], result['engine'], result['scale']))
+        if before is None or not before['per_entity_us']:
+            continue
+        ratio = result['per_entity_us'] / before['per_entity_us']
+        if ratio > 1 + tolerance:
+            regressions.append({
+                'benchmark': result['benchmark'],
+                'engine': result['engine'],
+                'scale': result['scale'],
+                'baseline_us': before['per_entity_us'],
+                'current_us': result['per_entity_us'],
+                'ratio': ratio,
+            })
+    return regressions
+
+
+def format_result(result):
+    """Format one result as a table row."""
+    sampled = f" (timed {result['entities']:,})" if result['sampled'] else ""
+    return (f"{result['benchmark']:<12} {result['engine']:<11} {result['scale']:>10,} "
+            f"{result['per_entity_us']:>12.2f} us/co {result['estimated_seconds']:>10.3f} s{sampled}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument('--scales', type=int, nargs='+', default=list(DEFAULT_SCALES))
+    parser.add_argument('--benchmarks', nargs='+', choices=list(BENCHMARKS))
+    parser.add_argument('--engines', nargs='+', choices=['scalar', 'vectorized'])
+    parser.add_argument('--scalar-limit', type=int, default=SCALAR_SAMPLE_LIMIT)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Write results as JSON to this file")
+    parser.add_argument('--baseline', help="Compare against the JSON results of an earlier run")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument('--instrumentation', help="Record spans and write them to this .json or .prom file")
+    args = parser.parse_args(argv)
+
+    if args.instrumentation:
+        instrumentation.enable()
+
+    report = run_benchmarks(args.scales, args.benchmarks, args.engines, args.scalar_limit, args.seed,
+                            progress=lambda result: print(format_result(result), flush=True))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.instrumentation:
+        instrumentation.export(args.instrumentation)
+        print(instrumentation.format_summary())
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare_results(json.load(f), report, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression['benchmark']} {regression['engine']} {regression['scale']:,}: "
+                  f"{regression['baseline_us']:.2f} -> {regression['current_us']:.2f} us/co "
+                  f"({regression['ratio']:.2f}x)")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
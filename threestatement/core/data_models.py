@@ -192,8 +192,9 @@ class FinancialData:
     
     @property
     def ebitda(self):
-        """Calculate EBITDA."""
-        return self.net_income + self.interest_expense + (self.net_income * self.tax_rate / (1 - self.tax_rate)) + self.depreciation_amortization
+        """Calculate EBITDA (before write-downs and gains on debt write-downs)."""
+        return (self.net_income + self.interest_expense + (self.net_income * self.tax_rate / (1 - self.tax_rate)) +
+                self.depreciation_amortization + self.goodwill_impairment + self.ppe_write_down - self.debt_write_down)
     
     @property
     def earnings_per_share(self):
@@ -236,4 +237,17 @@ class FinancialData:
     @property
     def income_before_tax(self):
         """Calculate income before tax."""
-        return self.operating_income - self.interest_expense
\ No newline at end of file
+        return (self.operating_income - self.interest_expense - self.goodwill_impairment - self.ppe_write_down +
+                self.debt_write_down)
+    
+    @property
+    def operating_cash_flow(self):
+        """Calculate cash flow from operating activities (indirect method)."""
+        return (self.net_income + self.depreciation_amortization + self.goodwill_impairment + self.ppe_write_down -
+                self.debt_write_down - self.accounts_receivable_change - self.inventory_change +
+                self.accounts_payable_change + self.accrued_expenses_change + self.deferred_revenue_change)
+    
+    @property
+    def free_cash_flow(self):
+        """Calculate free cash flow (operating cash flow less capital expenditures)."""
+        return self.operating_cash_flow - self.capital_expenditures
\ No newline at end of file
@@ -0,0 +1,184 @@
+"""
+Columnar storage for many FinancialData records.
+
+FinancialArrays keeps one numpy array per numeric FinancialData field.
+as_financial_data returns an object of the FinancialData class whose
+fields are those arrays, so the class properties (total_assets, ebitda,
+...) and any arithmetic written against FinancialData evaluate
+element-wise over the whole universe.
+
+With fixed_point=True the amount fields are int64 cents instead of float
+units (see core.fixed_point), making sums and identity checks exact.
+"""
+
+from operator import itemgetter
+
+import numpy as np
+
+from core.fixed_point import columns_from_cents, columns_to_cents, is_amount_field
+
+
+def numeric_fields(financial_data):
+    """
+    Get the names of the numeric fields of a FinancialData instance.
+
+    Args:
+        financial_data: FinancialData instance
+
+    Returns:
+        List of field names in definition order
+    """
+    return [name for name, value in vars(financial_data).items()
+            if isinstance(value, (int, float)) and not isinstance(value, bool)]
+
+
+class FinancialArrays:
+    """
+    Column-oriented collection of financial data for many companies.
+    """
+
+    def __init__(self, columns, keys=None, data_class=None, fixed_point=False):
+        """
+        Initialize from columns.
+
+        Args:
+            columns: Dictionary mapping field names to equal-length arrays
+            keys: Optional list of company keys, one per row
+            data_class: Class used by as_financial_data (FinancialData by default)
+            fixed_point: Whether the columns are in the fixed-point representation
+                (amounts in integer cents); see to_cents to convert float columns
+        """
+        self.fixed_point = fixed_point
+        if fixed_point:
+            self.columns = {name: np.asarray(values, dtype=np.int64 if is_amount_field(name) else float)
+                            for name, values in columns.items()}
+        else:
+            self.columns = {name: np.asarray(values, dtype=float) for name, values in columns.items()}
+        lengths = {len(values) for values in self.columns.values()}
+        if len(lengths) > 1:
+            raise ValueError("All columns must have the same length")
+        self.rows = lengths.pop() if lengths else 0
+        self.keys = list(keys) if keys is not None else list(range(self.rows))
+        if len(self.keys) != self.rows:
+            raise ValueError("Number of keys does not match the number of rows")
+
+        if data_class is None:
+            from core.data_models import FinancialData
+            data_class = FinancialData
+        self.data_class = data_class
+
+    def __len__(self):
+        return self.rows
+
+    def column(self, name):
+        """
+        Get a field as an array.
+
+        Args:
+            name: Field name
+
+        Returns:
+            numpy array
+        """
+        return self.columns[name]
+
+    def as_financial_data(self):
+        """
+        Get a FinancialData view whose fields are the column arrays.
+
+        Returns:
+            Instance of data_class with array-valued fields
+        """
+        data = object.__new__(self.data_class)
+        for name, values in self.columns.items():
+            setattr(data, name, values)
+        return data
+
+    def take(self, rows):
+        """
+        Select a subset of rows.
+
+        Args:
+            rows: Integer index array or boolean mask
+
+        Returns:
+            FinancialArrays with the selected rows
+        """
+        rows = np.asarray(rows)
+        if rows.dtype == bool:
+            rows = np.flatnonzero(rows)
+        return FinancialArrays(
+            {name: values[rows] for name, values in self.columns.items()},
+            [self.keys[i] for i in rows.tolist()],
+            self.data_class,
+            self.fixed_point
+        )
+
+    def to_cents(self):
+        """
+        Convert to the fixed-point representation.
+
+        Returns:
+            FinancialArrays with amounts as int64 cents (self if already fixed-point)
+
+        Raises:
+            ValueError: If an amount is not finite or too large for int64 cents
+        """
+        if self.fixed_point:
+            return self
+        return FinancialArrays(columns_to_cents(self.columns), self.keys, self.data_class, True)
+
+    def to_float(self):
+        """
+        Convert to float columns in currency units.
+
+        Returns:
+            FinancialArrays with float columns (self if not fixed-point)
+        """
+        if not self.fixed_point:
+            return self
+        return FinancialArrays(columns_from_cents(self.columns), self.keys, self.data_class)
+
+
+def from_financial_data(datas, keys=None, fixed_point=False):
+    """
+    Build a FinancialArrays collection from FinancialData objects.
+
+    Args:
+        datas: Non-empty sequence of FinancialData instances sharing a class
+        keys: Optional company keys (default to the company names)
+        fixed_point: Store amounts as int64 cents
+
+    Returns:
+        FinancialArrays
+    """
+    datas = list(datas)
+    if not datas:
+        raise ValueError("At least one company is required")
+
+    fields = numeric_fields(datas[0])
+    getter = itemgetter(*fields)
+    values = np.array([getter(vars(data)) for data in datas], dtype=float).reshape(len(datas), len(fields))
+
+    if keys is None:
+        keys = [data.company_name for data in datas]
+
+    arrays = FinancialArrays(
+        {name: values[:, i] for i, name in enumerate(fields)},
+        keys,
+        type(datas[0])
+    )
+    return arrays.to_cents() if fixed_point else arrays
+
+
+def stack_financial_data(datas):
+    """
+    Stack the numeric fields of several FinancialData objects into one.
+
+    Args:
+        datas: Non-empty sequence of FinancialData instances
+
+    Returns:
+        FinancialData whose numeric fields are arrays of length len(datas)
+    """
+    return from_financial_data(datas, keys=range(len(datas))).as_financial_data()
@@ -0,0 +1,145 @@
+"""
+Fixed-point (integer cents) representation of financial data.
+
+In fixed-point mode the amount fields of FinancialArrays are int64 numbers
+of cents, so sums, differences and the statement identities are exact
+however long the forecast horizon, while staying vectorized. Per-share
+prices are kept as floats, but in cents so that market capitalization and
+enterprise value share the unit of the amounts; the tax rate and share
+count are not scaled. int64 cents hold amounts up to about 9.2e16 dollars.
+"""
+
+import numpy as np
+
+CENTS_PER_UNIT = 100
+
+# Fields that are not money and keep their float values
+UNSCALED_FIELDS = ('tax_rate', 'shares_outstanding')
+
+# Per-share money fields, stored as float cents since they can hold fractions of a cent
+PER_SHARE_FIELDS = ('share_price', 'par_value')
+
+# Largest absolute amount in units that converts to int64 cents
+_MAX_UNITS = 2.0 ** 63 / CENTS_PER_UNIT
+
+
+def is_amount_field(name):
+    """Whether a field is an amount stored as int64 cents in fixed-point mode."""
+    return name not in UNSCALED_FIELDS and name not in PER_SHARE_FIELDS
+
+
+def to_cents(values):
+    """
+    Convert amounts to int64 cents, rounding half away from zero.
+
+    Args:
+        values: Amounts in currency units (scalar or array)
+
+    Returns:
+        int64 array of cents
+
+    Raises:
+        ValueError: If a value is not finite or too large for int64 cents
+    """
+    values = np.asarray(values, dtype=float)
+    if not np.isfinite(values).all() or (np.abs(values) >= _MAX_UNITS).any():
+        raise ValueError("Amounts must be finite and smaller than int64 cents can hold")
+    # Snap binary noise first, so e.g. 0.285 (stored as 0.28499999...) becomes 28.5 cents and rounds up
+    return round_cents(np.round(values * CENTS_PER_UNIT, 6))
+
+
+def round_cents(values):
+    """
+    Round fractional cents to int64 cents, half away from zero.
+
+    Args:
+        values: Float amounts in cents
+
+    Returns:
+        int64 array of cents
+    """
+    values = np.asarray(values, dtype=float)
+    return np.trunc(values + np.copysign(0.5, values)).astype(np.int64)
+
+
+def from_cents(cents):
+    """
+    Convert int64 cents back to float amounts.
+
+    Args:
+        cents: Amounts in cents
+
+    Returns:
+        float array of amounts in currency units
+    """
+    return np.asarray(cents) / CENTS_PER_UNIT
+
+
+def columns_to_cents(columns):
+    """
+    Convert float columns to the fixed-point representation.
+
+    Args:
+        columns: Dictionary mapping field names to float arrays in currency units
+
+    Returns:
+        Dictionary with int64 cents for amount fields, float cents for per-share
+        fields and unchanged unscaled fields
+    """
+    converted = {}
+    for name, values in columns.items():
+        if name in UNSCALED_FIELDS:
+            converted[name] = np.asarray(values, dtype=float)
+        elif name in PER_SHARE_FIELDS:
+            converted[name] = np.asarray(values, dtype=float) * CENTS_PER_UNIT
+        else:
+            converted[name] = to_cents(values)
+    return converted
+
+
+def columns_from_cents(columns):
+    """
+    Convert fixed-point columns back to float columns in currency units.
+
+    Args:
+        columns: Dictionary of fixed-point columns (see columns_to_cents)
+
+    Returns:
+        Dictionary mapping field names to float arrays
+    """
+    return {name: np.asarray(values, dtype=float) if name in UNSCALED_FIELDS else from_cents(values)
+            for name, values in columns.items()}
+
+
+def balance_sheet_difference(data):
+    """
+    Get total assets less total liabilities and equity.
+
+    Exact (an int64 array of cents) for fixed-point data.
+
+    Args:
+        data: FinancialData with scalar or array fields
+
+    Returns:
+        Difference; zero where the balance sheet balances
+    """
+    return data.total_assets - data.total_liabilities - data.total_equity
+
+
+def cash_flow_difference(data):
+    """
+    Get the ending cash balance less the balance implied by the cash flow statement.
+
+    Exact (an int64 array of cents) for fixed-point data.
+
+    Args:
+        data: FinancialData with scalar or array fields
+
+    Returns:
+        Difference; zero where beginning cash plus operating, investing and
+        financing cash flow equals ending cash
+    """
+    investing = -data.capital_expenditures - data.acquisitions + data.investments_sold + data.other_investing
+    financing = (data.debt_issuance - data.debt_repayment - data.dividends_paid + data.stock_issuance -
+                 data.stock_repurchase + data.equity_bailout + data.other_financing)
+    return data.ending_cash_balance - (data.beginning_cash_balance + data.operating_cash_flow + investing + financing)
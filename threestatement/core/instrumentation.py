@@ -0,0 +1,334 @@
+"""
+Opt-in timing instrumentation for the hot paths.
+
+Spans are named regions of code (e.g. 'forecast.generate') whose wall-clock
+durations are counted and collected into latency histograms. Recording is
+off by default: an instrumented function then costs one flag check per
+call. Turn it on with enable(), or by setting THREESTATEMENT_INSTRUMENTATION
+to 1 (and THREESTATEMENT_INSTRUMENTATION_OUTPUT to a .json or .prom path to
+write a snapshot when the process exits). Snapshots are exported as JSON
+or as Prometheus text exposition format.
+"""
+
+import atexit
+from bisect import bisect_left
+import functools
+import json
+import os
+import threading
+import time
+
+# Upper bounds of the latency histogram buckets, in seconds
+DEFAULT_BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+# Prometheus metric name prefix
+METRIC_PREFIX = 'threestatement_span_duration_seconds'
+
+_ENABLE_VARIABLE = 'THREESTATEMENT_INSTRUMENTATION'
+_OUTPUT_VARIABLE = 'THREESTATEMENT_INSTRUMENTATION_OUTPUT'
+
+
+class Histogram:
+    """
+    Count, sum, extremes and bucketed distribution of span durations.
+    """
+
+    __slots__ = ('bounds', 'buckets', 'count', 'total', 'minimum', 'maximum')
+
+    def __init__(self, bounds=DEFAULT_BUCKETS):
+        """
+        Initialize an empty histogram.
+
+        Args:
+            bounds: Increasing bucket upper bounds in seconds; a final +Inf bucket is implied
+        """
+        self.bounds = tuple(bounds)
+        self.buckets = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.minimum = None
+        self.maximum = None
+
+    def observe(self, seconds):
+        """Record one duration."""
+        self.buckets[bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if self.minimum is None or seconds < self.minimum:
+            self.minimum = seconds
+        if self.maximum is None or seconds > self.maximum:
+            self.maximum = seconds
+
+    def quantile(self, q):
+        """
+        Estimate a quantile from the buckets.
+
+        Args:
+            q: Quantile (0 to 1)
+
+        Returns:
+            Upper bound of the bucket holding the quantile (the maximum for the
+            +Inf bucket), or None if nothing was recorded
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        for bound, count in zip(self.bounds, self.buckets):
+            cumulative += count
+            if cumulative >= rank:
+                return min(bound, self.maximum)
+        return self.maximum
+
+    def to_dict(self):
+        """
+        Get the histogram as a dictionary.
+
+        Returns:
+            Dictionary with count, sum, min, max, mean, p50/p95/p99 estimates and
+            cumulative bucket counts keyed by upper bound
+        """
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip(self.bounds + (float('inf'),), self.buckets):
+            cumulative += count
+            buckets[_format_bound(bound)] = cumulative
+        return {
+            'count': self.count,
+            'sum': self.total,
+            'min': self.minimum,
+            'max': self.maximum,
+            'mean': self.total / self.count if self.count else None,
+            'p50': self.quantile(0.50),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99),
+            'buckets': buckets,
+        }
+
+
+def _format_bound(bound):
+    return '+Inf' if bound == float('inf') else repr(bound)
+
+
+class _Registry:
+    """
+    Histograms of every span name, shared by all threads.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.bounds = DEFAULT_BUCKETS
+        self.histograms = {}
+        self.lock = threading.Lock()
+
+    def observe(self, name, seconds):
+        with self.lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram(self.bounds)
+            histogram.observe(seconds)
+
+
+_registry = _Registry()
+
+
+def enable(buckets=None):
+    """
+    Start recording spans.
+
+    Args:
+        buckets: Optional histogram bucket bounds for spans first seen from now on
+    """
+    if buckets is not None:
+        _registry.bounds = tuple(buckets)
+    _registry.enabled = True
+
+
+def disable():
+    """Stop recording spans; recorded data is kept."""
+    _registry.enabled = False
+
+
+def is_enabled():
+    """Whether spans are being recorded."""
+    return _registry.enabled
+
+
+def reset():
+    """Discard all recorded data."""
+    with _registry.lock:
+        _registry.histograms = {}
+
+
+def record(name, seconds):
+    """
+    Record a duration measured elsewhere.
+
+    Args:
+        name: Span name
+        seconds: Duration in seconds
+    """
+    if _registry.enabled:
+        _registry.observe(name, seconds)
+
+
+class _Span:
+    """Context manager timing one span."""
+
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        _registry.observe(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class _NullSpan:
+    """Context manager doing nothing, used while recording is off."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name):
+    """
+    Time a block of code.
+
+    Usage:
+        with span('notes.batch'):
+            ...
+
+    Args:
+        name: Span name
+
+    Returns:
+        Context manager
+    """
+    return _Span(name) if _registry.enabled else _NULL_SPAN
+
+
+def instrumented(name):
+    """
+    Decorate a function so every call is recorded as a span.
+
+    Args:
+        name: Span name
+
+    Returns:
+        Decorator
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _registry.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _registry.observe(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def snapshot():
+    """
+    Get the recorded spans.
+
+    Returns:
+        Dictionary mapping span names to histogram dictionaries (see Histogram.to_dict),
+        sorted by name
+    """
+    with _registry.lock:
+        return {name: _registry.histograms[name].to_dict() for name in sorted(_registry.histograms)}
+
+
+def to_json(indent=2):
+    """
+    Export the recorded spans as JSON.
+
+    Returns:
+        str: JSON document with a timestamp and the spans
+    """
+    return json.dumps({'timestamp': time.time(), 'spans': snapshot()}, indent=indent)
+
+
+def _escape_label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def to_prometheus():
+    """
+    Export the recorded spans in Prometheus text exposition format.
+
+    Returns:
+        str: One histogram family with a 'span' label per span name
+    """
+    lines = [
+        f"# HELP {METRIC_PREFIX} Wall-clock duration of instrumented spans.",
+        f"# TYPE {METRIC_PREFIX} histogram",
+    ]
+    for name, data in snapshot().items():
+        label = _escape_label(name)
+        for bound, count in data['buckets'].items():
+            lines.append(f'{METRIC_PREFIX}_bucket{{span="{label}",le="{bound}"}} {count}')
+        lines.append(f'{METRIC_PREFIX}_sum{{span="{label}"}} {data["sum"]!r}')
+        lines.append(f'{METRIC_PREFIX}_count{{span="{label}"}} {data["count"]}')
+    return "\n".join(lines) + "\n"
+
+
+def export(path):
+    """
+    Write the recorded spans to a file.
+
+    Files ending in .prom or .txt are written in Prometheus text format,
+    anything else as JSON.
+
+    Args:
+        path: Output file path
+    """
+    text = to_prometheus() if path.endswith(('.prom', '.txt')) else to_json()
+    with open(path, 'w') as f:
+        f.write(text)
+
+
+def format_summary():
+    """
+    Format the recorded spans as a table, slowest total first.
+
+    Returns:
+        str: One line per span with count, total, mean and p95 in milliseconds
+    """
+    spans = sorted(snapshot().items(), key=lambda item: item[1]['sum'], reverse=True)
+    lines = [f"{'Span':<40} {'Count':>9} {'Total ms':>11} {'Mean ms':>10} {'p95 ms':>10}"]
+    for name, data in spans:
+        lines.append(f"{name:<40} {data['count']:>9} {data['sum'] * 1000:>11.2f} "
+                     f"{data['mean'] * 1000:>10.3f} {data['p95'] * 1000:>10.3f}")
+    return "\n".join(lines)
+
+
+def _configure_from_environment():
+    """Enable recording and the exit-time export from environment variables."""
+    if os.environ.get(_ENABLE_VARIABLE, '').lower() in ('1', 'true', 'yes', 'on'):
+        enable()
+        output = os.environ.get(_OUTPUT_VARIABLE)
+        if output:
+            atexit.register(export, output)
+
+
+_configure_from_environment()
@@ -0,0 +1,150 @@
+"""
+Display-free renderers for statement models.
+
+Each renderer takes a core.statements.Statement and returns a string, so
+statements can be produced in bulk without a Tk display.
+"""
+
+import csv
+import html
+import io
+
+from core.formatting import format_currency
+from core.statements import HEADING, SUBHEADING, CAPTION, TOTAL
+
+TEXT_WIDTH = 80
+TEXT_VALUE_WIDTH = 16
+
+
+def format_line_value(line):
+    """
+    Format the value of a statement line.
+
+    Args:
+        line: StatementLine instance
+
+    Returns:
+        str: Formatted value, or an empty string for lines without a value
+    """
+    if line.value is None:
+        return ""
+    if line.parenthesize:
+        return f"({format_currency(line.value)})"
+    return format_currency(line.value)
+
+
+def render_text(statement, width=TEXT_WIDTH):
+    """
+    Render a statement as fixed-width plain text.
+
+    Args:
+        statement: Statement instance
+        width: Total line width
+
+    Returns:
+        str: Plain text statement
+    """
+    rule = '-' * width
+    label_width = width - TEXT_VALUE_WIDTH
+    out = [
+        statement.company_name.center(width).rstrip(),
+        statement.title.center(width).rstrip(),
+        statement.period_label.center(width).rstrip(),
+        rule,
+    ]
+
+    for line in statement.lines:
+        if line.rule_above:
+            out.append(rule)
+        label = "  " * line.indent + line.label
+        if line.kind == HEADING:
+            out.append("")
+        out.append(f"{label:<{label_width}}{format_line_value(line):>{TEXT_VALUE_WIDTH}}".rstrip())
+
+    out.append(rule)
+    return "\n".join(out) + "\n"
+
+
+def render_html(statement):
+    """
+    Render a statement as an HTML fragment.
+
+    Args:
+        statement: Statement instance
+
+    Returns:
+        str: HTML table wrapped in a section element
+    """
+    out = [
+        f'<section class="statement statement-{statement.statement_type}">',
+        f'<h2>{html.escape(statement.company_name)}</h2>',
+        f'<h3>{html.escape(statement.title)}</h3>',
+        f'<p class="period">{html.escape(statement.period_label)}</p>',
+        '<table>',
+    ]
+
+    for line in statement.lines:
+        classes = [line.kind, f"indent-{line.indent}"]
+        if line.rule_above:
+            classes.append("rule-above")
+        label = html.escape(line.label)
+        if line.kind in (HEADING, SUBHEADING, TOTAL):
+            label = f"<strong>{label}</strong>"
+        elif line.kind == CAPTION:
+            label = f"<em>{label}</em>"
+        out.append(
+            f'<tr class="{" ".join(classes)}"><td>{label}</td>'
+            f'<td class="value">{html.escape(format_line_value(line))}</td></tr>'
+        )
+
+    out.append('</table>')
+    out.append('</section>')
+    return "\n".join(out) + "\n"
+
+
+def render_csv(statement):
+    """
+    Render a statement as CSV.
+
+    Values are written unformatted so the output can be loaded back as numbers.
+    Columns are: statement, label, kind, indent, value.
+
+    Args:
+        statement: Statement instance
+
+    Returns:
+        str: CSV text including a header row
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(["statement", "label", "kind", "indent", "value"])
+    writer.writerows(
+        (statement.statement_type, line.label, line.kind, line.indent, "" if line.value is None else line.value)
+        for line in statement.lines
+    )
+    return buffer.getvalue()
+
+
+RENDERERS = {
+    'text': render_text,
+    'html': render_html,
+    'csv': render_csv,
+}
+
+
+def render_statement(statement, output_format):
+    """
+    Render a statement with the named backend.
+
+    Args:
+        statement: Statement instance
+        output_format: 'text', 'html' or 'csv'
+
+    Returns:
+        str: Rendered statement
+    """
+    try:
+        renderer = RENDERERS[output_format]
+    except KeyError:
+        raise ValueError(f"Unknown output format: {output_format}")
+    return renderer(statement)
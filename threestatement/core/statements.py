@@ -0,0 +1,309 @@
+"""
+Headless statement models built from financial data.
+
+The builders in this module hold all of the statement math and layout
+decisions, but create no widgets. Backends in core.renderers (text, HTML,
+CSV) and gui.statement_views (Tk) only walk the resulting lines.
+"""
+
+# Line kinds understood by every renderer
+HEADING = 'heading'          # Top-level section, e.g. "ASSETS"
+SUBHEADING = 'subheading'    # Section inside a heading, e.g. "Current Assets"
+CAPTION = 'caption'          # Italic explanatory caption without a value
+ITEM = 'item'                # Regular line item
+TOTAL = 'total'              # Bold subtotal or total
+
+
+class StatementLine:
+    """
+    A single row of a financial statement.
+    """
+
+    __slots__ = ('label', 'value', 'kind', 'indent', 'rule_above', 'parenthesize')
+
+    def __init__(self, label, value=None, kind=ITEM, indent=0, rule_above=False, parenthesize=False):
+        """
+        Initialize a statement line.
+
+        Args:
+            label: Text shown in the label column
+            value: Numeric value, or None for headings and captions
+            kind: One of HEADING, SUBHEADING, CAPTION, ITEM or TOTAL
+            indent: Indentation level (0, 1 or 2)
+            rule_above: Whether a horizontal rule is drawn above the line
+            parenthesize: Whether the value is shown in parentheses as a deduction
+        """
+        self.label = label
+        self.value = value
+        self.kind = kind
+        self.indent = indent
+        self.rule_above = rule_above
+        self.parenthesize = parenthesize
+
+    def __repr__(self):
+        return f"StatementLine({self.label!r}, {self.value!r}, kind={self.kind!r})"
+
+
+class Statement:
+    """
+    Structured representation of a financial statement.
+    """
+
+    __slots__ = ('statement_type', 'company_name', 'title', 'period_label', 'lines')
+
+    def __init__(self, statement_type, company_name, title, period_label, lines):
+        """
+        Initialize a statement.
+
+        Args:
+            statement_type: 'income', 'balance' or 'cash_flow'
+            company_name: Name of the company
+            title: Statement title (e.g., "Income Statement")
+            period_label: Period or date caption shown under the title
+            lines: List of StatementLine objects
+        """
+        self.statement_type = statement_type
+        self.company_name = company_name
+        self.title = title
+        self.period_label = period_label
+        self.lines = lines
+
+    def values(self):
+        """
+        Get the statement values keyed by label.
+
+        Returns:
+            Dictionary mapping line labels to values (headings are skipped)
+        """
+        return {line.label: line.value for line in self.lines if line.value is not None}
+
+
+def build_income_statement(data, reporting_period=None):
+    """
+    Build an income statement model.
+
+    Args:
+        data: FinancialData instance
+        reporting_period: Optional period caption overriding data.reporting_period
+
+    Returns:
+        Statement
+    """
+    revenue = data.revenue
+    cogs = data.cogs
+    operating_expenses = data.operating_expenses
+    interest_expense = data.interest_expense
+    tax_rate = data.tax_rate
+
+    # Calculate derived values
+    gross_profit = revenue - cogs
+    operating_income = gross_profit - operating_expenses
+    income_before_tax = (operating_income - interest_expense - data.goodwill_impairment - data.ppe_write_down +
+                         data.debt_write_down)
+    income_tax = income_before_tax * tax_rate
+    net_income = income_before_tax - income_tax
+
+    lines = [
+        StatementLine("Revenue", revenue, TOTAL),
+        StatementLine("Cost of Goods Sold", cogs),
+        StatementLine("Gross Profit", gross_profit, TOTAL, rule_above=True),
+        StatementLine("Operating Expenses", operating_expenses),
+        StatementLine("Operating Income", operating_income, TOTAL, rule_above=True),
+        StatementLine("Interest Expense", interest_expense),
+    ]
+
+    # One-off items, shown only in periods that have them
+    if data.goodwill_impairment:
+        lines.append(StatementLine("Goodwill Impairment", data.goodwill_impairment))
+    if data.ppe_write_down:
+        lines.append(StatementLine("PP&E Write-down", data.ppe_write_down))
+    if data.debt_write_down:
+        lines.append(StatementLine("Gain on Debt Write-down", data.debt_write_down))
+
+    lines += [
+        StatementLine("Income Before Tax", income_before_tax, TOTAL, rule_above=True),
+        StatementLine(f"Income Tax ({tax_rate:.0%})", income_tax),
+        StatementLine("Net Income", net_income, TOTAL, rule_above=True),
+    ]
+
+    return Statement(
+        'income',
+        data.company_name,
+        "Income Statement",
+        reporting_period if reporting_period is not None else data.reporting_period,
+        lines
+    )
+
+
+def build_balance_sheet(data, reporting_date=None):
+    """
+    Build a balance sheet model.
+
+    Args:
+        data: FinancialData instance
+        reporting_date: Optional date overriding data.reporting_date
+
+    Returns:
+        Statement
+    """
+    # Calculate derived values
+    total_current_assets = data.cash + data.accounts_receivable + data.inventory + data.prepaid_expenses
+    net_ppe = data.property_plant_equipment - data.accumulated_depreciation
+    total_assets = total_current_assets + net_ppe + data.intangible_assets
+
+    total_current_liabilities = (data.accounts_payable + data.accrued_expenses +
+                                 data.short_term_debt + data.deferred_revenue)
+    total_liabilities = total_current_liabilities + data.long_term_debt
+
+    total_equity = data.common_stock + data.retained_earnings - data.treasury_stock
+    total_liabilities_equity = total_liabilities + total_equity
+
+    lines = [
+        # Assets
+        StatementLine("ASSETS", kind=HEADING),
+        StatementLine("Current Assets", kind=SUBHEADING),
+        StatementLine("Cash and Cash Equivalents", data.cash, indent=1),
+        StatementLine("Accounts Receivable", data.accounts_receivable, indent=1),
+        StatementLine("Inventory", data.inventory, indent=1),
+        StatementLine("Prepaid Expenses", data.prepaid_expenses, indent=1),
+        StatementLine("Total Current Assets", total_current_assets, TOTAL, rule_above=True),
+        StatementLine("Non-Current Assets", kind=SUBHEADING),
+        StatementLine("Property, Plant, and Equipment", data.property_plant_equipment, indent=1),
+        StatementLine("Accumulated Depreciation", data.accumulated_depreciation, indent=1, parenthesize=True),
+        StatementLine("Net Property, Plant, and Equipment", net_ppe, indent=1),
+        StatementLine("Intangible Assets", data.intangible_assets, indent=1),
+        StatementLine("TOTAL ASSETS", total_assets, TOTAL, rule_above=True),
+
+        # Liabilities
+        StatementLine("LIABILITIES", kind=HEADING),
+        StatementLine("Current Liabilities", kind=SUBHEADING),
+        StatementLine("Accounts Payable", data.accounts_payable, indent=1),
+        StatementLine("Accrued Expenses", data.accrued_expenses, indent=1),
+        StatementLine("Short-term Debt", data.short_term_debt, indent=1),
+        StatementLine("Deferred Revenue", data.deferred_revenue, indent=1),
+        StatementLine("Total Current Liabilities", total_current_liabilities, TOTAL, rule_above=True),
+        StatementLine("Long-term Debt", data.long_term_debt, indent=1),
+        StatementLine("TOTAL LIABILITIES", total_liabilities, TOTAL, rule_above=True),
+
+        # Equity
+        StatementLine("EQUITY", kind=HEADING),
+        StatementLine("Common Stock", data.common_stock, indent=1),
+        StatementLine("Retained Earnings", data.retained_earnings, indent=1),
+    ]
+
+    if data.treasury_stock > 0:
+        lines.append(StatementLine("Treasury Stock", data.treasury_stock, indent=1, parenthesize=True))
+
+    lines.append(StatementLine("TOTAL EQUITY", total_equity, TOTAL, rule_above=True))
+    lines.append(StatementLine("TOTAL LIABILITIES AND EQUITY", total_liabilities_equity, TOTAL, rule_above=True))
+
+    date = reporting_date if reporting_date is not None else data.reporting_date
+
+    return Statement('balance', data.company_name, "Balance Sheet", f"As of {date}", lines)
+
+
+def build_cash_flow_statement(data, reporting_period=None):
+    """
+    Build a cash flow statement model.
+
+    Args:
+        data: FinancialData instance
+        reporting_period: Optional period caption overriding data.reporting_period
+
+    Returns:
+        Statement
+    """
+    # Calculate derived values
+    operating_cash_flow = (data.net_income + data.depreciation_amortization + data.goodwill_impairment +
+                           data.ppe_write_down - data.debt_write_down - data.accounts_receivable_change -
+                           data.inventory_change + data.accounts_payable_change + data.accrued_expenses_change +
+                           data.deferred_revenue_change)
+
+    investing_cash_flow = -data.capital_expenditures - data.acquisitions + data.investments_sold
+
+    financing_cash_flow = (data.debt_issuance - data.debt_repayment - data.dividends_paid +
+                           data.stock_issuance - data.stock_repurchase + data.equity_bailout)
+
+    net_change_in_cash = operating_cash_flow + investing_cash_flow + financing_cash_flow
+
+    ending_cash_balance = data.beginning_cash_balance + net_change_in_cash
+
+    lines = [
+        # Operating Activities
+        StatementLine("OPERATING ACTIVITIES", kind=HEADING),
+        StatementLine("Net Income", data.net_income, indent=1),
+        StatementLine("Adjustments to reconcile net income:", kind=CAPTION, indent=1),
+        StatementLine("Depreciation and Amortization", data.depreciation_amortization, indent=2),
+    ]
+
+    # Non-cash one-off items, shown only in periods that have them
+    if data.goodwill_impairment:
+        lines.append(StatementLine("Goodwill Impairment", data.goodwill_impairment, indent=2))
+    if data.ppe_write_down:
+        lines.append(StatementLine("PP&E Write-down", data.ppe_write_down, indent=2))
+    if data.debt_write_down:
+        lines.append(StatementLine("Gain on Debt Write-down", data.debt_write_down, indent=2, parenthesize=True))
+
+    lines += [
+        StatementLine("Changes in operating assets and liabilities:", kind=CAPTION, indent=1),
+        StatementLine("Accounts Receivable", -data.accounts_receivable_change, indent=2),
+        StatementLine("Inventory", -data.inventory_change, indent=2),
+        StatementLine("Accounts Payable", data.accounts_payable_change, indent=2),
+        StatementLine("Accrued Expenses", data.accrued_expenses_change, indent=2),
+        StatementLine("Deferred Revenue", data.deferred_revenue_change, indent=2),
+        StatementLine("Net Cash from Operating Activities", operating_cash_flow, TOTAL, rule_above=True),
+
+        # Investing Activities
+        StatementLine("INVESTING ACTIVITIES", kind=HEADING),
+        StatementLine("Capital Expenditures", data.capital_expenditures, indent=1, parenthesize=True),
+        StatementLine("Acquisitions", data.acquisitions, indent=1, parenthesize=True),
+        StatementLine("Investments Sold", data.investments_sold, indent=1),
+        StatementLine("Net Cash from Investing Activities", investing_cash_flow, TOTAL, rule_above=True),
+
+        # Financing Activities
+        StatementLine("FINANCING ACTIVITIES", kind=HEADING),
+        StatementLine("Debt Issuance", data.debt_issuance, indent=1),
+        StatementLine("Debt Repayment", data.debt_repayment, indent=1, parenthesize=True),
+        StatementLine("Dividends Paid", data.dividends_paid, indent=1, parenthesize=True),
+        StatementLine("Stock Issuance", data.stock_issuance, indent=1),
+        StatementLine("Stock Repurchase", data.stock_repurchase, indent=1, parenthesize=True),
+    ]
+    if data.equity_bailout:
+        lines.append(StatementLine("Equity Bailout", data.equity_bailout, indent=1))
+
+    lines += [
+        StatementLine("Net Cash from Financing Activities", financing_cash_flow, TOTAL, rule_above=True),
+
+        # Cash Balances
+        StatementLine("Net Change in Cash", net_change_in_cash, TOTAL, rule_above=True),
+        StatementLine("Beginning Cash Balance", data.beginning_cash_balance),
+        StatementLine("Ending Cash Balance", ending_cash_balance, TOTAL, rule_above=True),
+    ]
+
+    return Statement(
+        'cash_flow',
+        data.company_name,
+        "Cash Flow Statement",
+        reporting_period if reporting_period is not None else data.reporting_period,
+        lines
+    )
+
+
+STATEMENT_BUILDERS = {
+    'income': build_income_statement,
+    'balance': build_balance_sheet,
+    'cash_flow': build_cash_flow_statement,
+}
+
+
+def build_statements(data):
+    """
+    Build all three statement models for a company.
+
+    Args:
+        data: FinancialData instance
+
+    Returns:
+        Dictionary mapping statement type to Statement
+    """
+    return {statement_type: builder(data) for statement_type, builder in STATEMENT_BUILDERS.items()}
@@ -0,0 +1,419 @@
+"""
+SQLite persistence for financial data, forecast assumptions and forecasts.
+
+Every FinancialData record is one row of the financial_data table, with
+one REAL column per numeric field, keyed by company, reporting period,
+kind ('actual' or 'forecast'), scenario and forecast horizon. The unique
+index on that key starts with (company, period), so loading any
+company-period is a single index lookup. reporting_date is free text
+(e.g. "March 31, 2024"), so each row also stores it as an ISO period_end
+date, which orders a company's history. Writes go through one connection
+in batched executemany statements. Reads are served by a pool of
+read-only connections, and the database runs in WAL mode so readers are
+not blocked by a writer.
+"""
+
+from contextlib import contextmanager
+from datetime import datetime
+import queue
+import sqlite3
+import threading
+
+import numpy as np
+
+from core.data_models import FinancialData
+from core.financial_arrays import FinancialArrays, numeric_fields
+
+ACTUAL = 'actual'
+FORECAST = 'forecast'
+
+# Default number of pooled reader connections
+DEFAULT_POOL_SIZE = 4
+
+# Rows per executemany batch
+DEFAULT_BATCH_SIZE = 5000
+
+_KEY_COLUMNS = ('company_id', 'reporting_period', 'kind', 'scenario', 'horizon')
+
+# Formats reporting_date is parsed with, e.g. "December 31, 2023", "Dec 31, 2023" or "2023-12-31"
+_DATE_FORMATS = ('%B %d, %Y', '%b %d, %Y', '%Y-%m-%d', '%d %B %Y', '%d %b %Y', '%m/%d/%Y')
+
+
+def _period_end(reporting_date):
+    """ISO date of a free-text reporting date, or None if it cannot be parsed."""
+    if not reporting_date:
+        return None
+    text = " ".join(str(reporting_date).replace(',', ', ').split()).replace(' ,', ',')
+    for date_format in _DATE_FORMATS:
+        try:
+            return datetime.strptime(text, date_format).date().isoformat()
+        except ValueError:
+            continue
+    return None
+
+
+def _data_fields():
+    """Numeric FinancialData fields stored as columns."""
+    return numeric_fields(FinancialData(None, None, None))
+
+
+class ReaderPool:
+    """
+    Fixed-size pool of read-only SQLite connections.
+    """
+
+    def __init__(self, path, size=DEFAULT_POOL_SIZE):
+        """
+        Initialize the pool.
+
+        Args:
+            path: Database file path
+            size: Number of connections
+        """
+        self.path = path
+        self._connections = queue.Queue()
+        self._all = []
+        for _ in range(size):
+            connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+            self._all.append(connection)
+            self._connections.put(connection)
+
+    @contextmanager
+    def connection(self, timeout=None):
+        """
+        Borrow a connection for the duration of a with block.
+
+        Args:
+            timeout: Seconds to wait for a free connection (None waits indefinitely)
+
+        Yields:
+            sqlite3.Connection
+        """
+        connection = self._connections.get(timeout=timeout)
+        try:
+            yield connection
+        finally:
+            self._connections.put(connection)
+
+    def close(self):
+        """Close every connection."""
+        for connection in self._all:
+            connection.close()
+        self._all = []
+
+
+class FinancialStore:
+    """
+    Local database of companies, financial data, assumptions and forecasts.
+    """
+
+    def __init__(self, path, pool_size=DEFAULT_POOL_SIZE):
+        """
+        Open or create a store.
+
+        Args:
+            path: Database file path
+            pool_size: Number of pooled reader connections
+        """
+        self.path = path
+        self.fields = _data_fields()
+        self._write_lock = threading.Lock()
+        self._writer = sqlite3.connect(path, check_same_thread=False)
+        self._writer.execute("PRAGMA journal_mode=WAL")
+        self._writer.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+        self._company_ids = {}
+        self.readers = ReaderPool(path, pool_size)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+        return False
+
+    def close(self):
+        """Close all connections."""
+        self.readers.close()
+        self._writer.close()
+
+    def _create_schema(self):
+        field_columns = ",\n".join(f"    {field} REAL" for field in self.fields)
+        with self._writer:
+            self._writer.executescript(f"""
+CREATE TABLE IF NOT EXISTS companies (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS financial_data (
+    id INTEGER PRIMARY KEY,
+    company_id INTEGER NOT NULL REFERENCES companies(id),
+    reporting_period TEXT NOT NULL,
+    reporting_date TEXT,
+    period_end TEXT,
+    kind TEXT NOT NULL,
+    scenario TEXT NOT NULL DEFAULT '',
+    horizon INTEGER NOT NULL DEFAULT 0,
+{field_columns}
+);
+CREATE UNIQUE INDEX IF NOT EXISTS financial_data_key
+    ON financial_data (company_id, reporting_period, kind, scenario, horizon);
+CREATE INDEX IF NOT EXISTS financial_data_period
+    ON financial_data (reporting_period, kind);
+CREATE TABLE IF NOT EXISTS assumptions (
+    company_id INTEGER NOT NULL REFERENCES companies(id),
+    reporting_period TEXT NOT NULL,
+    scenario TEXT NOT NULL DEFAULT '',
+    name TEXT NOT NULL,
+    value REAL,
+    PRIMARY KEY (company_id, reporting_period, scenario, name)
+);
+""")
+            # Add columns for FinancialData fields introduced since the database was created
+            existing = {row[1] for row in self._writer.execute("PRAGMA table_info(financial_data)")}
+            for field in self.fields:
+                if field not in existing:
+                    self._writer.execute(f"ALTER TABLE financial_data ADD COLUMN {field} REAL")
+            if 'period_end' not in existing:
+                self._writer.execute("ALTER TABLE financial_data ADD COLUMN period_end TEXT")
+                self._writer.executemany("UPDATE financial_data SET period_end = ? WHERE id = ?", [
+                    (_period_end(date), row_id)
+                    for row_id, date in self._writer.execute("SELECT id, reporting_date FROM financial_data")])
+            self._writer.execute("CREATE INDEX IF NOT EXISTS financial_data_history "
+                                 "ON financial_data (company_id, kind, period_end)")
+
+    def _company_id_map(self, names):
+        """Get (creating if needed) the ids of several companies; the write lock must be held."""
+        missing = [name for name in set(names) if name not in self._company_ids]
+        if missing:
+            self._writer.executemany("INSERT OR IGNORE INTO companies (name) VALUES (?)",
+                                     [(name,) for name in missing])
+            for start in range(0, len(missing), 500):
+                chunk = missing[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                self._company_ids.update(self._writer.execute(
+                    f"SELECT name, id FROM companies WHERE name IN ({placeholders})", chunk))
+        return self._company_ids
+
+    def _insert_rows(self, rows, batch_size):
+        """Upsert (company name, period, date, kind, scenario, horizon, *fields) rows."""
+        dated = ('reporting_date', 'period_end')
+        columns = _KEY_COLUMNS + dated + tuple(self.fields)
+        updates = ", ".join(f"{column} = excluded.{column}" for column in dated + tuple(self.fields))
+        statement = (f"INSERT INTO financial_data ({', '.join(columns)}) "
+                     f"VALUES ({', '.join('?' * len(columns))}) "
+                     f"ON CONFLICT ({', '.join(_KEY_COLUMNS)}) DO UPDATE SET {updates}")
+
+        with self._write_lock:
+            try:
+                with self._writer:
+                    ids = self._company_id_map([row[0] for row in rows])
+                    for start in range(0, len(rows), batch_size):
+                        self._writer.executemany(statement, [
+                            (ids[name], period, kind, scenario, horizon, date, _period_end(date), *values)
+                            for name, period, date, kind, scenario, horizon, values in rows[start:start + batch_size]
+                        ])
+            except sqlite3.Error:
+                # Company ids created in the rolled back transaction are gone
+                self._company_ids = {}
+                raise
+        return len(rows)
+
+    def save_financial_data(self, datas, kind=ACTUAL, scenario='', horizon=0, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        Save FinancialData records, replacing any with the same key.
+
+        Args:
+            datas: Iterable of FinancialData instances
+            kind: ACTUAL or FORECAST
+            scenario: Scenario name
+            horizon: Forecast horizon in periods (0 for actuals)
+            batch_size: Rows per executemany batch
+
+        Returns:
+            int: Number of rows written
+        """
+        fields = self.fields
+        rows = [
+            (data.company_name, data.reporting_period, data.reporting_date, kind, scenario, horizon,
+             [getattr(data, field, None) for field in fields])
+            for data in datas
+        ]
+        return self._insert_rows(rows, batch_size)
+
+    def save_financial_arrays(self, arrays, reporting_period, reporting_date=None, kind=ACTUAL, scenario='',
+                              horizon=0, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        Save a FinancialArrays universe for one period; the keys are the company names.
+
+        Args:
+            arrays: FinancialArrays (fixed-point arrays are stored in currency units)
+            reporting_period: Reporting period of every row
+            reporting_date: Optional balance sheet date of every row
+            kind: ACTUAL or FORECAST
+            scenario: Scenario name
+            horizon: Forecast horizon in periods
+            batch_size: Rows per executemany batch
+
+        Returns:
+            int: Number of rows written
+        """
+        arrays = arrays.to_float()
+        columns = [arrays.columns[field].tolist() if field in arrays.columns else [None] * len(arrays)
+                   for field in self.fields]
+        rows = [
+            (str(key), reporting_period, reporting_date, kind, scenario, horizon, values)
+            for key, values in zip(arrays.keys, zip(*columns))
+        ]
+        return self._insert_rows(rows, batch_size)
+
+    def save_assumptions(self, company_name, reporting_period, assumptions, scenario=''):
+        """
+        Save forecast assumptions for a company-period.
+
+        Args:
+            company_name: Company name
+            reporting_period: Base reporting period
+            assumptions: Dictionary of assumption names and values
+            scenario: Scenario name
+        """
+        with self._write_lock, self._writer:
+            company_id = self._company_id_map([company_name])[company_name]
+            self._writer.executemany(
+                "INSERT INTO assumptions (company_id, reporting_period, scenario, name, value) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (company_id, reporting_period, scenario, name) DO UPDATE SET value = excluded.value",
+                [(company_id, reporting_period, scenario, name, value) for name, value in assumptions.items()]
+            )
+
+    def save_forecast(self, base_data, forecasts, assumptions=None, scenario=''):
+        """
+        Save the forecast periods of a company with their assumptions.
+
+        Args:
+            base_data: FinancialData the forecast was made from
+            forecasts: List of forecast FinancialData, one per period
+            assumptions: Optional assumptions used for the forecast
+            scenario: Scenario name
+
+        Returns:
+            int: Number of forecast rows written
+        """
+        fields = self.fields
+        rows = [
+            (base_data.company_name, base_data.reporting_period, forecast.reporting_date, FORECAST, scenario,
+             horizon, [getattr(forecast, field, None) for field in fields])
+            for horizon, forecast in enumerate(forecasts, start=1)
+        ]
+        count = self._insert_rows(rows, DEFAULT_BATCH_SIZE)
+        if assumptions:
+            self.save_assumptions(base_data.company_name, base_data.reporting_period, assumptions, scenario)
+        return count
+
+    def _to_financial_data(self, row):
+        name, period, date = row[:3]
+        data = FinancialData(name, period, date)
+        fields = vars(data)
+        for field, value in zip(self.fields, row[3:]):
+            if value is not None:
+                fields[field] = value
+        return data
+
+    def _select(self, where, parameters, order_by="f.horizon"):
+        columns = ", ".join(f"f.{field}" for field in self.fields)
+        with self.readers.connection() as connection:
+            return connection.execute(
+                f"SELECT c.name, f.reporting_period, f.reporting_date, {columns} "
+                f"FROM financial_data f JOIN companies c ON c.id = f.company_id "
+                f"WHERE {where} ORDER BY {order_by}", parameters).fetchall()
+
+    def load_financial_data(self, company_name, reporting_period, kind=ACTUAL, scenario='', horizon=0):
+        """
+        Load one FinancialData record.
+
+        Args:
+            company_name: Company name
+            reporting_period: Reporting period
+            kind: ACTUAL or FORECAST
+            scenario: Scenario name
+            horizon: Forecast horizon in periods
+
+        Returns:
+            FinancialData, or None if not stored
+        """
+        rows = self._select(
+            "c.name = ? AND f.reporting_period = ? AND f.kind = ? AND f.scenario = ? AND f.horizon = ?",
+            (company_name, reporting_period, kind, scenario, horizon))
+        return self._to_financial_data(rows[0]) if rows else None
+
+    def load_forecast(self, company_name, reporting_period, scenario=''):
+        """
+        Load the stored forecast periods of a company-period.
+
+        Args:
+            company_name: Company name
+            reporting_period: Base reporting period
+            scenario: Scenario name
+
+        Returns:
+            List of FinancialData, in horizon order
+        """
+        rows = self._select("c.name = ? AND f.reporting_period = ? AND f.kind = ? AND f.scenario = ?",
+                            (company_name, reporting_period, FORECAST, scenario))
+        return [self._to_financial_data(row) for row in rows]
+
+    def load_assumptions(self, company_name, reporting_period, scenario=''):
+        """
+        Load the assumptions saved for a company-period.
+
+        Returns:
+            Dictionary of assumption names and values (empty if none)
+        """
+        with self.readers.connection() as connection:
+            return dict(connection.execute(
+                "SELECT a.name, a.value FROM assumptions a JOIN companies c ON c.id = a.company_id "
+                "WHERE c.name = ? AND a.reporting_period = ? AND a.scenario = ?",
+                (company_name, reporting_period, scenario)))
+
+    def load_history(self, company_name):
+        """
+        Load every actual period of a company.
+
+        Returns:
+            List of FinancialData ordered by reporting date, oldest first (rows whose
+            date cannot be parsed come first, in the order they were saved)
+        """
+        rows = self._select("c.name = ? AND f.kind = ?", (company_name, ACTUAL), "f.period_end, f.id")
+        return [self._to_financial_data(row) for row in rows]
+
+    def load_period_arrays(self, reporting_period, kind=ACTUAL, scenario='', horizon=0):
+        """
+        Load every company for one period as columns, for batch jobs.
+
+        Args:
+            reporting_period: Reporting period
+            kind: ACTUAL or FORECAST
+            scenario: Scenario name
+            horizon: Forecast horizon in periods
+
+        Returns:
+            FinancialArrays keyed by company name (fields never stored are 0)
+        """
+        rows = self._select("f.reporting_period = ? AND f.kind = ? AND f.scenario = ? AND f.horizon = ?",
+                            (reporting_period, kind, scenario, horizon), "c.name")
+        values = np.array([row[3:] for row in rows], dtype=float).reshape(len(rows), len(self.fields))
+        values[np.isnan(values)] = 0.0
+        return FinancialArrays({field: values[:, i] for i, field in enumerate(self.fields)},
+                               [row[0] for row in rows])
+
+    def list_companies(self):
+        """Names of all stored companies, sorted."""
+        with self.readers.connection() as connection:
+            return [row[0] for row in connection.execute("SELECT name FROM companies ORDER BY name")]
+
+    def list_periods(self, company_name):
+        """Actual reporting periods stored for a company, ordered by reporting date."""
+        with self.readers.connection() as connection:
+            return [row[0] for row in connection.execute(
+                "SELECT f.reporting_period FROM financial_data f JOIN companies c ON c.id = f.company_id "
+                "WHERE c.name = ? AND f.kind = ? AND f.scenario = '' ORDER BY f.period_end, f.id",
+                (company_name, ACTUAL))]
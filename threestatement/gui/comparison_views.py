@@ -5,6 +5,8 @@ Module for displaying financial statement comparisons.
 import tkinter as tk
 from tkinter import ttk, scrolledtext
 
+from core.instrumentation import instrumented
+
 def format_currency(value):
     """Format a value as currency."""
     return f"${value:,.0f}"
@@ -22,6 +24,7 @@ def format_change(value, percentage):
     else:
         return f"— {format_currency(0)} (0.0%)"
 
+@instrumented('gui.show_comparison_statement')
 def show_comparison_statement(parent, comparison, statement_type, base_year, forecast_year):
     """
     Display a comparison between base and forecast financial statements.
@@ -290,6 +293,7 @@ def show_comparison_statement(parent, comparison, statement_type, base_year, for
     close_button = ttk.Button(window, text="Close", command=window.destroy)
     close_button.pack(pady=10)
 
+@instrumented('gui.show_management_discussion')
 def show_management_discussion(parent, comparison, base_year, forecast_year):
     """
     Display a comprehensive management discussion and analysis.
@@ -5,12 +5,15 @@ Module for displaying forecasted financial statements.
 import tkinter as tk
 from tkinter import ttk
 
-from gui.statement_views import (
-    show_income_statement,
-    show_balance_sheet,
-    show_cash_flow_statement
+from core.instrumentation import instrumented
+from core.statements import (
+    build_income_statement,
+    build_balance_sheet,
+    build_cash_flow_statement
 )
+from gui.statement_views import show_statement
 
+@instrumented('gui.show_forecasted_statements')
 def show_forecasted_statements(parent, forecasted_data, forecast_year):
     """
     Display forecasted financial statements.
@@ -59,13 +62,9 @@ def show_forecasted_statements(parent, forecasted_data, forecast_year):
     income_button = tk.Button(
         button_frame,
         text="Forecasted Income Statement",
-        command=lambda: show_income_statement(
-            forecasted_data.company_name, f"Year Ending December 31, {forecast_year}",
-            forecasted_data.revenue, 
-            forecasted_data.cogs, 
-            forecasted_data.operating_expenses, 
-            forecasted_data.interest_expense, 
-            forecasted_data.tax_rate
+        command=lambda: show_statement(
+            build_income_statement(forecasted_data, f"Year Ending December 31, {forecast_year}"),
+            parent
         ),
         width=button_width,
         height=button_height,
@@ -79,26 +78,9 @@ def show_forecasted_statements(parent, forecasted_data, forecast_year):
     balance_button = tk.Button(
         button_frame,
         text="Forecasted Balance Sheet",
-        command=lambda: show_balance_sheet(
-            forecasted_data.company_name, f"December 31, {forecast_year}",
-            # Assets
-            forecasted_data.cash, 
-            forecasted_data.accounts_receivable, 
-            forecasted_data.inventory, 
-            forecasted_data.prepaid_expenses,
-            forecasted_data.property_plant_equipment, 
-            forecasted_data.accumulated_depreciation, 
-            forecasted_data.intangible_assets,
-            # Liabilities
-            forecasted_data.accounts_payable, 
-            forecasted_data.accrued_expenses, 
-            forecasted_data.short_term_debt,
-            forecasted_data.long_term_debt, 
-            forecasted_data.deferred_revenue,
-            # Equity
-            forecasted_data.common_stock, 
-            forecasted_data.retained_earnings,
-            forecasted_data.treasury_stock
+        command=lambda: show_statement(
+            build_balance_sheet(forecasted_data, f"December 31, {forecast_year}"),
+            parent
         ),
         width=button_width,
         height=button_height,
@@ -112,28 +94,9 @@ def show_forecasted_statements(parent, forecasted_data, forecast_year):
     cash_flow_button = tk.Button(
         button_frame,
         text="Forecasted Cash Flow Statement",
-        command=lambda: show_cash_flow_statement(
-            forecasted_data.company_name, f"Year Ending December 31, {forecast_year}",
-            # Operating Activities
-            forecasted_data.net_income,
-            forecasted_data.depreciation_amortization,
-            forecasted_data.accounts_receivable_change,
-            forecasted_data.inventory_change,
-            forecasted_data.accounts_payable_change,
-            forecasted_data.accrued_expenses_change,
-            forecasted_data.deferred_revenue_change,
-            # Investing Activities
-            forecasted_data.capital_expenditures,
-            forecasted_data.acquisitions,
-            forecasted_data.investments_sold,
-            # Financing Activities
-            forecasted_data.debt_issuance,
-            forecasted_data.debt_repayment,
-            forecasted_data.dividends_paid,
-            forecasted_data.stock_issuance,
-            forecasted_data.stock_repurchase,
-            # Cash Balances
-            forecasted_data.beginning_cash_balance
+        command=lambda: show_statement(
+            build_cash_flow_statement(forecasted_data, f"Year Ending December 31, {forecast_year}"),
+            parent
         ),
         width=button_width,
         height=button_height,
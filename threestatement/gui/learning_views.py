@@ -7,6 +7,8 @@ from tkinter import ttk, scrolledtext
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
+from core.instrumentation import instrumented
+
 class FinancialLearningView:
     """
     Class to create educational views for financial statements.
@@ -257,6 +259,7 @@ Use the other tabs in this tool to explore these concepts interactively!
         self.explanation_text = scrolledtext.ScrolledText(self.explanation_frame, wrap=tk.WORD, height=10)
         self.explanation_text.pack(fill='both', expand=True)
     
+    @instrumented('gui.simulate_impact')
     def _simulate_impact(self):
         """Simulate the impact of changes on financial statements."""
         try:
@@ -1072,6 +1075,7 @@ Valuation ratios measure the relative value of a company's stock compared to its
         # Generate the default visualization
         self._generate_visualization()
     
+    @instrumented('gui.generate_visualization')
     def _generate_visualization(self):
         """Generate a visualization based on the selected type."""
         # Clear the visualization frame
@@ -5,12 +5,11 @@ Main application entry point for the financial statement application.
 import tkinter as tk
 from tkinter import ttk, messagebox
 import os
+import sys
 
 from gui.components import create_button
 from gui.statement_views import (
-    show_income_statement,
-    show_balance_sheet,
-    show_cash_flow_statement,
+    show_statement,
     show_investing_analysis
 )
 from gui.comparison_views import (
@@ -18,6 +17,13 @@ from gui.comparison_views import (
     show_management_discussion
 )
 from core.data_models import FinancialData
+from core.storage import FinancialStore
+from core.statements import (
+    build_income_statement,
+    build_balance_sheet,
+    build_cash_flow_statement
+)
+from analysis.forecast_cache import ForecastCache
 from analysis.forecasting import FinancialForecast
 from analysis.comparison import FinancialComparison
 from gui.editors import AssumptionsEditor
@@ -36,9 +42,14 @@ def ensure_directories():
         if not os.path.exists(directory):
             os.makedirs(directory)
 
-def main_financial_dashboard():
+def main_financial_dashboard(database=None, company_name=None, reporting_period=None):
     """
     Main function to create a financial dashboard with buttons to show each statement
+    
+    Args:
+        database: Optional path to a FinancialStore database to load the company from
+        company_name: Company to load from the database (the first stored company if None)
+        reporting_period: Period to load (the latest stored period if None)
     """
     # Ensure directories exist
     ensure_directories()
@@ -48,17 +59,34 @@ def main_financial_dashboard():
     root.title("Financial Statements Dashboard")
     root.geometry("900x700")
     
-    # Company information
-    company_name = "ABC Corporation"
-    reporting_period = "Year Ended December 31, 2023"
-    reporting_date = "December 31, 2023"
-    
-    # Create financial data model
-    financial_data = FinancialData(company_name, reporting_period, reporting_date)
-    financial_data.load_sample_data()
-    
-    # Create forecast model
-    forecast_model = FinancialForecast(financial_data)
+    if database:
+        # Load the company and its saved assumptions from the database
+        with FinancialStore(database) as store:
+            company_name = company_name or store.list_companies()[0]
+            reporting_period = reporting_period or store.list_periods(company_name)[-1]
+            financial_data = store.load_financial_data(company_name, reporting_period)
+            if financial_data is None:
+                raise ValueError(f"No data stored for {company_name}, {reporting_period}")
+            assumptions = store.load_assumptions(company_name, reporting_period)
+        
+        forecast_model = FinancialForecast(financial_data)
+        forecast_model.update_assumptions(assumptions)
+    else:
+        # Company information
+        company_name = "ABC Corporation"
+        reporting_period = "Year Ended December 31, 2023"
+        reporting_date = "December 31, 2023"
+        
+        # Create financial data model
+        financial_data = FinancialData(company_name, reporting_period, reporting_date)
+        financial_data.load_sample_data()
+        
+        # Create forecast model
+        forecast_model = FinancialForecast(financial_data)
+    
+    # Memoize forecasts so regenerating with unchanged assumptions is instant
+    if forecast_model.cache is None:
+        forecast_model.cache = ForecastCache()
     
     # Create a frame for the title
     title_frame = tk.Frame(root, pady=20)
@@ -103,14 +131,7 @@ def main_financial_dashboard():
     income_button = create_button(
         current_button_frame, 
         "Income Statement", 
-        lambda: show_income_statement(
-            company_name, reporting_period,
-            financial_data.revenue, 
-            financial_data.cogs, 
-            financial_data.operating_expenses, 
-            financial_data.interest_expense, 
-            financial_data.tax_rate
-        ),
+        lambda: show_statement(build_income_statement(financial_data)),
         button_width,
         button_height,
         button_font
@@ -121,27 +142,7 @@ def main_financial_dashboard():
     balance_button = create_button(
         current_button_frame, 
         "Balance Sheet", 
-        lambda: show_balance_sheet(
-            company_name, reporting_date,
-            # Assets
-            financial_data.cash, 
-            financial_data.accounts_receivable, 
-            financial_data.inventory, 
-            financial_data.prepaid_expenses,
-            financial_data.property_plant_equipment, 
-            financial_data.accumulated_depreciation, 
-            financial_data.intangible_assets,
-            # Liabilities
-            financial_data.accounts_payable, 
-            financial_data.accrued_expenses, 
-            financial_data.short_term_debt,
-            financial_data.long_term_debt, 
-            financial_data.deferred_revenue,
-            # Equity
-            financial_data.common_stock, 
-            financial_data.retained_earnings,
-            financial_data.treasury_stock
-        ),
+        lambda: show_statement(build_balance_sheet(financial_data)),
         button_width,
         button_height,
         button_font
@@ -152,29 +153,7 @@ def main_financial_dashboard():
     cash_flow_button = create_button(
         current_button_frame, 
         "Cash Flow Statement", 
-        lambda: show_cash_flow_statement(
-            company_name, reporting_period,
-            # Operating Activities
-            financial_data.net_income,
-            financial_data.depreciation_amortization,
-            financial_data.accounts_receivable_change,
-            financial_data.inventory_change,
-            financial_data.accounts_payable_change,
-            financial_data.accrued_expenses_change,
-            financial_data.deferred_revenue_change,
-            # Investing Activities
-            financial_data.capital_expenditures,
-            financial_data.acquisitions,
-            financial_data.investments_sold,
-            # Financing Activities
-            financial_data.debt_issuance,
-            financial_data.debt_repayment,
-            financial_data.dividends_paid,
-            financial_data.stock_issuance,
-            financial_data.stock_repurchase,
-            # Cash Balances
-            financial_data.beginning_cash_balance
-        ),
+        lambda: show_statement(build_cash_flow_statement(financial_data)),
         button_width,
         button_height,
         button_font
@@ -358,4 +337,5 @@ def main_financial_dashboard():
 
 
 if __name__ == "__main__":
-    main_financial_dashboard()
\ No newline at end of file
+    # Optional arguments: database path, company name, reporting period
+    main_financial_dashboard(*sys.argv[1:4])
\ No newline at end of file
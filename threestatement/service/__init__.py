@@ -0,0 +1,3 @@
+"""
+Service module exposing the financial models over a local HTTP JSON API.
+"""
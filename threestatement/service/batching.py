@@ -0,0 +1,103 @@
+"""
+Micro-batching of concurrent requests.
+
+A MicroBatcher collects the items submitted while a short window is open
+and processes them with one call, then hands each caller its own result.
+The window closes when max_batch_size items are waiting or max_wait
+seconds after its first item arrived, whichever comes first, so a lone
+request is delayed by at most max_wait while a burst of requests shares
+the cost of a single vectorized run.
+"""
+
+import asyncio
+
+# Default largest batch and longest wait for a batch to fill, in seconds
+DEFAULT_MAX_BATCH_SIZE = 256
+DEFAULT_MAX_WAIT = 0.002
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent submissions into batches.
+    """
+
+    def __init__(self, process, max_batch_size=DEFAULT_MAX_BATCH_SIZE, max_wait=DEFAULT_MAX_WAIT):
+        """
+        Initialize the batcher.
+
+        Args:
+            process: Coroutine function taking a list of items and returning a
+                list of results in the same order
+            max_batch_size: Largest number of items processed together
+            max_wait: Longest time in seconds the first item of a batch waits for more
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.process = process
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._pending = []
+        self._timer = None
+        self._tasks = set()
+        self.batches = 0
+        self.items = 0
+        self.largest_batch = 0
+
+    async def submit(self, item):
+        """
+        Add an item to the current batch and wait for its result.
+
+        Args:
+            item: Item passed to process
+
+        Returns:
+            The item's result
+
+        Raises:
+            Whatever process raised for the item's batch
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_batch_size:
+            self.flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self.flush)
+        return await future
+
+    def flush(self):
+        """Start processing the waiting items now."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        self.batches += 1
+        self.items += len(batch)
+        self.largest_batch = max(self.largest_batch, len(batch))
+        task = asyncio.get_running_loop().create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch):
+        """Process one batch and fan its results out to the callers."""
+        try:
+            results = await self.process([item for item, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self):
+        """Get the number of batches and items processed and the largest batch."""
+        return {
+            'batches': self.batches,
+            'items': self.items,
+            'largest_batch': self.largest_batch,
+            'mean_batch': self.items / self.batches if self.batches else 0,
+        }
@@ -0,0 +1,355 @@
+"""
+Request handlers of the forecast service.
+
+Each handler takes a decoded JSON request and returns a JSON-serializable
+dictionary. handle() runs in the service's worker processes: it decodes
+the request body, runs the handler and encodes the response there, so the
+event loop of the front end only moves bytes.
+
+A request describes the company under "data": the company_name,
+reporting_period and reporting_date strings plus any numeric FinancialData
+fields (missing fields are 0, or the sample values when "sample" is true).
+Optional "assumptions" override the FinancialForecast defaults.
+"""
+
+import json
+import math
+
+import numpy as np
+
+from analysis.comparison import FinancialComparison
+from analysis.forecast_cache import ForecastCache, get_default_cache, set_default_cache
+from analysis.forecast_kernel import forecast_periods
+from analysis.forecasting import FinancialForecast
+from analysis.ratios import FinancialRatios, compute_ratio_arrays
+from core.data_models import FinancialData
+from core.financial_arrays import from_financial_data, numeric_fields
+
+# Largest number of forecast periods accepted in one request
+MAX_PERIODS = 50
+
+# In-memory forecast cache budget of each worker, in bytes
+WORKER_CACHE_BYTES = 16 * 1024 * 1024
+
+_DEFAULT_ASSUMPTIONS = FinancialForecast(None).assumptions
+
+
+def financial_data_from_dict(values, sample=False):
+    """
+    Build FinancialData from a request's "data" object.
+
+    Args:
+        values: Dictionary of field values
+        sample: Start from the sample data instead of zeros
+
+    Returns:
+        FinancialData
+
+    Raises:
+        ValueError: If a field is unknown or a numeric field is not a number
+    """
+    if not isinstance(values, dict):
+        raise ValueError("'data' must be an object")
+    data = FinancialData(str(values.get('company_name', 'Company')), str(values.get('reporting_period', '')),
+                         str(values.get('reporting_date', '')))
+    if sample:
+        data.load_sample_data()
+    fields = set(numeric_fields(data))
+    for name, value in values.items():
+        if name in ('company_name', 'reporting_period', 'reporting_date'):
+            continue
+        if name not in fields:
+            raise ValueError(f"Unknown field: {name}")
+        if not isinstance(value, (int, float)) or isinstance(value, bool):
+            raise ValueError(f"Field {name} must be a number")
+        setattr(data, name, value)
+    return data
+
+
+def financial_data_to_dict(data):
+    """
+    Get the fields of FinancialData as a dictionary.
+
+    Args:
+        data: FinancialData
+
+    Returns:
+        Dictionary of the strings and numeric fields, without private attributes
+    """
+    return {name: value for name, value in vars(data).items() if not name.startswith('_')}
+
+
+def _request_data(request):
+    """Build the FinancialData described by a request."""
+    return financial_data_from_dict(request.get('data', {}), bool(request.get('sample')))
+
+
+def _request_assumptions(request):
+    """Validate a request's assumption overrides."""
+    assumptions = request.get('assumptions') or {}
+    if not isinstance(assumptions, dict):
+        raise ValueError("'assumptions' must be an object")
+    unknown = [name for name in assumptions if name not in _DEFAULT_ASSUMPTIONS]
+    if unknown:
+        raise ValueError(f"Unknown assumptions: {', '.join(unknown)}")
+    for name, value in assumptions.items():
+        if not isinstance(value, (int, float)) or isinstance(value, bool):
+            raise ValueError(f"Assumption {name} must be a number")
+    return assumptions
+
+
+def _request_periods(request):
+    """Validate a request's number of forecast periods."""
+    periods = request.get('periods', 1)
+    if not isinstance(periods, int) or isinstance(periods, bool) or not 1 <= periods <= MAX_PERIODS:
+        raise ValueError(f"'periods' must be an integer from 1 to {MAX_PERIODS}")
+    return periods
+
+
+def _forecast_model(request):
+    """Build the FinancialForecast described by a request."""
+    model = FinancialForecast(_request_data(request))
+    model.update_assumptions(_request_assumptions(request))
+    return model
+
+
+def _comparison(request):
+    """Forecast a request's company and compare the forecast with its base data."""
+    model = _forecast_model(request)
+    return FinancialComparison(model.base_data, model.generate_forecast())
+
+
+def forecast(request):
+    """
+    Forecast one or more periods.
+
+    Request fields: data, sample, assumptions, periods (default 1).
+
+    Returns:
+        Dictionary with the list of 'forecasts'
+    """
+    periods = _request_periods(request)
+    forecasts = _forecast_model(request).generate_forecast_periods(periods)
+    return {'forecasts': [financial_data_to_dict(data) for data in forecasts]}
+
+
+def ratios(request):
+    """
+    Compute the financial ratios of the request's data.
+
+    Request fields: data, sample.
+
+    Returns:
+        Dictionary with the 'ratios' by category
+    """
+    return {'ratios': FinancialRatios(_request_data(request)).get_all_ratios()}
+
+
+def comparison(request):
+    """
+    Compare the next-period forecast with the base data.
+
+    Request fields: data, sample, assumptions.
+
+    Returns:
+        Dictionary with the 'forecast' and the 'income_statement',
+        'balance_sheet' and 'cash_flow' comparisons
+    """
+    result = _comparison(request)
+    return {
+        'forecast': financial_data_to_dict(result.forecast_data),
+        'income_statement': result.get_income_statement_comparison(),
+        'balance_sheet': result.get_balance_sheet_comparison(),
+        'cash_flow': result.get_cash_flow_comparison(),
+    }
+
+
+def notes(request):
+    """
+    Generate the explanatory notes of the next-period forecast.
+
+    Request fields: data, sample, assumptions.
+
+    Returns:
+        Dictionary with the comprehensive 'notes' text
+    """
+    return {'notes': _comparison(request).notes_generator.generate_comprehensive_notes()}
+
+
+# Endpoint name -> handler
+ENDPOINTS = {
+    'forecast': forecast,
+    'ratios': ratios,
+    'comparison': comparison,
+    'notes': notes,
+}
+
+# Endpoints whose requests can be answered together by the vectorized kernels
+BATCH_ENDPOINTS = ('forecast', 'ratios')
+
+
+def _ratio_categories():
+    """Map each ratio category of FinancialRatios.get_all_ratios to its ratio names."""
+    sample = FinancialData("Sample", "", "")
+    sample.load_sample_data()
+    return {category: list(values) for category, values in FinancialRatios(sample).get_all_ratios().items()}
+
+
+_RATIO_CATEGORIES = _ratio_categories()
+
+
+def _finite(value):
+    """Replace infinite and NaN floats, which JSON cannot represent, with None."""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key: _finite(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_finite(item) for item in value]
+    return value
+
+
+def encode(result):
+    """Encode a response as JSON bytes."""
+    return json.dumps(_finite(result), separators=(',', ':')).encode('utf-8')
+
+
+def initialize_worker(cache_bytes=WORKER_CACHE_BYTES):
+    """
+    Prepare a worker process: give it a forecast cache unless one is configured.
+
+    Args:
+        cache_bytes: In-memory cache budget in bytes (0 disables the cache)
+    """
+    if get_default_cache() is None and cache_bytes:
+        set_default_cache(ForecastCache(cache_bytes))
+
+
+def _decode(body):
+    """Decode a request body into a dictionary."""
+    request = json.loads(body) if body else {}
+    if not isinstance(request, dict):
+        raise ValueError("Request body must be a JSON object")
+    return request
+
+
+def handle(endpoint, body):
+    """
+    Run one request.
+
+    Args:
+        endpoint: Name of an endpoint in ENDPOINTS
+        body: Request body (JSON bytes)
+
+    Returns:
+        Tuple of (HTTP status code, JSON response bytes); errors are returned
+        as {"error": message} with status 400 for invalid requests and 500
+        for failures of the models
+    """
+    try:
+        result = ENDPOINTS[endpoint](_decode(body))
+    except ValueError as e:
+        return 400, encode({'error': str(e)})
+    except Exception as e:
+        return 500, encode({'error': f"{type(e).__name__}: {e}"})
+    return 200, encode(result)
+
+
+def _forecast_batch(items):
+    """
+    Forecast many requests with one forecast kernel run.
+
+    Args:
+        items: List of (FinancialData, assumption overrides, periods) sharing the same periods
+
+    Returns:
+        List of results as returned by forecast()
+    """
+    datas = [data for data, _, _ in items]
+    assumptions = dict(_DEFAULT_ASSUMPTIONS)
+    for name in {name for _, overrides, _ in items for name in overrides}:
+        assumptions[name] = np.array([overrides.get(name, _DEFAULT_ASSUMPTIONS[name]) for _, overrides, _ in items],
+                                     dtype=float)
+    outputs = forecast_periods(from_financial_data(datas), assumptions, items[0][2])
+
+    names = list(outputs[0])
+    rows = [np.column_stack([output[name] for name in names]).tolist() for output in outputs]
+    results = []
+    for i, data in enumerate(datas):
+        forecasts = []
+        for period in rows:
+            forecast = financial_data_to_dict(data)
+            forecast.update(zip(names, period[i]))
+            forecasts.append(forecast)
+        results.append({'forecasts': forecasts})
+    return results
+
+
+def _ratios_batch(datas):
+    """
+    Compute the ratios of many requests with one compute_ratio_arrays call.
+
+    Args:
+        datas: List of FinancialData
+
+    Returns:
+        List of results as returned by ratios()
+    """
+    values = compute_ratio_arrays(from_financial_data(datas).as_financial_data())
+    names = list(values)
+    results = []
+    for row in np.column_stack([values[name] for name in names]).tolist():
+        flat = dict(zip(names, row))
+        results.append({'ratios': {category: {name: flat[name] for name in members}
+                                   for category, members in _RATIO_CATEGORIES.items()}})
+    return results
+
+
+def handle_batch(endpoint, bodies):
+    """
+    Run many requests to the same endpoint together.
+
+    Valid /forecast requests are grouped by their number of periods and each
+    group is forecast by one forecast kernel run; valid /ratios requests go
+    through one compute_ratio_arrays call. Invalid requests get their own
+    error response, and if a vectorized run fails its requests are retried
+    one at a time, so every caller gets the values handle() would return.
+    Other endpoints are run one request at a time.
+
+    Args:
+        endpoint: Name of an endpoint in ENDPOINTS
+        bodies: List of request bodies (JSON bytes)
+
+    Returns:
+        List of (HTTP status code, JSON response bytes), in the order of the bodies
+    """
+    if endpoint not in BATCH_ENDPOINTS:
+        return [handle(endpoint, body) for body in bodies]
+
+    responses = [None] * len(bodies)
+    groups = {}
+    for index, body in enumerate(bodies):
+        try:
+            request = _decode(body)
+            if endpoint == 'forecast':
+                item = (_request_data(request), _request_assumptions(request), _request_periods(request))
+                group = item[2]
+            else:
+                item = _request_data(request)
+                group = None
+        except ValueError as e:
+            responses[index] = 400, encode({'error': str(e)})
+            continue
+        groups.setdefault(group, []).append((index, item))
+
+    batch = _forecast_batch if endpoint == 'forecast' else _ratios_batch
+    for members in groups.values():
+        try:
+            results = batch([item for _, item in members])
+        except Exception:
+            for index, _ in members:
+                responses[index] = handle(endpoint, bodies[index])
+            continue
+        for (index, _), result in zip(members, results):
+            responses[index] = 200, encode(result)
+    return responses
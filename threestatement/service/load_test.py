@@ -0,0 +1,178 @@
+"""
+Load-test client for the forecast service.
+
+Opens a number of concurrent keep-alive connections and sends requests for
+synthetic companies (see benchmarks.synthetic_universe) as fast as the
+service answers, then reports throughput and latency percentiles. With
+--start-server the service is started in the same process, so a single
+command measures the whole stack.
+
+Usage (from the threestatement directory):
+    python -m service.load_test --endpoint forecast --requests 2000 --concurrency 16
+    python -m service.load_test --start-server --workers 4 --endpoint notes
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+import numpy as np
+
+from benchmarks import synthetic_universe, universe_objects
+from service.batching import DEFAULT_MAX_BATCH_SIZE, DEFAULT_MAX_WAIT
+from service.handlers import ENDPOINTS, financial_data_to_dict
+from service.server import DEFAULT_HOST, DEFAULT_PORT, ForecastService
+
+# Distinct synthetic companies cycled through by the requests
+DEFAULT_COMPANIES = 100
+
+
+def request_bodies(endpoint, companies=DEFAULT_COMPANIES, periods=1, seed=0):
+    """
+    Build JSON request bodies for synthetic companies.
+
+    Args:
+        endpoint: Endpoint name
+        companies: Number of distinct companies
+        periods: Forecast periods of /forecast requests
+        seed: Random seed
+
+    Returns:
+        List of request bodies (bytes)
+    """
+    bodies = []
+    for data in universe_objects(synthetic_universe(companies, seed), companies):
+        request = {'data': financial_data_to_dict(data)}
+        if endpoint == 'forecast':
+            request['periods'] = periods
+        bodies.append(json.dumps(request).encode('utf-8'))
+    return bodies
+
+
+async def _post(reader, writer, host, path, body):
+    """Send one request on an open connection and read the response."""
+    writer.write(f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode('latin-1') + body)
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.strip().lower() == 'content-length':
+            length = int(value)
+    return status, await reader.readexactly(length)
+
+
+async def _client(host, port, path, bodies, counter, total, latencies, errors):
+    """One connection sending requests until the shared counter reaches the total."""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while counter[0] < total:
+            index = counter[0]
+            counter[0] += 1
+            start = time.perf_counter()
+            status, _ = await _post(reader, writer, host, path, bodies[index % len(bodies)])
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+async def run_load_test(host=DEFAULT_HOST, port=DEFAULT_PORT, endpoint='forecast', requests=1000, concurrency=8,
+                        bodies=None):
+    """
+    Load-test a running service.
+
+    Args:
+        host: Service address
+        port: Service port
+        endpoint: Endpoint name
+        requests: Total number of requests
+        concurrency: Number of concurrent connections
+        bodies: Optional request bodies to cycle through (synthetic companies if None)
+
+    Returns:
+        Dictionary with the request and error counts, seconds, requests per
+        second and p50/p95/p99/max latencies in milliseconds
+    """
+    if bodies is None:
+        bodies = request_bodies(endpoint)
+    latencies, errors, counter = [], [], [0]
+    start = time.perf_counter()
+    await asyncio.gather(*(_client(host, port, f'/{endpoint}', bodies, counter, requests, latencies, errors)
+                           for _ in range(concurrency)))
+    seconds = time.perf_counter() - start
+
+    milliseconds = np.array(latencies) * 1000
+    p50, p95, p99 = np.percentile(milliseconds, [50, 95, 99])
+    return {
+        'endpoint': endpoint,
+        'requests': len(latencies),
+        'errors': len(errors),
+        'concurrency': concurrency,
+        'seconds': seconds,
+        'requests_per_second': len(latencies) / seconds,
+        'p50_ms': p50,
+        'p95_ms': p95,
+        'p99_ms': p99,
+        'max_ms': milliseconds.max(),
+    }
+
+
+def format_report(report):
+    """Format a load-test report as one line."""
+    return (f"{report['endpoint']:<11} {report['requests']:>7,} requests {report['errors']:>5} errors "
+            f"{report['requests_per_second']:>9.1f} req/s  p50 {report['p50_ms']:.2f} ms  "
+            f"p95 {report['p95_ms']:.2f} ms  p99 {report['p99_ms']:.2f} ms  max {report['max_ms']:.2f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--endpoint', choices=list(ENDPOINTS), default='forecast')
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--companies', type=int, default=DEFAULT_COMPANIES)
+    parser.add_argument('--periods', type=int, default=1)
+    parser.add_argument('--start-server', action='store_true', help="Run the service in this process")
+    parser.add_argument('--workers', type=int, help="Worker processes of the started service")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_MAX_BATCH_SIZE,
+                        help="Largest request batch of the started service (1 disables batching)")
+    parser.add_argument('--batch-wait', type=float, default=DEFAULT_MAX_WAIT,
+                        help="Longest batch wait in seconds of the started service")
+    parser.add_argument('--output', help="Write the report as JSON to this file")
+    args = parser.parse_args(argv)
+
+    bodies = request_bodies(args.endpoint, args.companies, args.periods)
+
+    async def run():
+        service = None
+        if args.start_server:
+            service = ForecastService(args.host, 0, args.workers, batch_size=args.batch_size,
+                                      batch_wait=args.batch_wait)
+            await service.start()
+            args.port = service.port
+        try:
+            return await run_load_test(args.host, args.port, args.endpoint, args.requests, args.concurrency, bodies)
+        finally:
+            if service is not None:
+                await service.close()
+
+    report = asyncio.run(run())
+    print(format_report(report))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 1 if report['errors'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
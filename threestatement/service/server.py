@@ -0,0 +1,237 @@
+"""
+Local HTTP JSON server for the forecasting, ratio, comparison and notes models.
+
+An asyncio front end accepts keep-alive HTTP/1.1 connections and hands
+each request body to a pool of worker processes, which hold the imported
+models (and a forecast cache) for the life of the service, so a call costs
+one round trip instead of starting the application. Concurrent /forecast
+and /ratios requests are coalesced by a MicroBatcher and answered by one
+vectorized kernel run per batch (see handlers.handle_batch).
+
+Endpoints:
+    POST /forecast, /ratios, /comparison, /notes   see service.handlers
+    GET  /health                                   status, workers and batching statistics
+    GET  /metrics                                  request spans in Prometheus format
+
+Usage (from the threestatement directory):
+    python -m service.server --port 8765 --workers 4 --batch-size 256 --batch-wait 0.002
+"""
+
+import argparse
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+import functools
+import os
+import sys
+import time
+
+from core import instrumentation
+from service import handlers
+from service.batching import DEFAULT_MAX_BATCH_SIZE, DEFAULT_MAX_WAIT, MicroBatcher
+
+# Default address and port
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+# Largest request body accepted, in bytes
+MAX_BODY_BYTES = 1024 * 1024
+
+# Reason phrases of the status codes the server sends
+_REASONS = {
+    200: 'OK',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    413: 'Payload Too Large',
+    500: 'Internal Server Error',
+}
+
+_JSON = 'application/json'
+_TEXT = 'text/plain; version=0.0.4'
+
+
+class ForecastService:
+    """
+    Asyncio HTTP server dispatching model requests to a process pool.
+    """
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, workers=None,
+                 cache_bytes=handlers.WORKER_CACHE_BYTES, batch_size=DEFAULT_MAX_BATCH_SIZE,
+                 batch_wait=DEFAULT_MAX_WAIT):
+        """
+        Initialize the service.
+
+        Args:
+            host: Address to listen on
+            port: Port to listen on (0 picks a free port)
+            workers: Number of worker processes (default: CPU count)
+            cache_bytes: Forecast cache budget of each worker (0 disables it)
+            batch_size: Largest batch of coalesced requests (1 disables batching)
+            batch_wait: Longest time in seconds a request waits for its batch to fill
+        """
+        self.host = host
+        self.port = port
+        self.workers = workers or os.cpu_count() or 1
+        self.cache_bytes = cache_bytes
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.batchers = {}
+        self.pool = None
+        self.server = None
+
+    async def start(self):
+        """Start the worker processes and begin accepting connections."""
+        self.pool = ProcessPoolExecutor(self.workers, initializer=handlers.initialize_worker,
+                                        initargs=(self.cache_bytes,))
+        # Start every worker now so the first requests do not pay for it
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self.pool, handlers.initialize_worker, self.cache_bytes)
+                               for _ in range(self.workers)))
+        if self.batch_size > 1:
+            self.batchers = {endpoint: MicroBatcher(functools.partial(self._run_batch, endpoint), self.batch_size,
+                                                    self.batch_wait)
+                             for endpoint in handlers.BATCH_ENDPOINTS}
+        self.server = await asyncio.start_server(self._serve_connection, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        """Start the service if needed and serve until cancelled."""
+        if self.server is None:
+            await self.start()
+        try:
+            await self.server.serve_forever()
+        finally:
+            await self.close()
+
+    async def close(self):
+        """Stop accepting connections and shut down the workers."""
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
+
+    async def _serve_connection(self, reader, writer):
+        """Answer the requests of one connection until it is closed."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, path, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await self._respond(writer, 400, _JSON, handlers.encode({'error': "Malformed request line"}),
+                                        False)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                content_length = headers.get('content-length') or '0'
+                if not (content_length.isascii() and content_length.isdigit()):
+                    await self._respond(writer, 400, _JSON, handlers.encode({'error': "Invalid Content-Length"}),
+                                        False)
+                    break
+                length = int(content_length)
+                if length > MAX_BODY_BYTES:
+                    await self._respond(writer, 413, _JSON, handlers.encode({'error': "Request body too large"}),
+                                        False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+
+                keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                status, content_type, payload = await self._dispatch(method, path.split('?', 1)[0], body)
+                await self._respond(writer, status, content_type, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method, path, body):
+        """
+        Route a request.
+
+        Returns:
+            Tuple of (status code, content type, response bytes)
+        """
+        endpoint = path.strip('/')
+        if endpoint == 'health':
+            batching = {name: batcher.stats() for name, batcher in self.batchers.items()}
+            return 200, _JSON, handlers.encode({'status': 'ok', 'workers': self.workers, 'batching': batching})
+        if endpoint == 'metrics':
+            return 200, _TEXT, instrumentation.to_prometheus().encode('utf-8')
+        if endpoint not in handlers.ENDPOINTS:
+            return 404, _JSON, handlers.encode({'error': f"Unknown endpoint: {path}"})
+        if method != 'POST':
+            return 405, _JSON, handlers.encode({'error': f"{path} requires POST"})
+
+        start = time.perf_counter()
+        batcher = self.batchers.get(endpoint)
+        if batcher is not None:
+            status, payload = await batcher.submit(body)
+        else:
+            status, payload = await asyncio.get_running_loop().run_in_executor(
+                self.pool, handlers.handle, endpoint, body)
+        instrumentation.record(f'service.{endpoint}', time.perf_counter() - start)
+        return status, _JSON, payload
+
+    async def _run_batch(self, endpoint, bodies):
+        """Answer a batch of coalesced requests in one worker call."""
+        start = time.perf_counter()
+        responses = await asyncio.get_running_loop().run_in_executor(
+            self.pool, handlers.handle_batch, endpoint, bodies)
+        instrumentation.record(f'service.{endpoint}.batch', time.perf_counter() - start)
+        return responses
+
+    @staticmethod
+    async def _respond(writer, status, content_type, payload, keep_alive):
+        """Write one HTTP response."""
+        head = (f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(payload)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode('latin-1') + payload)
+        await writer.drain()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--cache-bytes', type=int, default=handlers.WORKER_CACHE_BYTES)
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_MAX_BATCH_SIZE,
+                        help="Largest batch of coalesced requests (1 disables batching)")
+    parser.add_argument('--batch-wait', type=float, default=DEFAULT_MAX_WAIT,
+                        help="Longest wait in seconds for a batch to fill")
+    args = parser.parse_args(argv)
+
+    # Request spans are always recorded so /metrics has something to report
+    instrumentation.enable()
+    service = ForecastService(args.host, args.port, args.workers, args.cache_bytes, args.batch_size,
+                              args.batch_wait)
+
+    async def run():
+        await service.start()
+        print(f"Serving on http://{service.host}:{service.port} with {service.workers} workers", flush=True)
+        await service.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
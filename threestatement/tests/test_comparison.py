@@ -0,0 +1,57 @@
+"""
+Tests for comparing a forecast period with its base period.
+"""
+
+import math
+
+from analysis.comparison import FinancialComparison
+from analysis.forecast_kernel import apply_events, forecast_step
+from analysis.forecasting import FinancialForecast
+from core.data_models import FinancialData
+from core.financial_arrays import from_financial_data
+
+
+def _base():
+    data = FinancialData('Example Co', '2023', 'December 31, 2023')
+    data.revenue = 1000000.0
+    data.cogs = 700000.0
+    data.operating_expenses = 350000.0
+    data.net_income = -60000.0
+    data.depreciation_amortization = 40000.0
+    data.cash = 20000.0
+    data.accounts_receivable = 120000.0
+    data.inventory = 90000.0
+    data.property_plant_equipment = 800000.0
+    data.accumulated_depreciation = 200000.0
+    data.goodwill = 150000.0
+    data.accounts_payable = 80000.0
+    data.long_term_debt = 500000.0
+    data.common_stock = 300000.0
+    data.retained_earnings = 100000.0
+    data.beginning_cash_balance = 20000.0
+    data.ending_cash_balance = 20000.0
+    return data
+
+
+def _forecast_with_events(base, events):
+    """Forecast one period with the kernel and apply events to it."""
+    assumptions = dict(FinancialForecast(None).assumptions)
+    assumptions['revenue_growth'] = -0.3
+    columns = from_financial_data([base]).to_float().columns
+    forecast = apply_events(columns, forecast_step(columns, assumptions), events, assumptions['dividend_payout'])
+    data = FinancialData(base.company_name, '2024', 'December 31, 2024')
+    for name, values in forecast.items():
+        if hasattr(data, name):
+            setattr(data, name, float(values[0]))
+    return data
+
+
+def test_net_change_in_cash_includes_equity_bailout():
+    base = _base()
+    forecast = _forecast_with_events(base, {'goodwill_impairment': 0.5, 'equity_bailout': 0.2})
+    assert forecast.equity_bailout > 0
+
+    comparison = FinancialComparison(base, forecast).get_cash_flow_comparison()
+    actual_change = forecast.ending_cash_balance - forecast.beginning_cash_balance
+    assert comparison['equity_bailout']['forecast'] == forecast.equity_bailout
+    assert math.isclose(comparison['net_change_in_cash']['forecast'], actual_change, abs_tol=1e-6)
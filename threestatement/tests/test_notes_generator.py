@@ -0,0 +1,42 @@
+"""
+Tests for generating MD&A notes one comparison at a time and in batches.
+"""
+
+from analysis.comparison import FinancialComparison
+from analysis.notes_generator import NotesGenerator, generate_comprehensive_notes_arrays
+from core.data_models import FinancialData
+from core.financial_arrays import from_financial_data
+
+
+def _data(period, revenue, capital_expenditures):
+    data = FinancialData('Example Co', period, f'{period}-12-31')
+    data.revenue = revenue
+    data.cogs = revenue * 0.6
+    data.operating_expenses = revenue * 0.2
+    data.net_income = revenue * 0.1
+    data.depreciation_amortization = 40.0
+    data.cash = revenue * 0.15
+    data.property_plant_equipment = 800.0
+    data.capital_expenditures = capital_expenditures
+    return data
+
+
+def _notes(capital_expenditures):
+    base = _data('2023', 1000.0, capital_expenditures)
+    forecast = _data('2024', 1100.0, capital_expenditures)
+    single = NotesGenerator(FinancialComparison(base, forecast)).generate_comprehensive_notes()
+    batch = generate_comprehensive_notes_arrays(from_financial_data([base]), from_financial_data([forecast]))[0]
+    return single, batch
+
+
+def test_batch_notes_match_single_notes():
+    for capital_expenditures in (0.0, 0, 75.0):
+        single, batch = _notes(capital_expenditures)
+        assert single == batch
+
+
+def test_zero_capex_is_not_negative_zero():
+    for capital_expenditures in (0.0, 0):
+        for notes in _notes(capital_expenditures):
+            assert 'investing cash flow ($0)' in notes
+            assert '$-0' not in notes
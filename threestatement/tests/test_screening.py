@@ -0,0 +1,43 @@
+"""
+Tests for screening a RatioStore with zone maps.
+"""
+
+import numpy as np
+
+from analysis.screening import Predicate, RatioStore, parse_query
+
+QUERIES = ('a > 1', 'a >= 0.5', 'a < 3', 'a <= 2', 'a == 2', 'a != 1', 'b != 1', 'b == 1', 'a > 1 and b != 1')
+
+
+def _columns():
+    return {
+        'a': [2.0, np.nan, 3.0, 0.5, np.nan, np.nan, 1.0, 2.0, 2.0],
+        'b': [1.0, 1.0, np.nan, 1.0, 2.0, np.nan, np.nan, 1.0, 0.0],
+    }
+
+
+def _expected(query):
+    """Rows matching a query, evaluated row by row."""
+    columns = _columns()
+    rows = []
+    for row in range(len(columns['a'])):
+        values = {name: column[row] for name, column in columns.items()}
+        if all(not np.isnan(values[p.column]) and p.compare(values[p.column], p.value) for p in parse_query(query)):
+            rows.append(row)
+    return rows
+
+
+def test_nan_never_matches():
+    store = RatioStore({'a': [2.0, np.nan, 3.0, 0.5]}, ['w', 'x', 'y', 'z'], block_size=2)
+    assert store.screen('a > 1') == ['w', 'y']
+    assert store.screen('a != 1') == ['w', 'y', 'z']
+    assert not Predicate('a', '!=', 1).evaluate(np.array([np.nan])).any()
+
+
+def test_results_do_not_depend_on_block_size():
+    keys = list(range(len(_columns()['a'])))
+    for query in QUERIES:
+        expected = _expected(query)
+        for block_size in (1, 2, 3, 4, 16):
+            store = RatioStore(_columns(), keys, block_size=block_size)
+            assert store.screen(query) == expected, (query, block_size)
@@ -0,0 +1,48 @@
+"""
+Tests for forecasting revenue and COGS from business segments.
+"""
+
+import math
+
+from analysis.forecasting import FinancialForecast
+from analysis.segments import SegmentModel, forecast_segment_scenarios
+from core.data_models import FinancialData
+
+FIELDS = ('revenue', 'cogs', 'net_income', 'prepaid_expenses', 'deferred_revenue', 'ending_cash_balance')
+
+
+def _base():
+    data = FinancialData('Example Co', '2023', 'December 31, 2023')
+    data.revenue = 1000.0
+    data.cogs = 600.0
+    data.operating_expenses = 200.0
+    data.prepaid_expenses = 50.0
+    data.deferred_revenue = 80.0
+    data.accrued_expenses = 30.0
+    data.property_plant_equipment = 500.0
+    data.long_term_debt = 300.0
+    return data
+
+
+def _segments():
+    return SegmentModel(['Products', 'Services'], [700.0, 300.0], [0.2, -0.1], [0.65, 0.4])
+
+
+def test_revenue_linked_items_follow_segment_growth():
+    model = FinancialForecast(_base())
+    model.set_segments(_segments())
+    forecast = model.generate_forecast()
+    implied_growth = forecast.revenue / 1000.0 - 1
+    assert not math.isclose(implied_growth, model.assumptions['revenue_growth'])
+    assert math.isclose(forecast.prepaid_expenses, 50.0 * (1 + implied_growth))
+    assert math.isclose(forecast.deferred_revenue, 80.0 * (1 + implied_growth))
+
+
+def test_kernel_matches_scalar_model():
+    model = FinancialForecast(_base())
+    model.set_segments(_segments())
+    forecasts = model.generate_forecast_periods(2)
+    kernel = forecast_segment_scenarios(_base(), _segments(), 2)
+    for forecast, columns in zip(forecasts, kernel):
+        for field in FIELDS:
+            assert math.isclose(getattr(forecast, field), float(columns[field][0]), rel_tol=1e-12), field
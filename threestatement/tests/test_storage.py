@@ -0,0 +1,48 @@
+"""
+Tests for the order of a company's history in FinancialStore.
+"""
+
+import sqlite3
+
+from core.data_models import FinancialData
+from core.storage import FinancialStore
+
+QUARTER_ENDS = {1: 'March 31', 2: 'June 30', 3: 'September 30', 4: 'December 31'}
+
+
+def _quarters():
+    return [(f'Q{quarter} {year}', f'{QUARTER_ENDS[quarter]}, {year}')
+            for year in (2022, 2023, 2024) for quarter in (1, 2, 3, 4)]
+
+
+def _save(store, quarters):
+    datas = []
+    for period, date in quarters:
+        data = FinancialData('Example Co', period, date)
+        data.revenue = 1000.0
+        datas.append(data)
+    store.save_financial_data(datas)
+
+
+def test_history_is_in_date_order(tmp_path):
+    quarters = _quarters()
+    with FinancialStore(str(tmp_path / 'store.db')) as store:
+        _save(store, reversed(quarters))
+        expected = [period for period, _ in quarters]
+        assert store.list_periods('Example Co') == expected
+        assert [data.reporting_period for data in store.load_history('Example Co')] == expected
+
+
+def test_existing_store_is_migrated(tmp_path):
+    path = str(tmp_path / 'store.db')
+    quarters = _quarters()
+    with FinancialStore(path) as store:
+        _save(store, reversed(quarters))
+    connection = sqlite3.connect(path)
+    connection.execute("DROP INDEX financial_data_history")
+    connection.execute("ALTER TABLE financial_data DROP COLUMN period_end")
+    connection.commit()
+    connection.close()
+
+    with FinancialStore(path) as store:
+        assert store.list_periods('Example Co')[-1] == 'Q4 2024'